@@ -0,0 +1,125 @@
+"""
+Benchmarks for the hot paths in game_objects, using pytest-benchmark.
+...
+The benchmarks are not collected by the normal test run. Run them and save a JSON baseline with
+    python -m pytest bench_game_objects.py --benchmark-autosave
+then compare a later run with the baseline, failing if any mean time has regressed by more than 10%, with
+    python -m pytest bench_game_objects.py --benchmark-compare --benchmark-compare-fail=mean:10%
+Baselines are saved in .benchmarks/ - pass a run id to --benchmark-compare to compare with an older one.
+"""
+import builtins
+import itertools
+
+import pytest
+
+from cli_rps import ClInterface
+from cyclic_rulesets import cyclic_ruleset
+import game_objects
+from game_objects import Game, PlayerObject
+
+pytest.importorskip("pytest_benchmark")
+
+
+RULESETS = {**game_objects.RULESETS, 'cyclic-101': cyclic_ruleset(101)}
+
+
+@pytest.fixture(params=list(RULESETS))
+def ruleset(request):
+    return RULESETS[request.param]
+
+
+@pytest.fixture
+def game(ruleset):
+    game = Game(ruleset=ruleset, seed=1)
+    game.add_human_player("Bob")
+    game.add_computer_player()
+    game.set_max_rounds(10 ** 9)
+    return game
+
+
+@pytest.fixture
+def played_game(game):
+    game.next_round()
+    game.players[0].choose_object(game.ruleset.allowable_objects[-1])
+    game.players[1].choose_object()
+    game.find_winner()
+    return game
+
+
+class TestPlayerObject:
+    def test_construction(self, benchmark, ruleset):
+        name = ruleset.allowable_objects[-1].title()
+        benchmark(PlayerObject, name, ruleset)
+
+    def test_gt(self, benchmark, ruleset):
+        a, b = ruleset.objects[0], ruleset.objects[-1]
+        benchmark(a.__gt__, b)
+
+    def test_eq(self, benchmark, ruleset):
+        a, b = ruleset.objects[0], ruleset.objects[-1]
+        benchmark(a.__eq__, b)
+
+    def test_random_object(self, benchmark, ruleset):
+        benchmark(PlayerObject.random_object, ruleset)
+
+
+class TestGame:
+    def test_find_winner(self, benchmark, played_game):
+        # find_winner adds to the scores and histories, which doesn't change its cost
+        benchmark(played_game.find_winner)
+
+    def test_next_round(self, benchmark, game):
+        benchmark(game.next_round)
+
+    def test_round(self, benchmark, game):
+        human, computer = game.players
+        choice = game.ruleset.allowable_objects[0]
+
+        def play_round():
+            game.next_round()
+            human.choose_object(choice)
+            computer.choose_object()
+            game.find_winner()
+
+        benchmark(play_round)
+
+    def test_play_round(self, benchmark, game):
+        computer = game.players[1]
+        choice = game.ruleset.allowable_objects[0]
+
+        def play_round():
+            computer.choose_object()
+            game.play_round(choice, computer.current_object)
+
+        benchmark(play_round)
+
+    def test_report_round(self, benchmark, played_game):
+        benchmark(played_game.report_round)
+
+    def test_report_score(self, benchmark, played_game):
+        benchmark(played_game.report_score)
+
+    def test_report_winner(self, benchmark, played_game):
+        benchmark(played_game.report_winner)
+
+
+class TestCliMatch:
+    @pytest.fixture
+    def scripted_cli(self, ruleset, monkeypatch):
+        """ A ClInterface for a human against the computer, with input scripted and output discarded """
+        cli = ClInterface()
+        cli.game = Game(ruleset=ruleset)
+        cli.game.add_human_player("Bob")
+        cli.game.add_computer_player()
+        cli.game.set_max_rounds(20)
+        moves = itertools.cycle(ruleset.allowable_objects)
+        monkeypatch.setattr(builtins, "input", lambda prompt="": next(moves))
+        monkeypatch.setattr(builtins, "print", lambda *args, **kwargs: None)
+        return cli
+
+    def test_match(self, benchmark, scripted_cli):
+        def run_match():
+            scripted_cli.game.reset()
+            scripted_cli.run_game()
+
+        benchmark(run_match)
@@ -1,18 +1,21 @@
-from game_objects import Game, PlayerObject, ComputerPlayer
+from game_objects import Game, ComputerPlayer, RULESETS
+from ruleset_files import RULES_DIR, load_rulesets
 
 
 # Command Line Interface - gives prompts to run the game from the Command line
 class ClInterface:
-    def __init__(self):
+    def __init__(self, rulesets=None):
+        # The rulesets the user can choose from, keyed by name - if not given they are loaded by set_up, from the
+        # built in rulesets and those in the rules directory
+        self.rulesets = rulesets
         self.game = Game()
-        # Convert to plain Rock, Paper, Scissors by uncommenting next 3 lines
-        # ToDo Give the user an option to choose this
-        # allowable_objects = ('rock', 'paper', 'scissors')
-        # win_dict = {'rock': ['scissors'], 'scissors': ['paper'], 'paper': ['rock']}
-        # self.game = Game(allowable_objects, win_dict)
 
     def set_up(self):
-        objects = PlayerObject.allowable_objects
+        if self.rulesets is None:
+            self.rulesets = {**RULESETS, **load_rulesets()} if RULES_DIR.is_dir() else RULESETS
+        if len(self.rulesets) > 1:
+            self.input_rules()
+        objects = self.game.ruleset.allowable_objects
         wel_string = f"Welcome to the {', '.join([obj.title() for obj in objects])} Game"
         print(wel_string)
         print("-" * len(wel_string))
@@ -32,29 +35,38 @@ class ClInterface:
                     print("Error - please enter 'h' or 'c'")
         self.input_max_rounds()
 
+    def input_rules(self):
+        names = {name.lower(): name for name in self.rulesets}
+        while True:
+            choice = input(f"Which rules will you play ({', '.join(self.rulesets)}): ").strip().lower()
+            if choice in names:
+                self.game = Game(ruleset=self.rulesets[names[choice]])
+                return
+            print(f"Error - please enter one of {', '.join(self.rulesets)}")
+
     def input_max_rounds(self):
         self.game.set_max_rounds(int(input("How many rounds will you play: ")))
 
     def get_choices(self):
         for player in self.game.players:
+            player.reset_object()
             while player.current_object is None:
                 try:
                     if isinstance(player, ComputerPlayer):
                         player.choose_object()
                     else:
-                        object_list = [f"'{obj}'" for obj in PlayerObject.allowable_objects]
+                        object_list = [f"'{obj}'" for obj in self.game.ruleset.allowable_objects]
                         choice = input(f"{player.name} please choose "
                                        f"{', '.join(object_list[:-1])} or {object_list[-1]}: ")
                         player.choose_object(choice)
                 except ValueError as e:
                     print(e)
+        return [player.current_object for player in self.game.players]
 
     def run_game(self):
 
         while not self.game.is_finished():
-            self.game.next_round()
-            self.get_choices()
-            self.game.find_winner()
+            self.game.play_round(*self.get_choices())
             print()
             print(self.game.report_round())
             print()
@@ -0,0 +1,78 @@
+"""
+Module generates balanced cyclic rulesets (RPS-7, RPS-15, RPS-101 and beyond) with any odd number of objects.
+...
+In a cyclic ruleset with n objects, object i beats the next (n - 1) / 2 objects, i + 1 to i + (n - 1) / 2 (mod n), and
+loses to the rest, so every object beats exactly as many objects as beat it. Rock, paper, scissors is the cyclic
+ruleset with n = 3, in the order rock, scissors, paper.
+
+The rules are built directly as a packed bit matrix (Ruleset.win_bits) a block of rows at a time, and checked with
+vectorised bit counts, so a ruleset with 10,001 objects takes about 12 MB rather than gigabytes of Python lists.
+
+Functions
+---------
+    cyclic_win_bits
+    cyclic_ruleset
+    win_counts
+    loss_counts
+    is_balanced
+"""
+import numpy as np
+
+from game_objects import Ruleset, WIN_BITS_BLOCK
+
+# Number of rows of the bit matrix built or counted at a time, to bound the memory used for large rulesets
+BLOCK_ROWS = WIN_BITS_BLOCK
+
+# POPCOUNT[b] is the number of bits set in the byte b
+POPCOUNT = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+
+
+def cyclic_win_bits(num_objects):
+    """ Returns the packed bit matrix for the cyclic ruleset with num_objects objects (an odd number, at least 3) """
+    if num_objects < 3 or num_objects % 2 == 0:
+        raise ValueError("Cyclic rulesets need an odd number of objects, at least 3")
+    half = (num_objects - 1) // 2
+    # Every row is the first row rotated, so rows are windows onto the first row repeated twice - row i starts at
+    # num_objects - i
+    first_row = np.zeros(num_objects, dtype=bool)
+    first_row[1:half + 1] = True
+    windows = np.lib.stride_tricks.sliding_window_view(np.tile(first_row, 2), num_objects)
+    win_bits = np.empty((num_objects, (num_objects + 7) // 8), dtype=np.uint8)
+    for start in range(0, num_objects, BLOCK_ROWS):
+        rows = np.arange(start, min(start + BLOCK_ROWS, num_objects))
+        win_bits[rows] = np.packbits(windows[(num_objects - rows) % num_objects], axis=1)
+    return win_bits
+
+
+def cyclic_ruleset(num_objects, allowable_objects=None):
+    """
+    Returns the cyclic Ruleset with num_objects objects
+
+    allowable_objects defaults to 'object0', 'object1', ...
+    """
+    if allowable_objects is None:
+        allowable_objects = [f"object{i}" for i in range(num_objects)]
+    return Ruleset(allowable_objects, win_bits=cyclic_win_bits(num_objects))
+
+
+def win_counts(ruleset):
+    """ Returns an array of the number of objects each object beats, counted from the bits """
+    win_counts = np.zeros(len(ruleset), dtype=np.int64)
+    for start in range(0, len(ruleset), BLOCK_ROWS):
+        win_counts[start:start + BLOCK_ROWS] = POPCOUNT[ruleset.win_bits[start:start + BLOCK_ROWS]].sum(axis=1)
+    return win_counts
+
+
+def loss_counts(ruleset):
+    """ Returns an array of the number of objects each object loses to """
+    loss_counts = np.zeros(len(ruleset), dtype=np.int64)
+    for start in range(0, len(ruleset), BLOCK_ROWS):
+        block = np.unpackbits(ruleset.win_bits[start:start + BLOCK_ROWS], axis=1, count=len(ruleset))
+        loss_counts += block.sum(axis=0, dtype=np.int64)
+    return loss_counts
+
+
+def is_balanced(ruleset):
+    """ Returns True if every object beats (n - 1) / 2 objects and loses to (n - 1) / 2, so no round is drawn """
+    half, remainder = divmod(len(ruleset) - 1, 2)
+    return not remainder and (win_counts(ruleset) == half).all() and (loss_counts(ruleset) == half).all()
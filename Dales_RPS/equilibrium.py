@@ -0,0 +1,220 @@
+"""
+Module finds the Nash equilibrium of a ruleset, and how far other strategies are from it.
+...
+Every ruleset is a two player zero-sum game with the payoff matrix Ruleset.payoff_matrix (WIN, DRAW or LOSE for the
+row player). The equilibrium mixed strategy is found by solving the game's linear program with a NumPy simplex
+method, which handles rulesets with hundreds of moves. Solutions depend only on the payoff matrix, so they are cached
+by a hash of it and shared by rulesets that differ only in the names of their objects.
+
+Strategies are probability vectors over a ruleset's allowable_objects, as in match_odds.
+
+Classes
+-------
+    Equilibrium
+
+Functions
+---------
+    payoff_key
+    solve_zero_sum
+    dominated_moves
+    equilibrium
+    exploitability
+    best_responses
+    clear_cache
+"""
+import hashlib
+
+import numpy as np
+
+from match_odds import check_strategies
+
+# Probabilities below this are treated as zero
+TOLERANCE = 1e-9
+# Size of the perturbation that stops the simplex method stalling on degenerate pivots
+PERTURBATION = 1e-6
+
+# Solutions and dominated moves, keyed by payoff_key
+_solutions = {}
+_dominated = {}
+
+
+def payoff_key(payoff_matrix):
+    """ Returns a canonical hash of a payoff matrix, used to cache solutions """
+    payoff_matrix = np.ascontiguousarray(payoff_matrix, dtype=np.int8)
+    return hashlib.sha256(np.int64(len(payoff_matrix)).tobytes() + payoff_matrix.tobytes()).hexdigest()
+
+
+def solve_zero_sum(payoff_matrix, max_pivots=None):
+    """
+    Solves a zero-sum game with the simplex method
+
+    The payoffs are shifted to be at least 1, so the game has a positive value v and the row player's equilibrium
+    strategy is the dual solution of: maximise sum(y) subject to payoff_matrix @ y <= 1, y >= 0 (where sum(y) = 1 / v).
+    Games from rulesets are very degenerate, so the right hand side is perturbed slightly while pivoting and the
+    solution is read from a copy of the true right hand side. Pivots use the steepest edge rule, which takes far fewer
+    pivots than the most negative reduced cost.
+
+    Returns
+    -------
+        tuple
+            (row_strategy, column_strategy, value)
+    """
+    payoff = np.asarray(payoff_matrix, dtype=np.float64)
+    num_rows, num_columns = payoff.shape
+    shift = 1 - payoff.min()
+    if max_pivots is None:
+        max_pivots = 50 * (num_rows + num_columns)
+
+    # A compact tableau - the constraint rows then the objective row, and the columns of the non-basic variables then
+    # the perturbed and true right hand sides. Variables 0 to num_columns - 1 are y, and the rest are the slacks.
+    tableau = np.empty((num_rows + 1, num_columns + 2))
+    tableau[:num_rows, :num_columns] = payoff + shift
+    tableau[:num_rows, -2] = 1 + PERTURBATION * np.random.default_rng(0).random(num_rows)
+    tableau[:num_rows, -1] = 1
+    tableau[-1, :num_columns] = -1
+    tableau[-1, -2:] = 0
+    basic = np.arange(num_columns, num_columns + num_rows)
+    non_basic = np.arange(num_columns)
+    constraints = tableau[:num_rows, :num_columns]
+    objective = tableau[-1, :num_columns]
+    update = np.empty_like(tableau)
+
+    for _ in range(max_pivots):
+        if objective.min() >= -TOLERANCE:
+            break
+        entering = np.argmin(objective / np.sqrt(1 + np.einsum('ij,ij->j', constraints, constraints)))
+        column = constraints[:, entering]
+        rows = np.flatnonzero(column > TOLERANCE)
+        leaving = rows[np.argmin(tableau[rows, -2] / column[rows])]
+
+        pivot = tableau[leaving, entering]
+        pivot_row = tableau[leaving] / pivot
+        pivot_column = tableau[:, entering].copy()
+        np.multiply(pivot_column[:, np.newaxis], pivot_row, out=update)
+        tableau -= update
+        tableau[leaving] = pivot_row
+        tableau[:, entering] = -pivot_column / pivot
+        tableau[leaving, entering] = 1 / pivot
+        basic[leaving], non_basic[entering] = non_basic[entering], basic[leaving]
+    else:
+        raise RuntimeError("Simplex method did not converge")
+
+    total = tableau[-1, -1]
+    row_strategy = np.zeros(num_rows)
+    slacks = non_basic >= num_columns
+    row_strategy[non_basic[slacks] - num_columns] = objective[slacks]
+    column_strategy = np.zeros(num_columns)
+    in_basis = basic < num_columns
+    column_strategy[basic[in_basis]] = tableau[:num_rows, -1][in_basis]
+    row_strategy = np.clip(row_strategy, 0, None)
+    column_strategy = np.clip(column_strategy, 0, None)
+    return row_strategy / row_strategy.sum(), column_strategy / column_strategy.sum(), 1 / total - shift
+
+
+def dominated_moves(payoff_matrix):
+    """
+    Returns the indices of the moves that are weakly dominated by another move - some other move does at least as
+    well against every move, and better against at least one
+    """
+    payoff = np.asarray(payoff_matrix)
+    dominated = np.zeros(len(payoff), dtype=bool)
+    for move in range(len(payoff)):
+        # Rows that the move's row is at least as good as everywhere, and better somewhere
+        dominated |= (payoff[move] >= payoff).all(axis=1) & (payoff[move] > payoff).any(axis=1)
+    return tuple(np.flatnonzero(dominated).tolist())
+
+
+class Equilibrium:
+    """
+    The equilibrium of a ruleset
+    ...
+    Attributes
+    ----------
+        ruleset: Ruleset
+        strategy: numpy.ndarray
+            read-only equilibrium mixed strategy, indexed by move index
+        value: float
+            the expected payoff of the equilibrium strategy (0 for any ruleset where the rules are the same for both
+            players)
+        dominated: tuple of int
+            move indices that are weakly dominated by another move
+    """
+
+    def __init__(self, ruleset, strategy, value):
+        self.ruleset = ruleset
+        self.strategy = strategy
+        self.value = value
+
+    @property
+    def dominated(self):
+        """ The move indices that are weakly dominated - found the first time they are needed, as this is O(n ** 3) """
+        key = payoff_key(self.ruleset.payoff_matrix)
+        if key not in _dominated:
+            _dominated[key] = dominated_moves(self.ruleset.payoff_matrix)
+        return _dominated[key]
+
+    @property
+    def support(self):
+        """ The names of the objects the equilibrium strategy plays """
+        return tuple(self.ruleset.allowable_objects[i] for i in np.flatnonzero(self.strategy > TOLERANCE))
+
+    @property
+    def dominated_objects(self):
+        """ The names of the objects that are weakly dominated """
+        return tuple(self.ruleset.allowable_objects[i] for i in self.dominated)
+
+    @property
+    def is_balanced(self):
+        """ True if playing every object equally often is an equilibrium, so no object is better than another """
+        return self.exploitability(np.full(len(self.ruleset), 1 / len(self.ruleset))) <= TOLERANCE
+
+    def exploitability(self, strategy):
+        """ Returns how much less than the value of the game a strategy can be held to by the best response """
+        strategy, = check_strategies(self.ruleset, strategy)
+        payoff = self.ruleset.payoff_matrix
+        return self.value - (strategy @ payoff).min(axis=-1)
+
+    def best_responses(self, strategy):
+        """ Returns the names of the objects that score the most against a strategy """
+        strategy, = check_strategies(self.ruleset, strategy)
+        payoffs = self.ruleset.payoff_matrix @ strategy
+        return tuple(self.ruleset.allowable_objects[i] for i in np.flatnonzero(payoffs >= payoffs.max() - TOLERANCE))
+
+    def __repr__(self):
+        return f'Equilibrium(support={self.support}, value={self.value:g})'
+
+
+def equilibrium(ruleset):
+    """
+    Returns the Equilibrium of a ruleset - a custom win_dict can be solved with equilibrium(Ruleset(objects, win_dict))
+
+    Balanced rulesets, where playing every object equally often guarantees both players the value 0, are recognised
+    in O(n ** 2) without solving the game.
+    """
+    key = payoff_key(ruleset.payoff_matrix)
+    if key not in _solutions:
+        payoff = ruleset.payoff_matrix
+        uniform = np.full(len(ruleset), 1 / len(ruleset))
+        if (uniform @ payoff).min() >= -TOLERANCE and (payoff @ uniform).max() <= TOLERANCE:
+            strategy, value = uniform, 0.0
+        else:
+            strategy, _, value = solve_zero_sum(payoff)
+        strategy.setflags(write=False)
+        _solutions[key] = strategy, value
+    return Equilibrium(ruleset, *_solutions[key])
+
+
+def exploitability(ruleset, strategy):
+    """ Returns how much less than the value of the ruleset's game a strategy can be held to """
+    return equilibrium(ruleset).exploitability(strategy)
+
+
+def best_responses(ruleset, strategy):
+    """ Returns the names of the objects that score the most against a strategy """
+    return equilibrium(ruleset).best_responses(strategy)
+
+
+def clear_cache():
+    """ Forgets every cached solution """
+    _solutions.clear()
+    _dominated.clear()
@@ -0,0 +1,291 @@
+"""
+Module evolves computer strategies with a genetic algorithm, playing the fitness matches across a pool of processes.
+...
+Each member of the population is a LookupTablePlayer table - the move to play after each sequence of the opponent's
+last order moves. Its fitness is the average, over a pool of reference opponents, of its score minus the opponent's
+per round, from matches of Game. Each generation the fittest tables are kept (elitism), and the rest of the new
+population are bred from parents chosen by tournament selection, with uniform crossover and random mutation.
+
+The matches for a generation are split into work units and played in a ProcessPoolExecutor. Rather than sending
+results back through the pool, the workers write each table's scores straight into a results array in shared
+memory, which the main process reads when the generation is done.
+
+Every random number comes from a SeedSequence made from the search's seed and the generation, so the search can be
+stopped and resumed from a checkpoint file, saved after each generation, and still give the same results as an
+unbroken run. Every member of a generation plays the same matches (common random numbers), so differences in
+fitness come from the tables rather than the luck of the draw.
+
+Run from the command line, e.g.
+    python evolution.py --generations 200 --order 2 --checkpoint search.npz
+
+Classes
+-------
+    EvolutionarySearch
+
+Functions
+---------
+    evaluate_tables
+"""
+import argparse
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from game_objects import ComputerPlayer, RPSLS_RULES
+from strategies import FrequencyPlayer, MarkovPlayer, LookupTablePlayer
+from tournament import play_match
+
+REFERENCE_POOL = (ComputerPlayer, FrequencyPlayer, MarkovPlayer)
+# Used with the seed and generation to make the SeedSequence for each use of random numbers
+INITIAL, EVALUATE, BREED = 0, 1, 2
+
+
+def evaluate_tables(work_unit):
+    """
+    Plays the matches for a chunk of tables against every opponent - this is the unit of work sent to each process
+
+    Parameters
+    ----------
+        work_unit: tuple
+            (results_name, results_shape, rows, tables, order, opponents, rounds, ruleset, match_seeds) -
+            results_name is the name of the shared memory results array, rows are the rows of the tables in it and
+            match_seeds[k] has a seed for each match against opponents[k]
+
+    The mean score difference per round against opponent k is written to results[row, k].
+    """
+    results_name, results_shape, rows, tables, order, opponents, rounds, ruleset, match_seeds = work_unit
+    block = shared_memory.SharedMemory(name=results_name)
+    try:
+        results = np.ndarray(results_shape, dtype=np.float64, buffer=block.buf)
+        for row, table in zip(rows, tables):
+            strategy = partial(LookupTablePlayer, table, order, ruleset)
+            for k, (opponent, seeds) in enumerate(zip(opponents, match_seeds)):
+                difference = 0
+                for seed in seeds:
+                    score, opponent_score = play_match(strategy, opponent, rounds, ruleset, seed)
+                    difference += score - opponent_score
+                results[row, k] = difference / (rounds * len(seeds))
+        del results
+    finally:
+        block.close()
+
+
+class EvolutionarySearch:
+    """
+    A class representing a genetic algorithm search for LookupTablePlayer tables
+
+    Attributes
+    ----------
+        opponents: tuple
+            the reference pool of strategy classes that fitness is measured against
+        order: int
+            the order of the tables
+        population_size: int
+        elite: int
+            the number of the fittest tables copied unchanged into the next generation
+        mutation_rate: float
+            the probability that each entry of a bred table is replaced by a random move
+        tournament_size: int
+            the number of tables drawn at random for each parent, the fittest of which is chosen
+        matches_per_opponent: int
+        rounds_per_match: int
+        ruleset: Ruleset
+        seed: int
+            the root seed - drawn from the operating system if not given, so any search can be repeated
+        generation: int
+            the number of generations evaluated so far
+        population: numpy.ndarray
+            the tables to be evaluated in the next generation, with shape (population_size, num_objects ** order)
+        scores: numpy.ndarray
+            the scores of the last generation evaluated against each opponent, with shape
+            (population_size, num_opponents)
+        best_table: numpy.ndarray
+            the fittest table found so far
+        best_fitness: float
+        history: numpy.ndarray
+            the best and mean fitness of each generation, with shape (generation, 2)
+    """
+
+    def __init__(self, opponents=REFERENCE_POOL, order=1, population_size=40, elite=2, mutation_rate=0.05,
+                 tournament_size=3, matches_per_opponent=4, rounds_per_match=100, ruleset=RPSLS_RULES, seed=None):
+        if not 0 <= elite < population_size:
+            raise ValueError("elite must be at least 0 and less than population_size")
+        if order < 1:
+            raise ValueError("order must be at least 1")
+        self.opponents = tuple(opponents)
+        self.order = order
+        self.population_size = population_size
+        self.elite = elite
+        self.mutation_rate = mutation_rate
+        self.tournament_size = tournament_size
+        self.matches_per_opponent = matches_per_opponent
+        self.rounds_per_match = rounds_per_match
+        self.ruleset = ruleset
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.generation = 0
+        rng = self.rng(0, INITIAL)
+        self.population = rng.integers(len(ruleset), size=(population_size, self.table_size))
+        self.scores = None
+        self.best_table = None
+        self.best_fitness = -np.inf
+        self.history = np.empty((0, 2))
+
+    @property
+    def table_size(self):
+        return len(self.ruleset) ** self.order
+
+    def seed_sequence(self, generation, use):
+        """ Returns the SeedSequence for one use (INITIAL, EVALUATE or BREED) of random numbers in a generation """
+        return np.random.SeedSequence(self.seed, spawn_key=(generation, use))
+
+    def rng(self, generation, use):
+        """ Returns a Generator for one use of random numbers in a generation """
+        return np.random.default_rng(self.seed_sequence(generation, use))
+
+    def schedule(self, results_name, chunk_size):
+        """ Splits the matches for the current population into work units of at most chunk_size tables """
+        # Every table plays the same matches, so each opponent's seeds are shared by the whole population
+        match_seeds = [seeds.spawn(self.matches_per_opponent)
+                       for seeds in self.seed_sequence(self.generation, EVALUATE).spawn(len(self.opponents))]
+        results_shape = (self.population_size, len(self.opponents))
+        return [(results_name, results_shape, list(range(start, min(start + chunk_size, self.population_size))),
+                 self.population[start:start + chunk_size].tolist(), self.order, self.opponents,
+                 self.rounds_per_match, self.ruleset, match_seeds)
+                for start in range(0, self.population_size, chunk_size)]
+
+    def evaluate(self, executor, chunk_size=4):
+        """ Plays every table in the population against the opponents, in the executor's processes, and returns the
+        scores """
+        block = shared_memory.SharedMemory(create=True, size=self.population_size * len(self.opponents) * 8)
+        try:
+            results = np.ndarray((self.population_size, len(self.opponents)), dtype=np.float64, buffer=block.buf)
+            results[:] = np.nan
+            # Consuming the results waits for every work unit and raises any error from the workers
+            for _ in executor.map(evaluate_tables, self.schedule(block.name, chunk_size)):
+                pass
+            scores = results.copy()
+            del results
+        finally:
+            block.close()
+            block.unlink()
+        return scores
+
+    def breed(self, fitness):
+        """ Returns the next population, bred from the current one """
+        rng = self.rng(self.generation, BREED)
+        ranked = np.argsort(-fitness, kind='stable')
+        num_children = self.population_size - self.elite
+        # Tournament selection - each parent is the fittest of tournament_size tables drawn at random
+        entrants = rng.integers(self.population_size, size=(2, num_children, self.tournament_size))
+        parents = np.take_along_axis(entrants, fitness[entrants].argmax(axis=-1)[..., np.newaxis], axis=-1)[..., 0]
+        # Uniform crossover then mutation
+        from_first = rng.random((num_children, self.table_size)) < 0.5
+        children = np.where(from_first, self.population[parents[0]], self.population[parents[1]])
+        mutated = rng.random(children.shape) < self.mutation_rate
+        children[mutated] = rng.integers(len(self.ruleset), size=np.count_nonzero(mutated))
+        return np.concatenate([self.population[ranked[:self.elite]], children])
+
+    def step(self, executor, chunk_size=4):
+        """ Evaluates the current population and breeds the next one """
+        self.scores = self.evaluate(executor, chunk_size)
+        fitness = self.scores.mean(axis=1)
+        fittest = int(fitness.argmax())
+        if fitness[fittest] > self.best_fitness:
+            self.best_fitness = float(fitness[fittest])
+            self.best_table = self.population[fittest].copy()
+        self.history = np.concatenate([self.history, [[fitness.max(), fitness.mean()]]])
+        self.population = self.breed(fitness)
+        self.generation += 1
+
+    def run(self, generations, max_workers=None, chunk_size=4, checkpoint=None):
+        """
+        Runs the search until generations generations have been evaluated
+
+        If checkpoint is given, the search is resumed from that file if it exists, and the file is saved after every
+        generation. max_workers defaults to the number of CPUs.
+        """
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.load(checkpoint)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while self.generation < generations:
+                self.step(executor, chunk_size)
+                if checkpoint is not None:
+                    self.save(checkpoint)
+        return self.best_table
+
+    def settings(self):
+        """ Returns the settings that a checkpoint must have been saved with to be resumed by this search """
+        return {'opponents': [opponent.__name__ for opponent in self.opponents],
+                'order': self.order,
+                'population_size': self.population_size,
+                'elite': self.elite,
+                'mutation_rate': self.mutation_rate,
+                'tournament_size': self.tournament_size,
+                'matches_per_opponent': self.matches_per_opponent,
+                'rounds_per_match': self.rounds_per_match,
+                'ruleset': self.ruleset.digest,
+                }
+
+    def save(self, path):
+        """ Saves the state of the search to a .npz checkpoint file """
+        state = {'settings': self.settings(), 'seed': self.seed, 'generation': self.generation,
+                 'best_fitness': self.best_fitness}
+        arrays = {'population': self.population, 'history': self.history}
+        if self.best_table is not None:
+            arrays['best_table'] = self.best_table
+            arrays['scores'] = self.scores
+        directory = os.path.dirname(os.path.abspath(path))
+        # Written to a temporary file and renamed, so a search stopped while saving keeps its last checkpoint
+        with tempfile.NamedTemporaryFile(dir=directory, suffix='.tmp', delete=False) as f:
+            np.savez(f, state=np.array(json.dumps(state)), **arrays)
+        os.replace(f.name, path)
+
+    def load(self, path):
+        """ Restores the state of the search from a checkpoint file saved with the same settings """
+        with np.load(path, allow_pickle=False) as checkpoint:
+            state = json.loads(str(checkpoint['state']))
+            if state['settings'] != self.settings():
+                raise ValueError(f"{path} was saved by a search with different settings")
+            self.seed = state['seed']
+            self.generation = state['generation']
+            self.best_fitness = state['best_fitness']
+            self.population = checkpoint['population']
+            self.history = checkpoint['history']
+            if 'best_table' in checkpoint:
+                self.best_table = checkpoint['best_table']
+                self.scores = checkpoint['scores']
+
+    def best_strategy(self):
+        """ Returns the fittest table found as a strategy, for a Tournament or Game.add_player(strategy()) """
+        if self.best_table is None:
+            raise ValueError("No generations have been evaluated")
+        return partial(LookupTablePlayer, self.best_table.tolist(), self.order, self.ruleset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evolve lookup table strategies for rock-paper-scissors")
+    parser.add_argument('--generations', type=int, default=50)
+    parser.add_argument('--order', type=int, default=1)
+    parser.add_argument('--population', type=int, default=40)
+    parser.add_argument('--matches', type=int, default=4, help="matches against each opponent")
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--workers', type=int, help="the number of processes - the number of CPUs by default")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--checkpoint', help=".npz file to resume from and save to after every generation")
+    args = parser.parse_args()
+
+    search = EvolutionarySearch(order=args.order, population_size=args.population, matches_per_opponent=args.matches,
+                                rounds_per_match=args.rounds, seed=args.seed)
+    search.run(args.generations, args.workers, checkpoint=args.checkpoint)
+    for generation, (best, mean) in enumerate(search.history):
+        print(f"{generation:>4}: best {best:+.3f}  mean {mean:+.3f}")
+    print(f"Best table: {search.best_table.tolist()} (fitness {search.best_fitness:+.3f}, seed {search.seed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Module contains a client for the game server, for testing it and for playing from the command line.
+...
+Classes
+-------
+    GameClient
+    PrintingClient (subclass of GameClient)
+"""
+import asyncio
+
+from game_objects import ComputerPlayer
+from game_server import DEFAULT_HOST, DEFAULT_PORT
+
+
+class GameClient:
+    """
+    A class representing a client playing one game on the server
+
+    Attributes
+    ----------
+        name: str
+            the player name
+        rules: str
+            the name of one of the server's rulesets, e.g. a key of RULESETS
+        rounds: int
+            the number of rounds to play
+        against_computer: bool
+            play the computer rather than waiting for another client
+        objects: list
+            the allowable objects, sent by the server when the game starts
+        opponent: str
+            the opponent's name, sent by the server when the game starts
+        messages: list
+            every (command, argument) received from the server
+        result: str
+            the END message for the game
+        computer: ComputerPlayer
+            chooses moves for the client unless choose_move is overridden
+    """
+
+    def __init__(self, name, rules='RPSLS', rounds=5, against_computer=False):
+        self.name = name
+        self.rules = rules
+        self.rounds = rounds
+        self.against_computer = against_computer
+        self.objects = []
+        self.opponent = None
+        self.messages = []
+        self.result = None
+        # The server may offer rulesets this client doesn't know, so moves are chosen from the objects it sends
+        self.computer = ComputerPlayer()
+        self._reader = None
+        self._writer = None
+
+    async def connect(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+
+    def send(self, command, argument=''):
+        self._writer.write(f"{command} {argument}\n".encode())
+
+    async def read_message(self):
+        """ Returns the next (command, argument) from the server """
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        command, _, argument = line.decode().strip().partition(' ')
+        self.messages.append((command, argument))
+        return command, argument
+
+    def choose_move(self, round_number):
+        """ Returns the name of the object to play - plays like a ComputerPlayer unless overridden """
+        return self.computer.rng.choice(self.objects)
+
+    def on_message(self, command, argument):
+        """ Called with each message from the server - does nothing unless overridden """
+
+    async def play(self):
+        """ Joins a game and plays it to the end, returning the END message """
+        join = f"{self.name} {self.rules} {self.rounds}"
+        if self.against_computer:
+            join += " computer"
+        self.send('JOIN', join)
+        while True:
+            command, argument = await self.read_message()
+            self.on_message(command, argument)
+            if command == 'START':
+                self.opponent, _, objects = argument.split(' ')
+                self.objects = objects.split(',')
+            elif command == 'ROUND':
+                self.send('MOVE', self.choose_move(int(argument)))
+                await self._writer.drain()
+            elif command == 'END':
+                self.result = argument
+                return argument
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+class PrintingClient(GameClient):
+    """ A client that prints the reports from the server """
+    def on_message(self, command, argument):
+        if command in ('START', 'REPORT', 'SCORE', 'END', 'ERROR'):
+            print(argument.replace(" | ", "\n"))
+            print()
+
+
+async def main():
+    client = PrintingClient("Player", against_computer=True)
+    await client.connect()
+    await client.play()
+    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
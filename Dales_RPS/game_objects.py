@@ -3,14 +3,25 @@ Module contains the class objects that control the underlying logic for rock-pap
 ...
 Classes
 -------
+    Ruleset
     PlayerObject
+    MoveHistory
+    MoveStream
     Player
     HumanPlayer (subclass of Player)
-    ComputerPlayer (subclass of Player
+    ComputerPlayer (subclass of Player)
     Game
 
 """
+import hashlib
+import json
+import operator
 import random
+from array import array
+from collections import Counter
+from types import MappingProxyType
+
+import numpy as np
 
 # constants
 RPSLS_OBJECTS = ('rock', 'paper', 'scissors', 'lizard', 'spock')
@@ -26,78 +37,451 @@ RPS_WIN_DICT = {'rock': ['scissors'],
                 'scissors': ['paper'],
                 }
 
+# Integer codes used in the compiled outcome table
+WIN = 1
+DRAW = 0
+LOSE = -1
+# Indices of the wins, draws and losses columns of match results, e.g. the Tournament cross table
+WINS = 0
+DRAWS = 1
+LOSSES = 2
+
+# Rows of win_bits that are unpacked at a time when checking them - a multiple of 8
+WIN_BITS_BLOCK = 512
+# Rulesets with more objects than this look up batches of outcomes in win_bits rather than building payoff_matrix
+LARGE_RULESET = 2048
+# The number of recent moves a player keeps in its history, and the moves MoveHistory.extend adds at a time
+HISTORY_LENGTH = 1000
+HISTORY_CHUNK = 1 << 16
+
+# Scoring modes for rounds with more than two players
+PAIRWISE = 'pairwise'
+BATTLE_ROYALE = 'battle royale'
+SCORING_MODES = (PAIRWISE, BATTLE_ROYALE)
+
+
+def compile_outcome_table(allowable_objects, win_dict):
+    """
+    Compiles a win_dict into an integer-coded outcome table
+
+    Returns a tuple of rows, indexed by move index, where outcome_table[i][j] is WIN, DRAW or LOSE for the object
+    with index i played against the object with index j
+    """
+    object_index = {name: i for i, name in enumerate(allowable_objects)}
+    table = [[DRAW] * len(allowable_objects) for _ in allowable_objects]
+    for winner, losers in win_dict.items():
+        for loser in losers:
+            if loser not in object_index:
+                raise ValueError("Values of win_dict must be allowable objects")
+            table[object_index[winner]][object_index[loser]] = WIN
+            table[object_index[loser]][object_index[winner]] = LOSE
+    return tuple(tuple(row) for row in table)
+
+
+def check_move_indices(moves, num_objects):
+    """
+    Raises an error unless moves is an integer array of move indices for num_objects objects
+    """
+    if moves.dtype.kind not in "iu":
+        raise TypeError("Moves must be integer move indices")
+    if moves.size and (moves.min() < 0 or moves.max() >= num_objects):
+        raise ValueError(f"Move indices must be between 0 and {num_objects - 1}")
+
+
+def score_moves(ruleset, moves, scoring=PAIRWISE):
+    """
+    Scores a round between any number of players from their move indices
+
+    Rather than comparing every pair of players, the number of players choosing each move is counted, and the moves
+    are scored against those counts, so the cost is O(N + k^2) for N players and k allowable objects.
+
+    Parameters
+    ----------
+        ruleset: Ruleset
+        moves: array_like of int
+            the move index chosen by each player
+        scoring: str
+            PAIRWISE - each player scores a point for every other player whose move theirs beats
+            BATTLE_ROYALE - a move wins if it beats a move that was played and isn't beaten by any move that was
+            played, and each player who chose a winning move scores a point
+
+    Returns
+    -------
+        numpy.ndarray
+            the points scored by each player
+    """
+    moves = np.asarray(moves)
+    check_move_indices(moves, len(ruleset))
+    counts = np.bincount(moves.ravel(), minlength=len(ruleset))
+    if scoring == PAIRWISE:
+        move_points = ruleset.win_matrix.astype(np.int64) @ counts
+    elif scoring == BATTLE_ROYALE:
+        played = counts > 0
+        beats_played = ruleset.win_matrix[:, played].any(axis=1)
+        beaten = ruleset.win_matrix[played, :].any(axis=0)
+        move_points = (played & beats_played & ~beaten).astype(np.int64)
+    else:
+        raise ValueError(f"Scoring must be in {', '.join(SCORING_MODES)}")
+    return move_points[moves]
+
+
+def join_names(names):
+    """ Returns names as a string, e.g. 'Ann, Bob and Cat' """
+    if len(names) == 1:
+        return names[0]
+    return ", ".join(names[:-1]) + f" and {names[-1]}"
+
+
+def compile_payoff_matrix(outcome_table):
+    """
+    Returns the outcome_table as a read-only NumPy array for batch lookups
+    """
+    payoff_matrix = np.array(outcome_table, dtype=np.int8)
+    payoff_matrix.flags.writeable = False
+    return payoff_matrix
+
+
+def check_win_bits(win_bits, num_objects):
+    """
+    Raises ValueError unless win_bits is a packed win matrix for num_objects objects, where no object beats itself
+    and no two objects beat each other
+    """
+    if win_bits.dtype != np.uint8 or win_bits.shape != (num_objects, (num_objects + 7) // 8):
+        raise ValueError(f"win_bits must be a uint8 array with shape ({num_objects}, {(num_objects + 7) // 8})")
+    if num_objects % 8 and (win_bits[:, -1] & (0xFF >> num_objects % 8)).any():
+        raise ValueError("win_bits has bits set beyond the last object")
+    moves = np.arange(num_objects)
+    if (win_bits[moves, moves >> 3] & (0x80 >> (moves & 7))).any():
+        raise ValueError("An object can't beat itself")
+    # Each tile above the diagonal is checked against its transpose below it, unpacking a block of rows at a time so
+    # large rulesets are never unpacked whole
+    for start in range(0, num_objects, WIN_BITS_BLOCK):
+        stop = min(start + WIN_BITS_BLOCK, num_objects)
+        rows = np.unpackbits(win_bits[start:stop], axis=1, count=num_objects).view(bool)
+        for tile_start in range(start, num_objects, WIN_BITS_BLOCK):
+            tile_stop = min(tile_start + WIN_BITS_BLOCK, num_objects)
+            tile = np.unpackbits(win_bits[tile_start:tile_stop, start // 8:(stop + 7) // 8], axis=1,
+                                 count=stop - start).view(bool)
+            if (rows[:, tile_start:tile_stop] & tile.T).any():
+                raise ValueError("Two objects can't beat each other")
+
+
+class OutcomeRows:
+    """
+    The outcome table of a ruleset built from win_bits - each row is compiled from the bits the first time it is
+    used, so a ruleset with thousands of objects doesn't hold every outcome as a Python int
+    """
+    __slots__ = ('_win_bits', '_rows')
+
+    def __init__(self, win_bits):
+        self._win_bits = win_bits
+        self._rows = [None] * len(win_bits)
+
+    def __getitem__(self, move):
+        row = self._rows[move]
+        if row is None:
+            num_objects = len(self._rows)
+            move = range(num_objects)[move]
+            wins = np.unpackbits(self._win_bits[move], count=num_objects).astype(np.int8)
+            losses = (self._win_bits[:, move >> 3] >> (7 - (move & 7))) & 1
+            row = self._rows[move] = tuple((wins - losses.astype(np.int8)).tolist())
+        return row
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return (self[move] for move in range(len(self._rows)))
+
+
+# A Ruleset holds the compiled rules for one game
+class Ruleset:
+    """
+    An immutable, hashable set of rules for a game
+    ...
+    Each Game owns a Ruleset, so games with different rules can run side by side in one process.
+
+    The rules are given either as a win_dict, or as win_bits - a packed bit matrix of which objects beat which, as
+    made by the cyclic_rulesets generator for rulesets with thousands of objects. The win_dict, payoff_matrix,
+    win_matrix and beaten_by are compiled the first time they are used, and the outcome_table of a ruleset built from
+    win_bits compiles each row when it is first used.
+
+    Attributes
+    ----------
+    allowable_objects: tuple
+        the allowable objects, in move index order
+    win_dict: mapping
+        keys are allowable objects, values is tuple of what keys will beat (read-only)
+    object_index: mapping
+        maps each allowable object to its move index (read-only)
+    win_bits: numpy.ndarray
+        read-only packed bit matrix (numpy.packbits along each row of win_matrix) - the rules in their smallest form
+    outcome_table: tuple or OutcomeRows
+        outcome_table[i][j] is WIN, DRAW or LOSE for move index i played against move index j
+    payoff_matrix: numpy.ndarray
+        the outcome_table as a read-only int8 array, used for resolving batches of rounds
+    win_matrix: numpy.ndarray
+        read-only bool array - win_matrix[i, j] is True if move index i beats move index j
+    beaten_by: tuple
+        beaten_by[i] is a tuple of the move indices that beat move index i
+    objects: tuple
+        the one canonical PlayerObject for each move, in move index order
+    digest: str
+        a hash of the rules that is the same in every process - used to identify the ruleset in files and caches
+    """
+    __slots__ = ('allowable_objects', 'win_dict', 'object_index', 'win_bits', 'outcome_table', 'payoff_matrix',
+                 'win_matrix', 'beaten_by', 'objects', '_object_lookup', '_hash', '_digest')
+
+    def __init__(self, allowable_objects=None, win_dict=None, win_bits=None, check=True):
+        """
+        Validates the rules and compiles them into the outcome_table
+
+        Parameters
+        ----------
+            allowable_objects: iterable of str (opt)
+                the allowable objects - defaults to the keys of win_dict
+            win_dict: dict (opt)
+                keys are allowable objects, values is list of what keys will beat - defaults to RPSLS rules
+            win_bits: numpy.ndarray (opt)
+                the rules as a packed bit matrix, in place of win_dict - allowable_objects must be given
+            check: bool (opt)
+                False skips checking that no object beats itself and no two objects beat each other, for
+                rules that are already known to be valid (e.g. from the compiled ruleset cache)
+        """
+        set_attr = super().__setattr__
+        if win_bits is not None:
+            if win_dict is not None or allowable_objects is None:
+                raise ValueError("win_bits needs the allowable objects and replaces win_dict")
+            allowable_objects = tuple(allowable_objects)
+            win_bits = np.array(win_bits)
+            if check:
+                check_win_bits(win_bits, len(allowable_objects))
+            set_attr('outcome_table', OutcomeRows(win_bits))
+        else:
+            if win_dict is None:
+                win_dict = RPSLS_WIN_DICT
+                if allowable_objects is None:
+                    allowable_objects = RPSLS_OBJECTS
+            if allowable_objects is None:
+                allowable_objects = win_dict.keys()
+            allowable_objects = tuple(allowable_objects)
+            if set(win_dict.keys()) != set(allowable_objects):
+                raise ValueError("Keys of win_dict must be the allowable objects")
+            outcome_table = compile_outcome_table(allowable_objects, win_dict)
+            # Packed from win_dict itself, as the outcome table hides self-wins and contradictions
+            object_index = {name: i for i, name in enumerate(allowable_objects)}
+            win_matrix = np.zeros((len(allowable_objects), len(allowable_objects)), dtype=bool)
+            for winner, losers in win_dict.items():
+                win_matrix[object_index[winner], [object_index[loser] for loser in losers]] = True
+            win_bits = np.packbits(win_matrix, axis=1)
+            if check:
+                check_win_bits(win_bits, len(allowable_objects))
+            set_attr('win_dict', MappingProxyType({name: tuple(win_dict[name]) for name in allowable_objects}))
+            set_attr('outcome_table', outcome_table)
+            set_attr('payoff_matrix', compile_payoff_matrix(outcome_table))
+        if len(set(allowable_objects)) != len(allowable_objects):
+            raise ValueError("Allowable objects must be unique")
+        win_bits.flags.writeable = False
+        set_attr('allowable_objects', allowable_objects)
+        set_attr('object_index', MappingProxyType({name: i for i, name in enumerate(allowable_objects)}))
+        set_attr('win_bits', win_bits)
+        set_attr('_hash', hash((allowable_objects, win_bits.tobytes())))
+        set_attr('_digest', None)
+        objects = tuple(PlayerObject.create(name, i, self) for i, name in enumerate(allowable_objects))
+        set_attr('objects', objects)
+        # Common spellings are indexed up front, so that most lookups don't need to lower() the name
+        object_lookup = {}
+        for obj in objects:
+            for spelling in (obj.name.upper(), obj.name.title(), obj.name):
+                object_lookup[spelling] = obj
+        set_attr('_object_lookup', object_lookup)
+
+    def __getattr__(self, name):
+        """ Compiles win_matrix, payoff_matrix, beaten_by and win_dict from win_bits the first time they are used """
+        if name == 'win_matrix':
+            value = np.unpackbits(self.win_bits, axis=1, count=len(self)).view(bool)
+        elif name == 'payoff_matrix':
+            value = self.win_matrix.astype(np.int8)
+            value -= self.win_matrix.T
+        elif name == 'beaten_by':
+            value = tuple(tuple(np.flatnonzero(column).tolist()) for column in self.win_matrix.T)
+        elif name == 'win_dict':
+            value = MappingProxyType({name: tuple(self.allowable_objects[i] for i in np.flatnonzero(row))
+                                      for name, row in zip(self.allowable_objects, self.win_matrix)})
+        else:
+            raise AttributeError(f"'Ruleset' object has no attribute '{name}'")
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        super().__setattr__(name, value)
+        return value
+
+    def beats(self, moves_a, moves_b):
+        """ Returns a bool array that is True where move index moves_a beats moves_b, read from win_bits """
+        moves_a = np.asarray(moves_a, dtype=np.intp)
+        moves_b = np.asarray(moves_b, dtype=np.intp)
+        return ((self.win_bits[moves_a, moves_b >> 3] >> (7 - (moves_b & 7))) & 1).astype(bool)
+
+    def outcomes(self, moves_a, moves_b):
+        """
+        Returns an int8 array of the outcomes (WIN, DRAW or LOSE) for arrays of move indices - looked up in the
+        payoff_matrix, or for large rulesets in win_bits, so that the matrix is never built
+        """
+        if len(self) <= LARGE_RULESET:
+            return self.payoff_matrix[moves_a, moves_b]
+        return self.beats(moves_a, moves_b).astype(np.int8) - self.beats(moves_b, moves_a)
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            content = json.dumps(self.allowable_objects).encode() + self.win_bits.tobytes()
+            super().__setattr__('_digest', hashlib.sha256(content).hexdigest())
+        return self._digest
+
+    def get_object(self, name):
+        """
+        Returns the PlayerObject for name, ignoring case
+        """
+        obj = self._object_lookup.get(name)
+        if obj is None:
+            obj = self._object_lookup.get(name.lower())
+            if obj is None:
+                raise ValueError(f"Choice must be in {', '.join(self.allowable_objects)}")
+        return obj
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Ruleset is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Ruleset is immutable")
+
+    def __len__(self):
+        """ Returns the number of allowable objects """
+        return len(self.allowable_objects)
+
+    def __eq__(self, other):
+        """ Returns True if both rulesets have the same objects in the same order and the same outcomes """
+        if not isinstance(other, Ruleset):
+            return NotImplemented
+        return (self is other or
+                (self.allowable_objects == other.allowable_objects and np.array_equal(self.win_bits, other.win_bits)))
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        """
+        Rulesets are pickled by their win_bits, so that even large rulesets are quick to send to worker processes
+        """
+        return Ruleset, (self.allowable_objects, None, self.win_bits)
+
+    def __repr__(self):
+        return f'Ruleset({self.allowable_objects})'
+
 
 # PlayerObject represents an object that a player could choose
 class PlayerObject:
     """
     A class to represent a playable object
     ...
+    PlayerObjects are immutable flyweights - each Ruleset holds one canonical instance per move, and
+    PlayerObject(name, ruleset) returns that instance rather than constructing a new one.
+
     Attributes
     ----------
     name: str
         name of the object
-    allowable_objects: tuple (class attribute)
-        list of allowable objects
-    win_dict: dict
-        keys are allowable objects, values is list of what keys will beat
+    index: int
+        move index of the object in the ruleset's allowable_objects
+    ruleset: Ruleset
+        the rules the object is played under
     ...
     Methods
     -------
     random_objects (class method)
-        returns a PlayerObject randomly chosen from the allowable objects
-    set_object_rules (class method)
-        sets the allowable objects and the win_dict for what the object can beat
+        returns a PlayerObject randomly chosen from the allowable objects of a ruleset
+    from_index (class method)
+        returns the PlayerObject with the given move index in a ruleset
+    create (class method)
+        constructs the canonical instance for a move - only called by Ruleset
     """
+    __slots__ = ('name', 'index', 'ruleset')
 
-    # Set default objects for the class
-    allowable_objects = RPSLS_OBJECTS
-    win_dict = RPSLS_WIN_DICT
-
-    def __init__(self, name):
+    def __new__(cls, name, ruleset=None):
         """
-        Constructs the attributes for the PlayerObject
+        Returns the PlayerObject for name
 
         Parameters
         ----------
             name: str
-                name of object - must be in allowable objects
+                name of object - must be in allowable objects of the ruleset
+            ruleset: Ruleset (opt)
+                the rules the object is played under - defaults to RPSLS rules
         """
-        if name.lower() in self.allowable_objects:
-            self.name = name.lower()
-        else:
-            raise ValueError(f"Choice must be in {', '.join(self.allowable_objects)}")
+        if ruleset is None:
+            ruleset = RPSLS_RULES
+        return ruleset.get_object(name)
 
     @classmethod
-    def random_object(cls):
+    def create(cls, name, index, ruleset):
         """
-        Returns a random object from amongst the allowable objects
+        Constructs the canonical instance for the move with the given name and index in ruleset
         """
-        return PlayerObject(random.choice(cls.allowable_objects))
+        obj = object.__new__(cls)
+        object.__setattr__(obj, 'name', name)
+        object.__setattr__(obj, 'index', index)
+        object.__setattr__(obj, 'ruleset', ruleset)
+        return obj
 
     @classmethod
-    def set_object_rules(cls, allowable_objects=None, win_dict=None):
+    def random_object(cls, ruleset=None, rng=None):
         """
-        Sets the allowable objects and the win_dict for the class
+        Returns a random object from amongst the allowable objects, drawn from rng (a MoveStream) if given
         """
-        if allowable_objects:
-            cls.allowable_objects = allowable_objects
-        if win_dict:
-            if set(win_dict.keys()) == set(allowable_objects):
-                cls.win_dict = win_dict
-            else:
-                raise ValueError("Keys of win_dict must be the allowable objects")
+        if ruleset is None:
+            ruleset = RPSLS_RULES
+        if rng is None:
+            return ruleset.objects[random.randrange(len(ruleset))]
+        return ruleset.objects[rng.next_move(len(ruleset))]
+
+    @classmethod
+    def from_index(cls, index, ruleset=None):
+        """
+        Returns the object with the given move index
+        """
+        if ruleset is None:
+            ruleset = RPSLS_RULES
+        return ruleset.objects[index]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PlayerObject is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("PlayerObject is immutable")
 
     def __eq__(self, other):
         """
-        Returns True if the name attribute of self and other are the same
+        Returns True if self and other are the same move under the same rules
         """
-        return self.name == other.name
+        if not isinstance(other, PlayerObject):
+            return NotImplemented
+        return self.index == other.index and self.ruleset == other.ruleset
+
+    def __hash__(self):
+        return hash((self.index, self.ruleset))
 
     def __gt__(self, other):
         """
-        Checks if the current object (self) beats the passed object (other), by checking win_dict
+        Checks if the current object (self) beats the passed object (other), by looking up the outcome_table
         """
-        return other.name in self.win_dict[self.name]
+        if not isinstance(other, PlayerObject):
+            return NotImplemented
+        if other.ruleset != self.ruleset:
+            raise ValueError("Objects played under different rules can't be compared")
+        return self.ruleset.outcome_table[self.index][other.index] == WIN
+
+    def __reduce__(self):
+        """ PlayerObjects are pickled by name, so that unpickling returns the canonical instance of its ruleset """
+        return PlayerObject, (self.name, self.ruleset)
 
     def __repr__(self):
         """
@@ -106,6 +490,204 @@ class PlayerObject:
         return f'PlayerObject("{self.name}")'
 
 
+RPSLS_RULES = Ruleset(RPSLS_OBJECTS, RPSLS_WIN_DICT)
+RPS_RULES = Ruleset(RPS_OBJECTS, RPS_WIN_DICT)
+# The built in rulesets, keyed by name - more can be loaded from definition files with ruleset_files
+RULESETS = {'RPS': RPS_RULES,
+            'RPSLS': RPSLS_RULES,
+            }
+
+
+# MoveHistory records the moves made by a player
+class MoveHistory:
+    """
+    A compact record of a player's moves, stored as move indices
+    ...
+    Moves are kept in an array rather than a list of PlayerObjects. Per-move counts and counts of transitions
+    between consecutive moves are updated as each move is recorded, so statistics don't rescan the history.
+    If maxlen is set, only the last maxlen moves are kept (a ring buffer) and the statistics cover those moves.
+
+    Attributes
+    ----------
+    num_moves: int
+        the number of different moves (allowable objects)
+    maxlen: int or None
+        the maximum number of moves kept - None for unbounded
+    counts: list
+        counts[i] is the number of times move index i appears in the history
+    """
+
+    def __init__(self, num_moves, maxlen=None):
+        if maxlen is not None and maxlen < 1:
+            raise ValueError("maxlen must be at least 1")
+        self.num_moves = num_moves
+        self.maxlen = maxlen
+        # Use the smallest array item that can hold every move index
+        self._typecode = 'B' if num_moves <= 0x100 else 'H' if num_moves <= 0x10000 else 'L'
+        self._dtype = np.dtype(self._typecode)
+        self.clear()
+
+    def clear(self):
+        """ Removes all moves from the history """
+        self.counts = [0] * self.num_moves
+        # transitions is keyed by previous * num_moves + move, so that it stays small for large rulesets
+        self._transitions = Counter()
+        if self.maxlen is None:
+            self._moves = array(self._typecode)
+        else:
+            self._moves = array(self._typecode, [0]) * self.maxlen
+        self._start = 0
+        self._size = 0
+
+    def record(self, move):
+        """ Adds a move index to the end of the history """
+        if self._size:
+            self._transitions[self.last_move() * self.num_moves + move] += 1
+        if self.maxlen is None:
+            self._moves.append(move)
+            self._size += 1
+        elif self._size < self.maxlen:
+            self._moves[self._size] = move
+            self._size += 1
+        else:
+            # The buffer is full - the oldest move is overwritten and drops out of the statistics
+            oldest = self._moves[self._start]
+            self.counts[oldest] -= 1
+            if self.maxlen > 1:
+                following = self._moves[(self._start + 1) % self.maxlen]
+                self._transitions[oldest * self.num_moves + following] -= 1
+            self._moves[self._start] = move
+            self._start = (self._start + 1) % self.maxlen
+        self.counts[move] += 1
+
+    def extend(self, moves):
+        """ Adds a sequence of move indices to the end of the history, updating the statistics in bulk """
+        moves = np.asarray(moves).ravel()
+        if self.maxlen is not None:
+            # Only the last maxlen moves survive, so when the buffer would overflow it is rebuilt from them
+            moves = moves[-self.maxlen:]
+            if self._size + len(moves) > self.maxlen:
+                kept = np.array(self.last(self.maxlen - len(moves)), dtype=self._dtype)
+                self.clear()
+                self.extend(kept)
+        if not moves.size:
+            return
+        counts = np.array(self.counts, dtype=np.int64)
+        previous = self.last_move()
+        # Moves are added a chunk at a time, so the temporary arrays stay small however many moves are added
+        for start in range(0, len(moves), HISTORY_CHUNK):
+            chunk = moves[start:start + HISTORY_CHUNK].astype(self._dtype)
+            counts += np.bincount(chunk, minlength=self.num_moves)
+            indices = chunk.astype(np.int64)
+            if previous is None:
+                pair_keys = indices[:-1] * self.num_moves + indices[1:]
+            else:
+                pair_keys = np.concatenate(([previous], indices[:-1])) * self.num_moves + indices
+            if self.num_moves ** 2 <= 1 << 20:
+                pair_counts = np.bincount(pair_keys, minlength=self.num_moves ** 2)
+                pair_keys = np.flatnonzero(pair_counts)
+                pair_counts = pair_counts[pair_keys]
+            else:
+                pair_keys, pair_counts = np.unique(pair_keys, return_counts=True)
+            self._transitions.update(dict(zip(pair_keys.tolist(), pair_counts.tolist())))
+            if self.maxlen is None:
+                self._moves.frombytes(chunk.view(np.uint8))
+            else:
+                # Written straight into the preallocated buffer, which doesn't wrap until it is full
+                np.frombuffer(self._moves, dtype=self._dtype)[self._size:self._size + len(chunk)] = chunk
+            self._size += len(chunk)
+            previous = int(chunk[-1])
+        self.counts = counts.tolist()
+
+    def last_move(self):
+        """ Returns the most recent move index, or None if no moves have been made """
+        if not self._size:
+            return None
+        return self._moves[(self._start + self._size - 1) % len(self._moves)]
+
+    def last(self, k):
+        """ Returns a list of the last k move indices (fewer if the history is shorter), oldest first """
+        k = min(k, self._size)
+        end = self._start + self._size
+        return [self._moves[i % len(self._moves)] for i in range(end - k, end)]
+
+    def frequency(self, move):
+        """ Returns the fraction of moves in the history that were the given move index """
+        if not self._size:
+            return 0.0
+        return self.counts[move] / self._size
+
+    def frequencies(self):
+        """ Returns a list with the frequency of each move index """
+        return [self.frequency(move) for move in range(self.num_moves)]
+
+    def transition_count(self, previous, move):
+        """ Returns the number of times move index previous was immediately followed by move index move """
+        return self._transitions[previous * self.num_moves + move]
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        """ Iterates over the move indices, oldest first """
+        return iter(self.last(self._size))
+
+    def __repr__(self):
+        return f'MoveHistory({self.last(self._size)})'
+
+
+class MoveStream:
+    """
+    A reproducible stream of random move indices
+    ...
+    Values are drawn from a NumPy Generator a block at a time, so choosing a move usually just takes the next value
+    from an iterator. Each value is a uniform float in [0, 1) that is scaled to the number of moves, so the same block
+    serves rulesets of any size. Streams for workers, matches and players are spawned from a parent stream, as with
+    numpy.random.SeedSequence, so they are independent of each other but all follow from the root seed.
+
+    Attributes
+    ----------
+        seed_sequence: numpy.random.SeedSequence
+            the seed the stream is drawn from
+        generator: numpy.random.Generator
+        block_size: int
+            the number of values drawn at a time
+    """
+
+    def __init__(self, seed=None, block_size=1024):
+        """ seed may be an int, a SeedSequence or None for a stream seeded from the operating system """
+        if isinstance(seed, np.random.SeedSequence):
+            # Spawning changes a SeedSequence, so the stream has its own copy and the caller's seed can be reused
+            self.seed_sequence = np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key,
+                                                        pool_size=seed.pool_size,
+                                                        n_children_spawned=seed.n_children_spawned)
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+        self.block_size = block_size
+        self._values = iter(())
+
+    def spawn(self):
+        """ Returns a new, independent stream derived from this one """
+        return MoveStream(self.seed_sequence.spawn(1)[0], self.block_size)
+
+    def next_move(self, num_moves):
+        """ Returns a random move index in range(num_moves) """
+        value = next(self._values, None)
+        if value is None:
+            self._values = iter(self.generator.random(self.block_size).tolist())
+            value = next(self._values)
+        return int(value * num_moves)
+
+    def choice(self, options):
+        """ Returns a random item from a non-empty sequence """
+        return options[self.next_move(len(options))]
+
+    def moves(self, num_moves, size):
+        """ Returns an array of size random move indices in range(num_moves), for play_rounds """
+        return self.generator.integers(num_moves, size=size)
+
+
 # The Player Class represents a player
 class Player:
     """
@@ -119,8 +701,16 @@ class Player:
             Player score
         current_object: PlayerObject or None
             What the player's current object is None for not selected
+        ruleset: Ruleset
+            the rules the player chooses objects under - set by the Game the player is added to
+        history: MoveHistory
+            the move indices the player has played
+        history_length: int or None (class attribute)
+            the number of recent moves kept in history - None keeps every move, so memory grows with the game
     """
-    def __init__(self, name=None):
+    history_length = HISTORY_LENGTH
+
+    def __init__(self, name=None, ruleset=None):
         """
         Constructs the necessary attributes for the Player class
         """
@@ -130,6 +720,21 @@ class Player:
             self.name = ""
         self.score = 0
         self.current_object = None
+        if ruleset is None:
+            ruleset = RPSLS_RULES
+        self.set_ruleset(ruleset)
+
+    def set_ruleset(self, ruleset):
+        """ Sets the rules the player plays under and starts a new move history """
+        self.ruleset = ruleset
+        self.history = MoveHistory(len(ruleset), self.history_length)
+
+    def observe(self, own_move, opponent_move):
+        """ Called by the Game after each two player round with the move indices played - a hook for players that
+        learn from their opponent, which does nothing by default """
+
+    def observe_batch(self, own_moves, opponent_moves):
+        """ Called by the Game after a batch of rounds with arrays of the move indices played """
 
     def set_name(self, name):
         """ Sets name attribute to name """
@@ -152,21 +757,33 @@ class Player:
 # The HumanPlayer Class is a subclass of Player representing a human player
 class HumanPlayer(Player):
     """ Subclass of Player representing a human player (PC) """
-    def choose_object(self, choice):
-        """ Chooses a PlayerObject for the player"""
-        self.current_object = PlayerObject(choice)
+    def choose_object(self, choice, ruleset=None):
+        """ Chooses a PlayerObject for the player, under ruleset if given or else the player's ruleset """
+        if ruleset is None:
+            ruleset = self.ruleset
+        self.current_object = ruleset.get_object(choice)
 
 
 # The ComputerPlayer Class is a subclass of Player representing a Computer player
 class ComputerPlayer(Player):
-    """ Subclass of Player representing a Computer player (NPC) """
-    def __init__(self):
-        """ Constructs super Player object with name "Computer """
-        super().__init__('Computer')
+    """ Subclass of Player representing a Computer player (NPC), which draws its moves from its own MoveStream, rng
+    - a Game gives each computer player a stream spawned from the game's """
+    def __init__(self, ruleset=RPSLS_RULES, rng=None):
+        """ Constructs super Player object with name "Computer" """
+        super().__init__('Computer', ruleset)
+        if rng is None:
+            rng = MoveStream()
+        self.rng = rng
 
-    def choose_object(self):
-        """ Computer chooses a random PlayerObject """
-        self.current_object = PlayerObject.random_object()
+    def choose_object(self, ruleset=None):
+        """ Computer chooses a random PlayerObject, under ruleset if given or else the player's ruleset """
+        if ruleset is None:
+            ruleset = self.ruleset
+        self.current_object = ruleset.objects[self.rng.next_move(len(ruleset))]
+
+    def choose_moves(self, size):
+        """ Returns an array of size random move indices, to play a block of rounds with Game.play_rounds """
+        return self.rng.moves(len(self.ruleset), size)
 
 
 # The Game class contains the instructions for running the game
@@ -179,6 +796,8 @@ class Game:
             list of allowable objects
         win_dict (opt)
             dict showing what objects the object in the key beats
+        ruleset: Ruleset
+            the rules for this game - built from allowable_objects and win_dict if not given
         current_round: int
             the current round
         max_rounds: int
@@ -189,33 +808,85 @@ class Game:
             None (not played), draw or win
         round_winner
             the PlayerObject for the round winner (None if no winner)
+        round_winners
+            a list of the players who scored in the round
+        log
+            a MatchLogWriter that two player rounds are recorded to, or None
+        seed
+            the seed the game was created with, or None
+        rng: MoveStream
+            the game's random stream - computer players are given streams spawned from it, so a game with a seed
+            replays the same moves
+        scoring
+            how rounds with more than two players are scored - PAIRWISE or BATTLE_ROYALE (see score_moves)
     """
 
-    def __init__(self, allowable_objects=None, win_dict=None):
-        if allowable_objects is None:
-            allowable_objects = RPSLS_OBJECTS
-        if win_dict is None:
-            win_dict = RPSLS_WIN_DICT
+    def __init__(self, allowable_objects=None, win_dict=None, ruleset=None, seed=None):
+        if ruleset is None:
+            if allowable_objects is None and win_dict is None:
+                ruleset = RPSLS_RULES
+            else:
+                ruleset = Ruleset(allowable_objects, win_dict)
+        self.ruleset = ruleset
         self.current_round = 0
         self.max_rounds = None
         self.players = []
         self.round_result = None
         # round_winner is the player who has won the round
         self.round_winner = None
-        PlayerObject.set_object_rules(allowable_objects, win_dict)
+        # _round_winners is only used in rounds with more than two players
+        self._round_winners = []
+        self.scoring = PAIRWISE
+        self.log = None
+        self.seed = seed
+        self.rng = MoveStream(seed)
+
+    def set_ruleset(self, ruleset):
+        """ Changes the rules of the game, passing them on to the players, and resets the game """
+        self.ruleset = ruleset
+        for player in self.players:
+            player.set_ruleset(ruleset)
+        self.reset()
+
+    def add_player(self, player):
+        """ Add an existing player, such as a computer strategy, who will play under this game's ruleset and draw
+        from a stream spawned from the game's """
+        if player.ruleset != self.ruleset:
+            player.set_ruleset(self.ruleset)
+        if isinstance(player, ComputerPlayer):
+            player.rng = self.rng.spawn()
+        self.players.append(player)
+        return player
 
     def add_human_player(self, name=None):
         """ Add a human player with their name """
-        player = HumanPlayer(name)
+        player = HumanPlayer(name, self.ruleset)
         self.players.append(player)
         return player
 
     def add_computer_player(self):
         """ Add a computer player (no name) """
-        comp_player = ComputerPlayer()
+        comp_player = ComputerPlayer(self.ruleset, self.rng.spawn())
         self.players.append(comp_player)
         return comp_player
 
+    def set_log(self, log):
+        """ Record every two player round played from now on to log (a MatchLogWriter), or stop if log is None """
+        self.log = log
+
+    def set_scoring(self, scoring):
+        """ Set how rounds with more than two players are scored """
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"Scoring must be in {', '.join(SCORING_MODES)}")
+        self.scoring = scoring
+
+    @property
+    def round_winners(self):
+        """ The players who scored in the round """
+        if len(self.players) > 2:
+            return self._round_winners
+        return [self.round_winner] if self.round_winner else []
+
     def set_max_rounds(self, mr):
         """ Set the maximum number of rounds """
         if not isinstance(mr, int):
@@ -228,21 +899,130 @@ class Game:
         # checks if all the player choices are non-empty values
         if not all(choices):
             raise TypeError("All choices must be non-empty")
-        if choices[0] == choices[1]:
+        if len(choices) > 2:
+            self.find_winners(choices)
+            return
+        outcome = self.ruleset.outcome_table[choices[0].index][choices[1].index]
+        if outcome == DRAW:
             self.round_result = "draw"
             self.round_winner = None
         else:
             self.round_result = "win"
-            if choices[0] > choices[1]:
+            if outcome == WIN:
                 self.round_winner = self.players[0]
             else:
                 self.round_winner = self.players[1]
             self.round_winner.win_round()
+        for player in self.players:
+            player.history.record(player.current_object.index)
+        if self.log is not None:
+            self.log.record(choices[0].index, choices[1].index, outcome)
+        self.players[0].observe(choices[0].index, choices[1].index)
+        self.players[1].observe(choices[1].index, choices[0].index)
+
+    def find_winners(self, choices):
+        """ Finds the winners of a round with more than two players, scoring them by the game's scoring mode """
+        points = score_moves(self.ruleset, [choice.index for choice in choices], self.scoring)
+        self._round_winners = []
+        for player, player_points in zip(self.players, points.tolist()):
+            if player_points:
+                player.score += player_points
+                self._round_winners.append(player)
+        self.round_result = "win" if self._round_winners else "draw"
+        self.round_winner = self._round_winners[0] if len(self._round_winners) == 1 else None
+        for player in self.players:
+            player.history.record(player.current_object.index)
+
+    def _get_move(self, move):
+        """ Returns the PlayerObject of this game's ruleset for a PlayerObject, name or move index """
+        if isinstance(move, PlayerObject):
+            if move.ruleset != self.ruleset:
+                raise ValueError("Objects must be played under the game's rules")
+            return move
+        if isinstance(move, str):
+            return self.ruleset.get_object(move)
+        if isinstance(move, bool):
+            raise TypeError("Moves must be objects, names or move indices")
+        index = operator.index(move)
+        if not 0 <= index < len(self.ruleset):
+            raise ValueError(f"Move indices must be between 0 and {len(self.ruleset) - 1}")
+        return self.ruleset.objects[index]
+
+    def play_round(self, move_a, move_b):
+        """
+        Plays one round between the first two players - the fast path for next_round, choose_object and find_winner
+
+        Parameters
+        ----------
+            move_a, move_b: PlayerObject, str or int
+                the objects (or their names or move indices) chosen by players[0] and players[1]
+
+        Returns
+        -------
+            int
+                the outcome of the round for players[0] - WIN, DRAW or LOSE
+        """
+        move_a = self._get_move(move_a)
+        move_b = self._get_move(move_b)
+        player_a, player_b = self.players[0], self.players[1]
+        player_a.current_object = move_a
+        player_b.current_object = move_b
+        player_a.history.record(move_a.index)
+        player_b.history.record(move_b.index)
+        player_a.observe(move_a.index, move_b.index)
+        player_b.observe(move_b.index, move_a.index)
+        self.current_round += 1
+        outcome = self.ruleset.outcome_table[move_a.index][move_b.index]
+        if outcome == DRAW:
+            self.round_result = "draw"
+            self.round_winner = None
+        else:
+            self.round_result = "win"
+            self.round_winner = player_a if outcome == WIN else player_b
+            self.round_winner.score += 1
+        if self.log is not None:
+            self.log.record(move_a.index, move_b.index, outcome)
+        return outcome
+
+    def play_rounds(self, moves_a, moves_b):
+        """
+        Plays a batch of rounds between the first two players
+
+        Parameters
+        ----------
+            moves_a, moves_b: array_like of int
+                move indices chosen by players[0] and players[1] in each round
+
+        Returns
+        -------
+            numpy.ndarray
+                the outcome of each round for players[0] - WIN, DRAW or LOSE
+        """
+        moves_a = np.asarray(moves_a)
+        moves_b = np.asarray(moves_b)
+        if moves_a.shape != moves_b.shape:
+            raise ValueError("Both players must play the same number of rounds")
+        for moves in (moves_a, moves_b):
+            check_move_indices(moves, len(self.ruleset))
+        outcomes = self.ruleset.outcomes(moves_a, moves_b)
+        self.players[0].score += int(np.count_nonzero(outcomes == WIN))
+        self.players[1].score += int(np.count_nonzero(outcomes == LOSE))
+        self.players[0].history.extend(moves_a.ravel())
+        self.players[1].history.extend(moves_b.ravel())
+        self.players[0].observe_batch(moves_a.ravel(), moves_b.ravel())
+        self.players[1].observe_batch(moves_b.ravel(), moves_a.ravel())
+        self.current_round += outcomes.size
+        if self.log is not None:
+            self.log.record_batch(moves_a.ravel(), moves_b.ravel(), outcomes.ravel())
+        self.round_result = None
+        self.round_winner = None
+        return outcomes
 
     def next_round(self):
         """ Resets game objects ready for a new round """
         self.round_result = None
         self.round_winner = None
+        self._round_winners = []
         for player in self.players:
             player.reset_object()
         self.current_round += 1
@@ -252,27 +1032,27 @@ class Game:
         return self.current_round >= self.max_rounds
 
     def reset(self):
-        """ Resets the whole game, setting current round to 0 and player scores to 0"""
+        """ Resets the whole game, setting current round to 0 and player scores to 0 and clearing move histories"""
         self.current_round = 0
         self.round_result = None
         self.round_winner = None
+        self._round_winners = []
         for player in self.players:
             player.score = 0
             player.reset_object()
+            player.history.clear()
 
     def report_round(self):
         """ returns a message reporting on what the players played and what the result of the round was """
         if self.round_result is None:
             report_msg = 'Round has not been played'
         else:
-            report_msg = (
-                f"{self.players[0].name} choose '{self.players[0].current_object.name}'.\n"
-                f"{self.players[1].name} choose '{self.players[1].current_object.name}'.\n")
+            report_msg = "".join(f"{player.name} choose '{player.current_object.name}'.\n" for player in self.players)
 
             if self.round_result == "draw":
                 report_msg += "Round was a draw"
             elif self.round_result == "win":
-                report_msg += f'{self.round_winner.name} won this round'
+                report_msg += f'{join_names([player.name for player in self.round_winners])} won this round'
         return report_msg
 
     def report_score(self):
@@ -283,10 +1063,12 @@ class Game:
 
     def report_winner(self):
         """ Returns a message with the overall winner """
-        if self.players[0].score > self.players[1].score:
-            win_msg = f"{self.players[0].name} is the winner"
-        elif self.players[0].score < self.players[1].score:
-            win_msg = f"{self.players[1].name} is the winner"
-        else:
+        top_score = max(player.score for player in self.players)
+        winners = [player.name for player in self.players if player.score == top_score]
+        if len(winners) == len(self.players):
             win_msg = "Game is drawn"
+        elif len(winners) == 1:
+            win_msg = f"{winners[0]} is the winner"
+        else:
+            win_msg = f"{join_names(winners)} are joint winners"
         return win_msg
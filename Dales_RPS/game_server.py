@@ -0,0 +1,299 @@
+"""
+Module contains an asyncio TCP server that hosts many concurrent rock-paper-scissors games.
+...
+Each pair of connected clients plays its own Game, so one process can host thousands of sessions. Both players'
+moves are collected at the same time, with a timeout for each move, and the round is resolved with
+Game.find_winner.
+
+Protocol
+--------
+Messages are single lines of UTF-8 text - a command followed by its arguments, separated by spaces.
+
+Client to server
+    JOIN <name> <rules> <rounds> [computer]
+        asks to play a game - rules is a key of the server's rulesets (RULESETS by default). Clients asking for the
+        same rules and number of rounds are paired, or if 'computer' is given the client plays the computer
+    MOVE <object>
+        the object chosen for the current round
+    QUIT
+        leaves the game
+
+Server to client
+    START <opponent> <rounds> <object,object,...>
+        the game has started - the objects are the allowable objects in move index order
+    ROUND <round>
+        a move is wanted for the round
+    REPORT <report>
+        Game.report_round, with new lines replaced by ' | '
+    SCORE <report>
+        Game.report_score, with new lines replaced by ' | '
+    END <report>
+        Game.report_winner, or why the game was abandoned
+    ERROR <message>
+        the last message was not accepted (or a move timed out and was chosen randomly)
+
+Classes
+-------
+    Connection
+    GameServer
+"""
+import asyncio
+
+from game_objects import Game, PlayerObject, RULESETS
+from ruleset_files import load_rulesets
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+def encode_report(report):
+    """ Returns a multi-line report as a single line for the protocol """
+    return report.replace("\n", " | ")
+
+
+class Connection:
+    """
+    A class representing a client connected to the server
+
+    Attributes
+    ----------
+        reader: asyncio.StreamReader
+        writer: asyncio.StreamWriter
+        name: str
+            the player name sent with JOIN
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.name = None
+
+    async def read_message(self):
+        """
+        Returns the next (command, argument) sent by the client - raises ConnectionError if it has gone, or sent a
+        line too long to read
+        """
+        while True:
+            try:
+                line = await self.reader.readline()
+            except ValueError:
+                # readline raises ValueError for a line longer than the reader's limit
+                raise ConnectionError(f"{self.name} sent a message that was too long") from None
+            if not line:
+                raise ConnectionError(f"{self.name} disconnected")
+            try:
+                line = line.decode()
+                break
+            except UnicodeDecodeError:
+                self.send('ERROR', "Messages must be UTF-8 text")
+        command, _, argument = line.strip().partition(' ')
+        if command == 'QUIT':
+            raise ConnectionError(f"{self.name} quit")
+        return command, argument
+
+    def send(self, command, argument=''):
+        """ Queues a message for the client """
+        self.writer.write(f"{command} {argument}\n".encode())
+
+    async def drain(self):
+        """ Waits until queued messages have been sent - ignoring clients that have already gone """
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class GameServer:
+    """
+    A class representing the game server
+
+    Attributes
+    ----------
+        host: str
+        port: int
+            the port to listen on - 0 picks a free port, which is stored here once the server has started
+        move_timeout: float
+            seconds each player has to send a move before one is chosen at random for them
+        rulesets: dict
+            the rulesets clients can ask for, keyed by name
+        sessions: int
+            the number of games currently being played
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, move_timeout=30.0, rulesets=None):
+        self.host = host
+        self.port = port
+        self.move_timeout = move_timeout
+        self.rulesets = RULESETS if rulesets is None else rulesets
+        self.sessions = 0
+        self._server = None
+        # Clients waiting for an opponent, keyed by (rules, rounds), with a future that is set when their game ends
+        # and the task watching for them leaving
+        self._waiting = {}
+
+    async def start(self):
+        """ Starts listening for clients """
+        self._server = await asyncio.start_server(self.handle_client, self.host, self.port, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def handle_client(self, reader, writer):
+        """ Handles a client from connection until its game ends """
+        conn = Connection(reader, writer)
+        try:
+            game_args = await self.read_join(conn)
+            if game_args is not None:
+                await self.join_game(conn, *game_args)
+        except ConnectionError:
+            pass
+        finally:
+            await conn.close()
+
+    async def read_join(self, conn):
+        """ Reads messages until a valid JOIN - returns (rules, rounds, against_computer) """
+        while True:
+            command, argument = await conn.read_message()
+            if command != 'JOIN':
+                conn.send('ERROR', "Expected JOIN <name> <rules> <rounds> [computer]")
+                await conn.drain()
+                continue
+            args = argument.split()
+            if len(args) not in (3, 4) or (len(args) == 4 and args[3] != 'computer'):
+                conn.send('ERROR', "Expected JOIN <name> <rules> <rounds> [computer]")
+            elif args[1] not in self.rulesets:
+                conn.send('ERROR', f"Rules must be in {', '.join(self.rulesets)}")
+            elif not args[2].isdecimal() or int(args[2]) < 1:
+                conn.send('ERROR', "Rounds must be a positive integer")
+            else:
+                conn.name = args[0]
+                return args[1], int(args[2]), len(args) == 4
+            await conn.drain()
+
+    async def join_game(self, conn, rules, rounds, against_computer):
+        """ Starts a game against the computer, pairs the client with a waiting client, or waits for an opponent """
+        if against_computer:
+            await self.run_session([conn, None], rules, rounds)
+            return
+        key = (rules, rounds)
+        while key in self._waiting:
+            opponent, finished, watch = self._waiting.pop(key)
+            try:
+                # The waiting client's messages are read by its watch until it is paired, so that is stopped first
+                watch.cancel()
+                await asyncio.wait([watch])
+                if watch.cancelled():
+                    await self.run_session([opponent, conn], rules, rounds)
+                    return
+                # Otherwise the waiting client left before it could be removed, so look for another
+            finally:
+                finished.set_result(None)
+        finished = asyncio.get_running_loop().create_future()
+        watch = asyncio.ensure_future(self.watch_waiting(conn))
+        self._waiting[key] = (conn, finished, watch)
+        try:
+            await asyncio.wait([watch])
+            if not watch.cancelled():
+                # Raises the ConnectionError of a client that disconnected or quit while waiting
+                watch.result()
+            await finished
+        finally:
+            watch.cancel()
+            if self._waiting.get(key, (None,))[0] is conn:
+                del self._waiting[key]
+
+    @staticmethod
+    async def watch_waiting(conn):
+        """ Reads messages from a client waiting for an opponent - raises ConnectionError when it leaves """
+        while True:
+            await conn.read_message()
+            conn.send('ERROR', "Waiting for an opponent")
+            await conn.drain()
+
+    async def run_session(self, connections, rules, rounds):
+        """
+        Plays a whole game between the connections - a None connection is played by the computer
+        """
+        game = Game(ruleset=self.rulesets[rules])
+        for conn in connections:
+            if conn is None:
+                game.add_computer_player()
+            else:
+                game.add_human_player(conn.name)
+        game.set_max_rounds(rounds)
+        clients = [(conn, player) for conn, player in zip(connections, game.players) if conn is not None]
+        objects = ','.join(game.ruleset.allowable_objects)
+        for conn, player in clients:
+            opponent = next(other for other in game.players if other is not player)
+            conn.send('START', f"{opponent.name} {rounds} {objects}")
+        self.sessions += 1
+        try:
+            while not game.is_finished():
+                game.next_round()
+                await self.send_all(clients, 'ROUND', str(game.current_round))
+                for conn, player in zip(connections, game.players):
+                    if conn is None:
+                        player.choose_object()
+                moves = [asyncio.ensure_future(self.collect_move(conn, player)) for conn, player in clients]
+                try:
+                    await asyncio.gather(*moves)
+                finally:
+                    # If one client has gone, stop waiting for the other
+                    for move in moves:
+                        move.cancel()
+                game.find_winner()
+                for conn, _ in clients:
+                    conn.send('REPORT', encode_report(game.report_round()))
+                    conn.send('SCORE', encode_report(game.report_score()))
+            await self.send_all(clients, 'END', game.report_winner())
+        except ConnectionError as e:
+            await self.send_all(clients, 'END', f"Game abandoned - {e}")
+        finally:
+            self.sessions -= 1
+
+    async def collect_move(self, conn, player):
+        """ Reads the client's move for the round, choosing one at random if it doesn't arrive in time """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.move_timeout
+        try:
+            while player.current_object is None:
+                command, argument = await asyncio.wait_for(conn.read_message(), deadline - loop.time())
+                if command == 'MOVE':
+                    try:
+                        player.choose_object(argument)
+                    except ValueError as e:
+                        conn.send('ERROR', str(e))
+                else:
+                    conn.send('ERROR', "Expected MOVE <object>")
+        except asyncio.TimeoutError:
+            player.current_object = PlayerObject.random_object(player.ruleset)
+            conn.send('ERROR', f"Move timed out - '{player.current_object.name}' was chosen")
+
+    @staticmethod
+    async def send_all(clients, command, argument=''):
+        """ Sends a message to every client and waits until it has been sent """
+        for conn, _ in clients:
+            conn.send(command, argument)
+        await asyncio.gather(*(conn.drain() for conn, _ in clients))
+
+
+if __name__ == "__main__":
+    # Rulesets defined in the rules directory are offered as well - each is only compiled the first time it's loaded
+    server = GameServer(rulesets={**RULESETS, **load_rulesets()})
+    print(f"Serving rock-paper-scissors on {server.host}:{server.port}")
+    asyncio.run(server.serve_forever())
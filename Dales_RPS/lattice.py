@@ -0,0 +1,216 @@
+"""
+Module simulates rock-paper-scissors ecology - a lattice of cells, each holding a move, that invade their neighbours.
+...
+Each cell of a 2D lattice (with periodic boundaries) holds a move index of a ruleset. In every sweep each cell looks
+at one of its neighbours chosen at random, and is invaded - takes the neighbour's move - if the neighbour's move
+beats its own, with probability rate. Every cell is updated at once from the lattice before the sweep, so a sweep is
+a few whole-array operations: the neighbours are gathered with array rolls, looked up in the ruleset's win_matrix
+(or win_bits for large rulesets) and copied in through a mask. There are no loops over cells, so lattices of
+4096 x 4096 cells take a fraction of a second a sweep.
+
+Snapshots of the lattice are taken every few sweeps, with the density of each move. They can be written to a .npy
+file as they are taken, which is opened as a memory map so runs with many snapshots don't need to fit in memory.
+
+Run from the command line, e.g.
+    python lattice.py --size 4096 --sweeps 2000 --snapshot-every 100 --output lattice.npy
+
+Classes
+-------
+    Lattice
+
+Functions
+---------
+    load_snapshots
+"""
+import argparse
+import time
+
+import numpy as np
+
+from game_objects import RPSLS_RULES, RULESETS, LARGE_RULESET
+from ruleset_files import load_rulesets
+
+# Offsets (rows, columns) of the neighbours of a cell
+VON_NEUMANN = ((-1, 0), (1, 0), (0, -1), (0, 1))
+MOORE = VON_NEUMANN + ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+class Lattice:
+    """
+    A class representing a lattice of cells that play moves against their neighbours
+
+    Attributes
+    ----------
+        ruleset: Ruleset
+        grid: numpy.ndarray
+            2D array of the move index held by each cell - the smallest unsigned integer type that fits the ruleset
+        rate: float
+            the probability that a cell is invaded when its chosen neighbour's move beats its own
+        neighbourhood: tuple
+            the (row, column) offsets of the neighbours a cell chooses from - VON_NEUMANN or MOORE
+        sweeps: int
+            the number of sweeps run so far
+        snapshot_sweeps: numpy.ndarray
+            the number of sweeps run at each snapshot taken by the last call to run
+        seed: int
+            the root seed of the random numbers - drawn from the operating system if not given, so any run can be
+            repeated
+    """
+
+    def __init__(self, ruleset=RPSLS_RULES, shape=(256, 256), grid=None, rate=1.0, neighbourhood=VON_NEUMANN,
+                 seed=None):
+        """
+        grid gives the starting move indices - by default each cell is given a move at random
+        """
+        if not 0 < rate <= 1:
+            raise ValueError("rate must be more than 0 and at most 1")
+        self.ruleset = ruleset
+        self.rate = rate
+        self.neighbourhood = tuple(neighbourhood)
+        self.sweeps = 0
+        self.snapshot_sweeps = np.zeros(0, dtype=int)
+        seed_sequence = np.random.SeedSequence(seed)
+        self.seed = seed_sequence.entropy
+        self.rng = np.random.default_rng(seed_sequence)
+        dtype = np.min_scalar_type(len(ruleset) - 1)
+        if grid is None:
+            grid = self.rng.integers(len(ruleset), size=shape, dtype=dtype)
+        else:
+            grid = np.asarray(grid)
+            if grid.ndim != 2 or grid.dtype.kind not in "iu":
+                raise ValueError("grid must be a 2D array of move indices")
+            if grid.size and (grid.min() < 0 or grid.max() >= len(ruleset)):
+                raise ValueError(f"Move indices must be between 0 and {len(ruleset) - 1}")
+            grid = grid.astype(dtype)
+        self.grid = grid
+        num_objects = len(ruleset)
+        if num_objects <= LARGE_RULESET:
+            # invaded_by[i * n + j] is True if move index j beats move index i, so invasions are found by one lookup
+            self._invaded_by = np.ascontiguousarray(ruleset.win_matrix.T).ravel()
+            self._index = np.empty(grid.shape, dtype=np.min_scalar_type(num_objects * num_objects - 1))
+        # Reused by every sweep, rather than allocating new lattices each time
+        self._neighbours = np.empty_like(grid)
+        self._mask = np.empty_like(grid)
+        self._selected = np.empty(grid.shape, dtype=bool)
+
+    @property
+    def shape(self):
+        return self.grid.shape
+
+    def densities(self):
+        """ Returns the fraction of cells holding each move, indexed by move index """
+        return np.bincount(self.grid.ravel(), minlength=len(self.ruleset)) / self.grid.size
+
+    def _set_mask(self, selected):
+        """ Sets _mask to all ones where selected is True and zeros elsewhere, for blending lattices with & and | """
+        np.subtract(0, selected, out=self._mask, dtype=self._mask.dtype)
+        return self._mask
+
+    def neighbours(self):
+        """ Returns the move of the neighbour that each cell looks at in this sweep, chosen at random for each cell """
+        directions = self.rng.integers(len(self.neighbourhood), size=self.grid.shape, dtype=np.uint8)
+        neighbours = self._neighbours
+        neighbours.fill(0)
+        for direction, (rows, columns) in enumerate(self.neighbourhood):
+            rolled = np.roll(self.grid, (-rows, -columns), axis=(0, 1))
+            np.equal(directions, direction, out=self._selected)
+            rolled &= self._set_mask(self._selected)
+            neighbours |= rolled
+        return neighbours
+
+    def sweep(self):
+        """ Updates every cell once """
+        neighbours = self.neighbours()
+        if len(self.ruleset) <= LARGE_RULESET:
+            index = np.multiply(self.grid, len(self.ruleset), out=self._index, dtype=self._index.dtype)
+            index += neighbours
+            invaded = self._invaded_by.take(index)
+        else:
+            invaded = self.ruleset.beats(neighbours, self.grid)
+        if self.rate < 1:
+            invaded &= self.rng.random(self.grid.shape, dtype=np.float32) < self.rate
+        # grid ^ (grid ^ neighbours) is the neighbour's move, so this swaps in the moves of the invaded cells
+        neighbours ^= self.grid
+        neighbours &= self._set_mask(invaded)
+        self.grid ^= neighbours
+        self.sweeps += 1
+
+    def run(self, sweeps, snapshot_every=None, path=None):
+        """
+        Runs a number of sweeps, taking a snapshot of the lattice before the first sweep, after every
+        snapshot_every sweeps and after the last sweep (by default only at the start and end)
+
+        The number of sweeps the lattice had run at each snapshot is stored in snapshot_sweeps.
+
+        Parameters
+        ----------
+            sweeps: int
+            snapshot_every: int (opt)
+            path: str or Path (opt)
+                a .npy file that the snapshots are written to as they are taken, with shape
+                (num_snapshots, rows, columns) - read it with load_snapshots
+
+        Returns
+        -------
+            numpy.ndarray
+                the densities of the moves at each snapshot, with shape (num_snapshots, num_objects)
+        """
+        if snapshot_every is None:
+            snapshot_every = max(sweeps, 1)
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be at least 1")
+        # Sweeps run before each snapshot, with a last snapshot at the end if it doesn't fall on snapshot_every
+        offsets = list(range(0, sweeps + 1, snapshot_every))
+        if offsets[-1] != sweeps:
+            offsets.append(sweeps)
+        snapshots = None
+        if path is not None:
+            snapshots = np.lib.format.open_memmap(path, mode='w+', dtype=self.grid.dtype,
+                                                  shape=(len(offsets),) + self.grid.shape)
+        densities = np.empty((len(offsets), len(self.ruleset)))
+        self.snapshot_sweeps = np.array(offsets) + self.sweeps
+        previous = 0
+        for snapshot, offset in enumerate(offsets):
+            for _ in range(offset - previous):
+                self.sweep()
+            previous = offset
+            densities[snapshot] = self.densities()
+            if snapshots is not None:
+                snapshots[snapshot] = self.grid
+        if snapshots is not None:
+            snapshots.flush()
+            del snapshots
+        return densities
+
+
+def load_snapshots(path):
+    """ Returns the snapshots written by Lattice.run as a read-only memory map """
+    return np.load(path, mmap_mode='r')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate rock-paper-scissors ecology on a lattice")
+    parser.add_argument('--size', type=int, default=512, help="the number of rows and columns")
+    parser.add_argument('--sweeps', type=int, default=1000)
+    parser.add_argument('--rules', default='RPSLS')
+    parser.add_argument('--rate', type=float, default=1.0, help="the probability that an invasion succeeds")
+    parser.add_argument('--moore', action='store_true', help="cells choose from 8 neighbours instead of 4")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--snapshot-every', type=int, help="sweeps between snapshots")
+    parser.add_argument('--output', help=".npy file to save the snapshots to")
+    args = parser.parse_args()
+
+    rulesets = {**RULESETS, **load_rulesets()}
+    lattice = Lattice(rulesets[args.rules], (args.size, args.size), rate=args.rate,
+                      neighbourhood=MOORE if args.moore else VON_NEUMANN, seed=args.seed)
+    start = time.perf_counter()
+    densities = lattice.run(args.sweeps, args.snapshot_every, args.output)
+    elapsed = time.perf_counter() - start
+    print(f"{args.sweeps} sweeps of {args.size} x {args.size} cells in {elapsed:.1f}s (seed {lattice.seed})")
+    for sweep, row in zip(lattice.snapshot_sweeps.tolist(), densities):
+        print(f"{sweep:>6}: " + "  ".join(f"{name} {density:.3f}"
+                                             for name, density in zip(lattice.ruleset.allowable_objects, row)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Module contains a load generator for the game server, which reports throughput and round latency.
+...
+Thousands of simulated clients (choosing moves like a ComputerPlayer) play complete games against a server on
+localhost. The latency of a round is the time from a client sending its move to receiving the round report.
+Latencies are recorded in an HDR-style histogram, and the results are printed and saved as JSON so that runs on
+different builds can be compared.
+
+Run from the command line, e.g.
+    python load_test.py --clients 2000 --rounds 20 --output summary.json
+
+Classes
+-------
+    LatencyHistogram
+    LoadClient (subclass of GameClient)
+    LoadGenerator
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from game_client import GameClient
+from game_server import DEFAULT_HOST, GameServer
+
+PERCENTILES = {'p50': 50.0, 'p95': 95.0, 'p99': 99.0, 'p999': 99.9}
+
+
+class LatencyHistogram:
+    """
+    A histogram of integer values (microseconds) with a fixed relative precision, in the style of HdrHistogram
+    ...
+    Values below 2 ** significant_bits are counted exactly. Larger values share buckets whose width grows with
+    the value, so every value is recorded to within 1 part in 2 ** (significant_bits - 1).
+
+    Attributes
+    ----------
+        significant_bits: int
+        max_value: int
+            larger values are recorded as max_value
+        counts: list
+            the count for each bucket
+        total_count: int
+        min: int or None
+        max: int or None
+    """
+
+    def __init__(self, significant_bits=8, max_value=3_600_000_000):
+        self.significant_bits = significant_bits
+        self.max_value = max_value
+        self._sub_buckets = 1 << significant_bits
+        self._half = self._sub_buckets >> 1
+        self.counts = [0] * (self.bucket_index(max_value) + 1)
+        self.total_count = 0
+        self._total = 0
+        self.min = None
+        self.max = None
+
+    def bucket_index(self, value):
+        """ Returns the index of the bucket that value is counted in """
+        if value < self._sub_buckets:
+            return value
+        shift = value.bit_length() - self.significant_bits
+        return self._sub_buckets + (shift - 1) * self._half + (value >> shift) - self._half
+
+    def bucket_value(self, index):
+        """ Returns the highest value counted in the bucket with the given index """
+        if index < self._sub_buckets:
+            return index
+        shift = (index - self._sub_buckets) // self._half + 1
+        mantissa = (index - self._sub_buckets) % self._half + self._half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        """ Records a value - negative values are recorded as 0 """
+        value = min(max(int(value), 0), self.max_value)
+        self.counts[self.bucket_index(value)] += 1
+        self.total_count += 1
+        self._total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """ Adds the values recorded in another histogram with the same settings """
+        if (other.significant_bits, other.max_value) != (self.significant_bits, self.max_value):
+            raise ValueError("Histograms must have the same significant_bits and max_value")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total_count += other.total_count
+        self._total += other._total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def mean(self):
+        return self._total / self.total_count if self.total_count else 0.0
+
+    def value_at_percentile(self, percentile):
+        """ Returns the value that percentile % of the recorded values are less than or equal to """
+        if not self.total_count:
+            return 0
+        target = max(1, -(-self.total_count * percentile // 100))
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return min(self.bucket_value(index), self.max)
+        return self.max
+
+    def summary(self):
+        """ Returns a dict of the count, min, mean, max and percentiles """
+        summary = {'count': self.total_count,
+                   'min': self.min or 0,
+                   'mean': round(self.mean(), 1),
+                   'max': self.max or 0,
+                   }
+        summary.update({name: self.value_at_percentile(p) for name, p in PERCENTILES.items()})
+        return summary
+
+
+class LoadClient(GameClient):
+    """ A client that records the latency of each of its rounds in a shared histogram """
+
+    def __init__(self, name, histogram, **kwargs):
+        super().__init__(name, **kwargs)
+        self.histogram = histogram
+        self._move_sent = None
+
+    def choose_move(self, round_number):
+        move = super().choose_move(round_number)
+        self._move_sent = time.perf_counter()
+        return move
+
+    def on_message(self, command, argument):
+        if command == 'REPORT' and self._move_sent is not None:
+            self.histogram.record((time.perf_counter() - self._move_sent) * 1_000_000)
+            self._move_sent = None
+
+
+class LoadGenerator:
+    """
+    A class that runs many simulated clients against a server
+
+    Attributes
+    ----------
+        num_clients: int
+        rounds: int
+            rounds in each game
+        rules: str
+            a key of RULESETS
+        against_computer: bool
+            clients play the computer instead of each other
+        host, port:
+            the server to test - if port is None a server is started in this process
+        histogram: LatencyHistogram
+            round latencies in microseconds
+    """
+
+    def __init__(self, num_clients=1000, rounds=10, rules='RPSLS', against_computer=False, host=DEFAULT_HOST,
+                 port=None):
+        if not against_computer and num_clients % 2:
+            raise ValueError("Clients play each other, so num_clients must be even")
+        self.num_clients = num_clients
+        self.rounds = rounds
+        self.rules = rules
+        self.against_computer = against_computer
+        self.host = host
+        self.port = port
+        self.histogram = LatencyHistogram()
+
+    async def run_client(self, client):
+        """ Plays one client's game, returning True if it was completed """
+        await client.connect(self.host, self.port)
+        try:
+            result = await client.play()
+        finally:
+            await client.close()
+        return not result.startswith("Game abandoned")
+
+    async def run(self):
+        """ Runs every client to the end of its game and returns the summary """
+        server = None
+        if self.port is None:
+            server = GameServer(self.host, port=0)
+            await server.start()
+            self.port = server.port
+        clients = [LoadClient(f"Load{i}", self.histogram, rules=self.rules, rounds=self.rounds,
+                              against_computer=self.against_computer)
+                   for i in range(self.num_clients)]
+        start = time.perf_counter()
+        try:
+            completed = await asyncio.gather(*(self.run_client(client) for client in clients),
+                                             return_exceptions=True)
+        finally:
+            elapsed = time.perf_counter() - start
+            if server is not None:
+                await server.close()
+                self.port = None
+        return self.summary(completed, elapsed)
+
+    def summary(self, completed, elapsed):
+        """ Returns a JSON-serialisable summary of a run """
+        games_completed = sum(result is True for result in completed)
+        games_per_client = 1 if self.against_computer else 0.5
+        return {'clients': self.num_clients,
+                'rounds_per_game': self.rounds,
+                'rules': self.rules,
+                'against_computer': self.against_computer,
+                'client_errors': sum(isinstance(result, BaseException) for result in completed),
+                'games_completed': int(games_completed * games_per_client),
+                'elapsed_s': round(elapsed, 3),
+                'rounds_per_s': round(self.histogram.total_count * games_per_client / elapsed, 1),
+                'latency_us': self.histogram.summary(),
+                }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the rock-paper-scissors game server")
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--rules', default='RPSLS')
+    parser.add_argument('--computer', action='store_true', help="clients play the computer instead of each other")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, help="test a running server, instead of starting one")
+    parser.add_argument('--output', help="file to save the JSON summary to")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args.clients, args.rounds, args.rules, args.computer, args.host, args.port)
+    summary = asyncio.run(generator.run())
+    report = json.dumps(summary, indent=2, sort_keys=True)
+    print(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
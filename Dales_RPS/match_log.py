@@ -0,0 +1,232 @@
+"""
+Module contains an append-only binary log of two player matches, and tools to read and replay it.
+...
+A log file is a header followed by one fixed-width record per round.
+
+Header (little-endian)
+    magic        6 bytes   b'RPSLOG'
+    version      uint16
+    num_objects  uint32    the number of allowable objects in the ruleset
+    digest       32 bytes  Ruleset.digest, identifying the ruleset
+    seed         uint64    the seed the match was played with
+    names_size   uint16    the size of the player names that follow
+    names        JSON list of the two player names, UTF-8
+
+Record
+    move_a   uint16  move index played by players[0]
+    move_b   uint16  move index played by players[1]
+    outcome  int8    WIN, DRAW or LOSE for players[0]
+
+Records are buffered and written in batches. A reader memory-maps the file, so the moves and outcomes are NumPy
+views of the file rather than copies. A record cut short by a crash is ignored.
+
+Classes
+-------
+    MatchLogWriter
+    MatchLog
+
+Functions
+---------
+    replay
+"""
+import json
+import struct
+
+import numpy as np
+
+from game_objects import Game, WIN, LOSE
+
+MAGIC = b'RPSLOG'
+VERSION = 1
+HEADER = struct.Struct('<6sHI32sQH')
+RECORD = struct.Struct('<HHb')
+RECORD_DTYPE = np.dtype([('move_a', '<u2'), ('move_b', '<u2'), ('outcome', 'i1')])
+MAX_OBJECTS = 1 << 16
+
+
+def read_header(f):
+    """ Reads the header from the start of a log file - returns (num_objects, digest, seed, names, header_size) """
+    fixed = f.read(HEADER.size)
+    if len(fixed) < HEADER.size:
+        raise ValueError("File is too short to be a match log")
+    magic, version, num_objects, digest, seed, names_size = HEADER.unpack(fixed)
+    if magic != MAGIC:
+        raise ValueError("File is not a match log")
+    if version != VERSION:
+        raise ValueError(f"Unsupported match log version {version}")
+    names = json.loads(f.read(names_size).decode())
+    return num_objects, digest.hex(), seed, names, HEADER.size + names_size
+
+
+class MatchLogWriter:
+    """
+    A class that appends the rounds of a match to a log file
+    ...
+    If the file already exists, its header must be for the same ruleset and rounds are added to the end of it.
+    Use as a context manager, or call close, so that buffered rounds are written.
+
+    Attributes
+    ----------
+        path: str
+        ruleset: Ruleset
+        seed: int
+        player_names: list
+        buffer_rounds: int
+            the number of rounds buffered before they are written
+    """
+
+    def __init__(self, path, ruleset, seed=0, player_names=('', ''), buffer_rounds=65536):
+        if len(ruleset) > MAX_OBJECTS:
+            raise ValueError(f"Match logs support up to {MAX_OBJECTS} allowable objects")
+        self.path = path
+        self.ruleset = ruleset
+        self.seed = seed
+        self.player_names = list(player_names)
+        self.buffer_rounds = buffer_rounds
+        self._buffer = bytearray(buffer_rounds * RECORD.size)
+        self._buffered = 0
+        self._file = open(path, 'ab+')
+        try:
+            self._file.seek(0)
+            if self._file.read(1):
+                self._file.seek(0)
+                num_objects, digest, self.seed, self.player_names, header_size = read_header(self._file)
+                if digest != ruleset.digest:
+                    raise ValueError("Match log was written with a different ruleset")
+                # Drop a record cut short by a crash, so that new records stay aligned
+                size = self._file.seek(0, 2)
+                self._file.truncate(size - (size - header_size) % RECORD.size)
+            else:
+                names = json.dumps(self.player_names).encode()
+                self._file.write(HEADER.pack(MAGIC, VERSION, len(ruleset), bytes.fromhex(ruleset.digest), seed,
+                                             len(names)))
+                self._file.write(names)
+        except BaseException:
+            # A file that can't be appended to is closed again rather than leaked
+            self._file.close()
+            raise
+
+    @classmethod
+    def for_game(cls, path, game, seed=None, **kwargs):
+        """ Returns a writer for game's ruleset and players, and sets it as the game's log - seed defaults to the
+        game's seed (0 for a game without one), and must be given for a spawned or unseeded SeedSequence """
+        if seed is None:
+            seed = 0 if game.seed is None else game.seed
+        if isinstance(seed, np.random.SeedSequence):
+            if seed.spawn_key or not isinstance(seed.entropy, int) or seed.entropy >= 1 << 64:
+                raise ValueError("The game's SeedSequence doesn't fit in a match log - give the seed to record")
+            seed = seed.entropy
+        log = cls(path, game.ruleset, seed, [player.name for player in game.players[:2]], **kwargs)
+        game.set_log(log)
+        return log
+
+    def record(self, move_a, move_b, outcome):
+        """ Adds a round to the log """
+        RECORD.pack_into(self._buffer, self._buffered * RECORD.size, move_a, move_b, outcome)
+        self._buffered += 1
+        if self._buffered == self.buffer_rounds:
+            self.flush()
+
+    def record_batch(self, moves_a, moves_b, outcomes):
+        """ Adds a batch of rounds to the log from arrays of moves and outcomes """
+        records = np.empty(len(outcomes), dtype=RECORD_DTYPE)
+        records['move_a'] = moves_a
+        records['move_b'] = moves_b
+        records['outcome'] = outcomes
+        self.flush()
+        self._file.write(records.tobytes())
+
+    def flush(self):
+        """ Writes the buffered rounds to the file """
+        if self._buffered:
+            self._file.write(memoryview(self._buffer)[:self._buffered * RECORD.size])
+            self._buffered = 0
+        self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class MatchLog:
+    """
+    A class that reads a match log by memory-mapping it
+    ...
+    Attributes
+    ----------
+        path: str
+        num_objects: int
+        digest: str
+            Ruleset.digest of the ruleset the match was played under
+        seed: int
+        player_names: list
+        records: numpy.ndarray
+            read-only structured array of the records, mapped from the file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.num_objects, self.digest, self.seed, self.player_names, header_size = read_header(f)
+            size = f.seek(0, 2)
+        num_rounds = (size - header_size) // RECORD_DTYPE.itemsize
+        if num_rounds:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=header_size, shape=(num_rounds,))
+        else:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+
+    @property
+    def moves_a(self):
+        return self.records['move_a']
+
+    @property
+    def moves_b(self):
+        return self.records['move_b']
+
+    @property
+    def outcomes(self):
+        return self.records['outcome']
+
+    def scores(self, num_rounds=None):
+        """ Returns the scores of both players after num_rounds rounds (default all of them) """
+        outcomes = self.outcomes[:num_rounds]
+        return int(np.count_nonzero(outcomes == WIN)), int(np.count_nonzero(outcomes == LOSE))
+
+    def __len__(self):
+        return len(self.records)
+
+
+def replay(log, ruleset, num_rounds=None):
+    """
+    Returns a Game in the state it was in after num_rounds rounds of the logged match (default all of them)
+    """
+    if ruleset.digest != log.digest:
+        raise ValueError("Match log was written with a different ruleset")
+    if num_rounds is None:
+        num_rounds = len(log)
+    if not 0 <= num_rounds <= len(log):
+        raise ValueError(f"Log has {len(log)} rounds")
+    game = Game(ruleset=ruleset)
+    for name in log.player_names:
+        game.add_human_player(name)
+    moves_a = log.moves_a[:num_rounds]
+    moves_b = log.moves_b[:num_rounds]
+    game.play_rounds(moves_a, moves_b)
+    if num_rounds:
+        # Restore the last round, so that it can be reported
+        game.players[0].current_object = ruleset.objects[moves_a[-1]]
+        game.players[1].current_object = ruleset.objects[moves_b[-1]]
+        outcome = log.outcomes[num_rounds - 1]
+        if outcome == WIN:
+            game.round_result, game.round_winner = "win", game.players[0]
+        elif outcome == LOSE:
+            game.round_result, game.round_winner = "win", game.players[1]
+        else:
+            game.round_result = "draw"
+    return game
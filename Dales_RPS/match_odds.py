@@ -0,0 +1,136 @@
+"""
+Module calculates exact match outcome probabilities for two mixed strategies, instead of simulating many games.
+...
+A mixed strategy is a probability vector over a ruleset's allowable_objects, e.g. [1/3, 1/3, 1/3] for a
+ComputerPlayer under RPS rules. The chance of winning, drawing and losing a round follows from the ruleset's
+win_matrix, and the match outcome from dynamic programming over the scores.
+
+Every function is vectorised - strategies may be arrays of shape (..., num_objects), so thousands of pairs of
+strategies are evaluated at once. Results have a last axis of (WINS, DRAWS, LOSSES) for the first strategy, as in
+the Tournament cross table.
+
+Functions
+---------
+    check_strategies
+    round_probabilities
+    score_difference_distribution
+    fixed_rounds_probabilities
+    first_to_probabilities
+"""
+import numpy as np
+
+from game_objects import WINS, DRAWS, LOSSES
+
+
+def check_strategies(ruleset, *strategies):
+    """ Returns the strategies as float arrays, raising ValueError if any is not a probability vector """
+    arrays = []
+    for strategy in strategies:
+        strategy = np.asarray(strategy, dtype=np.float64)
+        if strategy.shape[-1:] != (len(ruleset),):
+            raise ValueError(f"Strategies must have a probability for each of the {len(ruleset)} allowable objects")
+        if (strategy < 0).any() or not np.allclose(strategy.sum(axis=-1), 1):
+            raise ValueError("Strategies must be non-negative and sum to 1")
+        arrays.append(strategy)
+    return arrays
+
+
+def round_probabilities(ruleset, strategy_a, strategy_b):
+    """
+    Returns the probabilities that strategy_a wins, draws and loses a round against strategy_b
+
+    Parameters
+    ----------
+        ruleset: Ruleset
+        strategy_a, strategy_b: array_like
+            probability vectors with shape (..., num_objects) - the leading axes are broadcast
+
+    Returns
+    -------
+        numpy.ndarray
+            shape (..., 3), indexed by WINS, DRAWS and LOSSES
+    """
+    strategy_a, strategy_b = check_strategies(ruleset, strategy_a, strategy_b)
+    wins = ruleset.win_matrix.astype(np.float64)
+    # P(win) = sum over i, j of a[i] * b[j] where i beats j, and P(lose) the same with the roles swapped
+    p_win = np.einsum('...i,ij,...j->...', strategy_a, wins, strategy_b)
+    p_lose = np.einsum('...i,ji,...j->...', strategy_a, wins, strategy_b)
+    probabilities = np.empty(np.broadcast_shapes(p_win.shape, p_lose.shape) + (3,))
+    probabilities[..., WINS] = p_win
+    probabilities[..., LOSSES] = p_lose
+    probabilities[..., DRAWS] = 1 - p_win - p_lose
+    return probabilities
+
+
+def score_difference_distribution(round_probs, rounds):
+    """
+    Returns the distribution of the first player's score minus the second's after a fixed number of rounds
+
+    round_probs has shape (..., 3) as returned by round_probabilities. The result has shape (..., 2 * rounds + 1),
+    where [..., rounds + d] is the probability that the difference is d. The DP is O(rounds ** 2) for each pair.
+    """
+    round_probs = np.asarray(round_probs, dtype=np.float64)
+    p_win, p_draw, p_lose = (round_probs[..., column] for column in (WINS, DRAWS, LOSSES))
+    # The difference is the first axis while the DP runs, so each update works on contiguous rows for every pair
+    distribution = np.zeros((2 * rounds + 1,) + round_probs.shape[:-1])
+    distribution[rounds] = 1
+    # After r rounds only differences in [-r, r] are possible, so each round only updates that band
+    for r in range(rounds):
+        band = distribution[rounds - r - 1:rounds + r + 2]
+        new = band * p_draw
+        new[1:] += band[:-1] * p_win
+        new[:-1] += band[1:] * p_lose
+        band[:] = new
+    return np.moveaxis(distribution, 0, -1)
+
+
+def fixed_rounds_probabilities(round_probs, rounds):
+    """
+    Returns the probabilities that the first player wins, draws and loses a match of a fixed number of rounds
+    (Game.max_rounds), where the winner is the player with the higher score
+
+    round_probs has shape (..., 3) as returned by round_probabilities, and so does the result
+    """
+    distribution = score_difference_distribution(round_probs, rounds)
+    probabilities = np.empty(distribution.shape[:-1] + (3,))
+    probabilities[..., WINS] = distribution[..., rounds + 1:].sum(axis=-1)
+    probabilities[..., DRAWS] = distribution[..., rounds]
+    probabilities[..., LOSSES] = distribution[..., :rounds].sum(axis=-1)
+    return probabilities
+
+
+def first_to_probabilities(round_probs, k):
+    """
+    Returns the probabilities that the first player wins, draws and loses a match that ends when a player has won
+    k rounds
+
+    Drawn rounds don't change the scores, so only the decisive rounds matter. The match is only drawn when neither
+    strategy can ever win a round. round_probs has shape (..., 3) as returned by round_probabilities, and so does the
+    result. The DP is O(k ** 2) for each pair.
+    """
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    round_probs = np.asarray(round_probs, dtype=np.float64)
+    decisive = round_probs[..., WINS] + round_probs[..., LOSSES]
+    never_ends = decisive <= 0
+    safe_decisive = np.where(never_ends, 1, decisive)
+    p_win = np.where(never_ends, 0, round_probs[..., WINS] / safe_decisive)[..., np.newaxis]
+    p_lose = np.where(never_ends, 0, round_probs[..., LOSSES] / safe_decisive)[..., np.newaxis]
+
+    # reach[..., i] is the probability of reaching i wins to j losses, where i + j is the number of decisive rounds
+    # played so far - the states are swept one anti-diagonal at a time
+    reach = np.zeros(round_probs.shape[:-1] + (k,))
+    reach[..., 0] = 1
+    probabilities = np.zeros(round_probs.shape[:-1] + (3,))
+    for played in range(2 * k - 1):
+        probabilities[..., WINS] += reach[..., k - 1] * p_win[..., 0]
+        i_lost = played - (k - 1)
+        if 0 <= i_lost < k:
+            probabilities[..., LOSSES] += reach[..., i_lost] * p_lose[..., 0]
+        new = reach * p_lose
+        new[..., 1:] += reach[..., :-1] * p_win
+        if 0 <= i_lost < k:
+            new[..., i_lost] = 0
+        reach = new
+    probabilities[..., DRAWS] = never_ends
+    return probabilities
@@ -0,0 +1,95 @@
+"""
+Module loads the images for the move buttons in the tkinter GUI.
+...
+Resizing the source images with Pillow is slow, so each resized image is saved in a cache directory, named by the
+move, the target size and the source file's modification time. On later launches the cached PNG is loaded straight
+into a tk.PhotoImage, without importing Pillow. Images are only loaded for the moves that are asked for, and paths
+are found from this file, so the current working directory doesn't matter.
+
+Classes
+-------
+    MoveImages
+"""
+import os
+import tkinter as tk
+from pathlib import Path
+
+IMAGE_DIR = Path(__file__).resolve().parent.parent / 'images'
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'rock-paper-scissors'
+IMAGE_SIZE = (64, 64)
+
+
+class MoveImages:
+    """
+    A class that loads resized move images, using a cache on disk
+
+    Attributes
+    ----------
+        size: tuple
+            (width, height) of the resized images
+        image_dir: Path
+            directory with a <move>.png for each move
+        cache_dir: Path
+            directory the resized images are cached in
+    """
+
+    def __init__(self, size=IMAGE_SIZE, image_dir=IMAGE_DIR, cache_dir=CACHE_DIR):
+        self.size = tuple(size)
+        self.image_dir = Path(image_dir)
+        self.cache_dir = Path(cache_dir)
+
+    def source_path(self, name):
+        """ Returns the path of the full size image for a move, or None if there isn't one """
+        path = self.image_dir / f'{name}.png'
+        return path if path.is_file() else None
+
+    def cache_path(self, name):
+        """ Returns the path the resized image for a move is cached at, or None if the move has no image """
+        source = self.source_path(name)
+        if source is None:
+            return None
+        width, height = self.size
+        return self.cache_dir / f'{name}-{width}x{height}-{source.stat().st_mtime_ns}.png'
+
+    def resize(self, name):
+        """ Returns the resized image for a move as PNG data - this is the only place Pillow is used """
+        from io import BytesIO
+        from PIL import Image
+
+        with Image.open(self.source_path(name)) as image:
+            resized = image.resize(self.size, resample=Image.LANCZOS)
+        data = BytesIO()
+        resized.save(data, format='PNG')
+        return data.getvalue()
+
+    def cached_image(self, name):
+        """
+        Returns the path of the resized image for a move, creating it if it isn't cached
+
+        Returns None if the move has no image or the cache can't be written to
+        """
+        path = self.cache_path(name)
+        if path is None or path.is_file():
+            return path
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Remove images cached from older versions of the source or at the same size
+            for stale in self.cache_dir.glob(f'{name}-{self.size[0]}x{self.size[1]}-*.png'):
+                stale.unlink()
+            # Write to a temporary file first, so that an interrupted write never leaves a broken image
+            temp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+            temp_path.write_bytes(self.resize(name))
+            temp_path.replace(path)
+        except OSError:
+            return None
+        return path
+
+    def photo_image(self, name, master=None):
+        """ Returns a tk.PhotoImage of the resized image for a move, or None if the move has no image """
+        path = self.cached_image(name)
+        if path is not None:
+            return tk.PhotoImage(master=master, file=str(path))
+        if self.source_path(name) is not None:
+            # The cache isn't writable, so resize in memory
+            return tk.PhotoImage(master=master, data=self.resize(name))
+        return None
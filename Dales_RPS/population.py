@@ -0,0 +1,272 @@
+"""
+Module models how a population of strategies evolves under a ruleset - with replicator dynamics and Moran processes.
+...
+The population is made of k types of player, each a mixed strategy over the ruleset's allowable_objects as in
+match_odds (a ComputerPlayer is the uniform strategy). By default the types are the pure strategies, one for each
+object. The expected payoff of type i against type j is strategy_payoffs[i, j], from the ruleset's payoff_matrix.
+
+Replicator dynamics is the deterministic limit of an infinite population - the share of each type grows in
+proportion to how much better than average it does. It is integrated with the fourth order Runge-Kutta method for
+an array of starting shares at once.
+
+A Moran process is a finite population of population_size players. Each step one player is chosen to reproduce, in
+proportion to its fitness exp(selection * payoff), where its payoff is the average against the rest of the
+population, and one is chosen at random to be replaced by the offspring. Many independent populations are run as one
+array computation. Most steps of a large population change nothing (the offspring replaces a player of its own type),
+so only the steps that change the population are simulated, and the number of steps skipped before each one is drawn
+from its geometric distribution - the results are the same as stepping one player at a time.
+
+Classes
+-------
+    MoranProcess
+    MoranResult
+
+Functions
+---------
+    strategy_payoffs
+    replicator_derivative
+    replicator_dynamics
+"""
+import numpy as np
+
+from match_odds import check_strategies
+
+
+def strategy_payoffs(ruleset, strategies=None):
+    """
+    Returns the (k, k) matrix of the expected payoff of each strategy against each other strategy
+
+    strategies has shape (k, num_objects) - each row a probability vector. By default the pure strategies are used,
+    so the result is the ruleset's payoff_matrix.
+    """
+    payoff = ruleset.payoff_matrix.astype(np.float64)
+    if strategies is None:
+        return payoff
+    strategies, = check_strategies(ruleset, strategies)
+    if strategies.ndim != 2:
+        raise ValueError("strategies must have shape (k, num_objects)")
+    return strategies @ payoff @ strategies.T
+
+
+def replicator_derivative(payoffs, shares):
+    """
+    Returns the rate of change of the shares of each type, x_i * (f_i - average f), where f = payoffs @ x
+
+    shares has shape (..., k), and so does the result
+    """
+    fitness = shares @ payoffs.T
+    average = (shares * fitness).sum(axis=-1, keepdims=True)
+    return shares * (fitness - average)
+
+
+def replicator_dynamics(ruleset, initial_shares, t_max, dt=0.01, record_every=1, strategies=None):
+    """
+    Integrates replicator dynamics from initial_shares up to time t_max
+
+    Parameters
+    ----------
+        ruleset: Ruleset
+        initial_shares: array_like
+            the starting share of each type, with shape (..., k) - the leading axes are a batch of starting points
+        t_max: float
+        dt: float
+            the time step of the Runge-Kutta method
+        record_every: int
+            the number of time steps between the shares that are returned
+        strategies: array_like (opt)
+            the mixed strategy of each type, with shape (k, num_objects) - the pure strategies by default
+
+    Returns
+    -------
+        tuple
+            (times, shares) - shares has shape (len(times), ..., k)
+    """
+    payoffs = strategy_payoffs(ruleset, strategies)
+    shares = np.array(initial_shares, dtype=np.float64)
+    if shares.shape[-1:] != (len(payoffs),):
+        raise ValueError(f"Shares must have a value for each of the {len(payoffs)} types")
+    if (shares < 0).any() or not np.allclose(shares.sum(axis=-1), 1):
+        raise ValueError("Shares must be non-negative and sum to 1")
+    if record_every < 1:
+        raise ValueError("record_every must be at least 1")
+    num_steps = int(round(t_max / dt))
+    recorded_steps = np.arange(0, num_steps + 1, record_every)
+    history = np.empty((len(recorded_steps),) + shares.shape)
+    history[0] = shares
+    for step in range(1, num_steps + 1):
+        k1 = replicator_derivative(payoffs, shares)
+        k2 = replicator_derivative(payoffs, shares + dt / 2 * k1)
+        k3 = replicator_derivative(payoffs, shares + dt / 2 * k2)
+        k4 = replicator_derivative(payoffs, shares + dt * k3)
+        shares += dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        # Rounding errors are kept from leaving the simplex
+        np.clip(shares, 0, None, out=shares)
+        shares /= shares.sum(axis=-1, keepdims=True)
+        if step % record_every == 0:
+            history[step // record_every] = shares
+    return recorded_steps * dt, history
+
+
+class MoranResult:
+    """
+    The outcome of running a batch of Moran processes
+
+    Attributes
+    ----------
+        counts: numpy.ndarray
+            the number of players of each type at the end, with shape (num_populations, k)
+        fixed_type: numpy.ndarray
+            the type that took over each population, or -1 if it hadn't when the run stopped
+        fixation_steps: numpy.ndarray
+            the number of Moran steps until each population was taken over, or the steps run if it wasn't
+        history: numpy.ndarray
+            the counts every record_every changes, with shape (num_records, num_populations, k)
+        history_steps: numpy.ndarray
+            the number of Moran steps taken by each population at each record, with shape
+            (num_records, num_populations)
+    """
+
+    def __init__(self, counts, fixed_type, fixation_steps, history, history_steps):
+        self.counts = counts
+        self.fixed_type = fixed_type
+        self.fixation_steps = fixation_steps
+        self.history = history
+        self.history_steps = history_steps
+
+    @property
+    def num_types(self):
+        return self.counts.shape[1]
+
+    def fixation_probabilities(self):
+        """ Returns the fraction of populations taken over by each type """
+        fixed = self.fixed_type[self.fixed_type >= 0]
+        return np.bincount(fixed, minlength=self.num_types) / len(self.fixed_type)
+
+    def mean_fixation_steps(self):
+        """ Returns the mean number of steps until a population was taken over, by the type that took it over """
+        fixed = self.fixed_type >= 0
+        totals = np.bincount(self.fixed_type[fixed], weights=self.fixation_steps[fixed], minlength=self.num_types)
+        counts = np.bincount(self.fixed_type[fixed], minlength=self.num_types)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return totals / counts
+
+
+class MoranProcess:
+    """
+    A class representing Moran processes for populations playing a ruleset
+
+    Attributes
+    ----------
+        ruleset: Ruleset
+        payoffs: numpy.ndarray
+            strategy_payoffs for the types of player
+        population_size: int
+        selection: float
+            the intensity of selection - 0 is neutral drift, where payoffs make no difference
+        seed: int
+            the root seed of the random numbers - drawn from the operating system if not given, so any run can be
+            repeated
+    """
+
+    def __init__(self, ruleset, strategies=None, population_size=100, selection=1.0, seed=None):
+        if population_size < 2:
+            raise ValueError("population_size must be at least 2")
+        self.ruleset = ruleset
+        self.payoffs = strategy_payoffs(ruleset, strategies)
+        self.population_size = population_size
+        self.selection = selection
+        seed_sequence = np.random.SeedSequence(seed)
+        self.seed = seed_sequence.entropy
+        self.rng = np.random.default_rng(seed_sequence)
+
+    @property
+    def num_types(self):
+        return len(self.payoffs)
+
+    def fitness(self, counts):
+        """ Returns the fitness of a player of each type, for counts with shape (..., k) """
+        # Each player plays every other player in the population, but not itself
+        payoffs = (counts @ self.payoffs.T - np.diagonal(self.payoffs)) / (self.population_size - 1)
+        return np.exp(self.selection * payoffs)
+
+    def check_counts(self, initial_counts, num_populations=None):
+        """ Returns the initial counts as an int64 array of shape (num_populations, k) """
+        counts = np.asarray(initial_counts)
+        if counts.dtype.kind not in "iu" or counts.shape[-1:] != (self.num_types,) or counts.ndim > 2:
+            raise ValueError(f"Counts must be integers with shape (num_populations, {self.num_types})")
+        if (counts < 0).any() or (counts.sum(axis=-1) != self.population_size).any():
+            raise ValueError(f"Counts must be non-negative and sum to the population size {self.population_size}")
+        if counts.ndim == 1:
+            counts = np.broadcast_to(counts, (1 if num_populations is None else num_populations, self.num_types))
+        elif num_populations is not None and num_populations != len(counts):
+            raise ValueError("num_populations doesn't match the counts")
+        return counts.astype(np.int64)
+
+    def run(self, initial_counts, num_populations=None, max_changes=None, record_every=None):
+        """
+        Runs Moran processes until every population has been taken over by one type
+
+        Parameters
+        ----------
+            initial_counts: array_like
+                the number of players of each type, with shape (num_populations, k), or shape (k,) to start
+                num_populations populations the same way
+            num_populations: int (opt)
+            max_changes: int (opt)
+                the most changes to run before stopping, whether or not every population has been taken over -
+                10 * population_size ** 2 by default
+            record_every: int (opt)
+                the number of changes between records of the history - by default only the start and end are recorded
+
+        Returns
+        -------
+            MoranResult
+        """
+        counts = self.check_counts(initial_counts, num_populations)
+        num_populations = len(counts)
+        size = self.population_size
+        if max_changes is None:
+            max_changes = 10 * size ** 2
+        steps = np.zeros(num_populations, dtype=np.int64)
+        history = [counts.copy()]
+        history_steps = [steps.copy()]
+        # off_diagonal[i, j] is True when a type i offspring replacing a type j player changes the population
+        off_diagonal = ~np.eye(self.num_types, dtype=bool)
+        # Only the populations that haven't been taken over are stepped - they are copied out of counts and steps,
+        # and written back when some are taken over, so the arrays shrink as the run goes on
+        live = np.flatnonzero((counts < size).all(axis=1))
+        live_counts, live_steps = counts[live], steps[live]
+
+        change = 0
+        while len(live) and change < max_changes:
+            change += 1
+            births = live_counts * self.fitness(live_counts)
+            births /= births.sum(axis=1, keepdims=True)
+            deaths = live_counts / size
+            # The probability of each (birth, death) pair of types, and of the step changing the population at all
+            pairs = (births[:, :, np.newaxis] * deaths[:, np.newaxis, :] * off_diagonal).reshape(len(live), -1)
+            p_change = pairs.sum(axis=1)
+            live_steps += self.rng.geometric(p_change)
+            targets = self.rng.random(len(live)) * p_change
+            chosen = np.minimum((np.cumsum(pairs, axis=1) < targets[:, np.newaxis]).sum(axis=1), pairs.shape[1] - 1)
+            birth, death = np.divmod(chosen, self.num_types)
+            rows = np.arange(len(live))
+            live_counts[rows, birth] += 1
+            live_counts[rows, death] -= 1
+
+            taken_over = live_counts[rows, birth] == size
+            recording = record_every is not None and change % record_every == 0
+            if taken_over.any() or recording:
+                counts[live], steps[live] = live_counts, live_steps
+            if recording:
+                history.append(counts.copy())
+                history_steps.append(steps.copy())
+            if taken_over.any():
+                live, live_counts, live_steps = live[~taken_over], live_counts[~taken_over], live_steps[~taken_over]
+
+        counts[live], steps[live] = live_counts, live_steps
+        fixed_type = np.where((counts == size).any(axis=1), counts.argmax(axis=1), -1)
+        if record_every is None or change % record_every:
+            history.append(counts.copy())
+            history_steps.append(steps.copy())
+        return MoranResult(counts, fixed_type, steps, np.array(history), np.array(history_steps))
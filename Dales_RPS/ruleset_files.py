@@ -0,0 +1,229 @@
+"""
+Module loads rulesets from definition files in a rules directory, so new variants don't need code changes.
+...
+A definition is a JSON (.json) or TOML (.toml) file with a list of objects in move index order, and either a table of
+what each object beats or cyclic = true for a balanced cyclic ruleset (see cyclic_rulesets). The name defaults to the
+file name without its suffix.
+
+    name = "RPS-7"
+    objects = ["rock", "fire", "scissors", "sponge", "paper", "air", "water"]
+    cyclic = true
+
+    {"name": "RPS", "objects": ["rock", "paper", "scissors"],
+     "wins": {"rock": ["scissors"], "paper": ["rock"], "scissors": ["paper"]}}
+
+The first time a definition is loaded it is validated - every object is known and listed once, no object beats
+itself and no two objects beat each other, so the rules are the same for both players - and compiled into a packed
+bit matrix (Ruleset.win_bits). The bits are saved in a cache directory, named by a hash of the file's content, and
+later loads read them straight into a Ruleset without validating again. Editing a file changes its hash, so it is
+compiled again. A server loading dozens of variants at start up only pays the compile cost the first time.
+
+Classes
+-------
+    BalanceReport
+
+Functions
+---------
+    read_definition
+    compile_definition
+    cache_key
+    load_ruleset
+    rule_files
+    load_rulesets
+    check_rulesets
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from game_objects import Ruleset
+from cyclic_rulesets import cyclic_win_bits, win_counts, loss_counts, is_balanced
+
+RULES_DIR = Path(__file__).resolve().parent.parent / 'rules'
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'rock-paper-scissors' / 'rules'
+RULE_SUFFIXES = ('.json', '.toml')
+# Changing how definitions are compiled must change this, so that old cache files are not used
+CACHE_VERSION = 2
+
+
+class BalanceReport:
+    """
+    A report of how balanced a ruleset is - in a balanced ruleset every object beats as many objects as beat it
+
+    Attributes
+    ----------
+        name: str
+        ruleset: Ruleset
+        wins: dict
+            the number of objects each object beats, keyed by object
+        losses: dict
+            the number of objects each object loses to, keyed by object
+        drawn_pairs: int
+            the number of pairs of different objects that draw
+        is_balanced: bool
+            True if every object beats (n - 1) / 2 objects and loses to (n - 1) / 2, so no round is drawn
+    """
+
+    def __init__(self, name, ruleset):
+        self.name = name
+        self.ruleset = ruleset
+        wins = win_counts(ruleset)
+        losses = loss_counts(ruleset)
+        self.wins = dict(zip(ruleset.allowable_objects, wins.tolist()))
+        self.losses = dict(zip(ruleset.allowable_objects, losses.tolist()))
+        num_objects = len(ruleset)
+        self.drawn_pairs = num_objects * (num_objects - 1) // 2 - int(wins.sum())
+        self.is_balanced = bool(is_balanced(ruleset))
+
+    def __str__(self):
+        lines = [f"{self.name}: {len(self.ruleset)} objects, "
+                 f"{'balanced' if self.is_balanced else 'not balanced'}, {self.drawn_pairs} drawn pairs"]
+        for obj in self.ruleset.allowable_objects:
+            lines.append(f"    {obj}: beats {self.wins[obj]}, loses to {self.losses[obj]}")
+        return "\n".join(lines)
+
+
+def read_definition(path, content=None):
+    """ Returns the definition in a .json or .toml file as a dict - content is the file's bytes, if already read """
+    path = Path(path)
+    if path.suffix not in RULE_SUFFIXES:
+        raise ValueError(f"Rule files must end in {' or '.join(RULE_SUFFIXES)}")
+    if content is None:
+        content = path.read_bytes()
+    if path.suffix == '.json':
+        definition = json.loads(content)
+    else:
+        # Only imported for TOML files - tomllib is in the standard library from Python 3.11, tomli before that
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        definition = tomllib.loads(content.decode('utf-8'))
+    if not isinstance(definition, dict):
+        raise ValueError(f"{path.name} must hold a table of rules")
+    return definition
+
+
+def compile_definition(definition, default_name=None):
+    """
+    Validates a definition and compiles it into a Ruleset
+
+    Every problem found is reported in one ValueError, rather than only the first.
+
+    Returns
+    -------
+        tuple
+            (name, ruleset)
+    """
+    name = definition.get('name', default_name)
+    objects = definition.get('objects')
+    if not isinstance(name, str) or not name:
+        raise ValueError("Rules must have a name")
+    if (not isinstance(objects, list) or len(objects) < 2 or
+            not all(isinstance(obj, str) and obj and not obj.isspace() for obj in objects)):
+        raise ValueError(f"{name}: objects must be a list of at least two names")
+    errors = [f"{obj} is listed more than once" for obj in sorted({obj for obj in objects if objects.count(obj) > 1})]
+
+    if definition.get('cyclic', False):
+        if 'wins' in definition:
+            errors.append("give either wins or cyclic = true, not both")
+        elif len(objects) % 2 == 0:
+            errors.append("cyclic rules need an odd number of objects")
+        if errors:
+            raise ValueError(f"{name}: " + "; ".join(errors))
+        return name, Ruleset(objects, win_bits=cyclic_win_bits(len(objects)), check=False)
+
+    wins = definition.get('wins')
+    if not isinstance(wins, dict):
+        raise ValueError(f"{name}: rules must have a wins table, or cyclic = true")
+    object_index = {obj: i for i, obj in enumerate(objects)}
+    win_matrix = np.zeros((len(objects), len(objects)), dtype=bool)
+    for winner, losers in wins.items():
+        if winner not in object_index:
+            errors.append(f"{winner} is not one of the objects")
+        elif not isinstance(losers, list):
+            errors.append(f"what {winner} beats must be a list")
+        else:
+            for loser in losers:
+                if loser in object_index:
+                    win_matrix[object_index[winner], object_index[loser]] = True
+                else:
+                    errors.append(f"{winner} beats {loser}, which is not one of the objects")
+    for i in np.flatnonzero(win_matrix.diagonal()):
+        errors.append(f"{objects[i]} beats itself")
+    for i, j in zip(*np.nonzero(np.triu(win_matrix & win_matrix.T, 1))):
+        errors.append(f"{objects[i]} and {objects[j]} beat each other")
+    if errors:
+        raise ValueError(f"{name}: " + "; ".join(errors))
+    return name, Ruleset(objects, win_bits=np.packbits(win_matrix, axis=1), check=False)
+
+
+def cache_key(content):
+    """ Returns the name of the cache file for the content of a definition file """
+    return hashlib.sha256(CACHE_VERSION.to_bytes(4, 'little') + content).hexdigest()
+
+
+def load_ruleset(path, cache_dir=CACHE_DIR):
+    """
+    Returns (name, ruleset) for a definition file, from the compiled cache if the file has been loaded before
+
+    cache_dir may be None to always validate and compile the definition.
+    """
+    path = Path(path)
+    content = path.read_bytes()
+    cache_path = None if cache_dir is None else Path(cache_dir) / f"{cache_key(content)}.npz"
+    if cache_path is not None and cache_path.exists():
+        try:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                name, objects, win_bits = str(cached['name']), cached['objects'].tolist(), cached['win_bits']
+            # The bits aren't checked again, but a damaged file could still hold an array of the wrong shape
+            if win_bits.dtype == np.uint8 and win_bits.shape == (len(objects), (len(objects) + 7) // 8):
+                return name or path.stem, Ruleset(objects, win_bits=win_bits, check=False)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            pass
+        # A damaged cache file is compiled again and replaced
+
+    definition = read_definition(path, content)
+    name, ruleset = compile_definition(definition, path.stem)
+    if cache_path is not None:
+        # A name taken from the file name isn't cached, as files with the same content can have different names
+        cached_name = name if 'name' in definition else ''
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file and renamed, so servers starting at the same time never read half a file
+        with tempfile.NamedTemporaryFile(dir=cache_path.parent, suffix='.tmp', delete=False) as f:
+            np.savez(f, name=np.array(cached_name), objects=np.array(ruleset.allowable_objects),
+                     win_bits=ruleset.win_bits)
+        os.replace(f.name, cache_path)
+    return name, ruleset
+
+
+def rule_files(rules_dir=RULES_DIR):
+    """ Returns the definition files in a rules directory, sorted by file name """
+    return sorted(path for path in Path(rules_dir).iterdir() if path.suffix in RULE_SUFFIXES)
+
+
+def load_rulesets(rules_dir=RULES_DIR, cache_dir=CACHE_DIR):
+    """ Returns a dict of every ruleset defined in a rules directory, keyed by name """
+    rulesets = {}
+    for path in rule_files(rules_dir):
+        name, ruleset = load_ruleset(path, cache_dir)
+        if name in rulesets:
+            raise ValueError(f"{path.name}: there is already a ruleset called {name}")
+        rulesets[name] = ruleset
+    return rulesets
+
+
+def check_rulesets(rules_dir=RULES_DIR):
+    """ Validates every definition in a rules directory, without the cache, and returns a BalanceReport for each """
+    return [BalanceReport(*load_ruleset(path, cache_dir=None)) for path in rule_files(rules_dir)]
+
+
+if __name__ == "__main__":
+    for report in check_rulesets():
+        print(report)
+        print()
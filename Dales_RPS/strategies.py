@@ -0,0 +1,184 @@
+"""
+Module contains computer strategies that learn from their opponent's moves.
+...
+Each strategy is a subclass of ComputerPlayer, so it can be added to any Game (including RPSLS or custom rulesets)
+and used in a Tournament. The models are updated incrementally by Game through the observe hook after every round,
+so choosing an object never rescans the history.
+
+Classes
+-------
+    LearningPlayer (subclass of ComputerPlayer)
+    FrequencyPlayer (subclass of LearningPlayer)
+    MarkovPlayer (subclass of LearningPlayer)
+    LookupTablePlayer (subclass of ComputerPlayer)
+"""
+from abc import ABC, abstractmethod
+
+from game_objects import ComputerPlayer, PlayerObject, RPSLS_RULES
+
+
+class LearningPlayer(ComputerPlayer, ABC):
+    """
+    Base class for strategies that predict the opponent's next move and play something that beats it
+    ...
+    Subclasses implement reset_model, update_model and predict.
+    """
+
+    def set_ruleset(self, ruleset):
+        """ Sets the rules the player plays under and starts a new model """
+        super().set_ruleset(ruleset)
+        self.reset_model()
+
+    @abstractmethod
+    def reset_model(self):
+        """ Clears everything learnt about the opponent """
+
+    @abstractmethod
+    def update_model(self, opponent_move):
+        """ Updates the model with the opponent's latest move index """
+
+    @abstractmethod
+    def predict(self):
+        """ Returns the move index the opponent is most likely to play next, or None if there is no prediction """
+
+    def observe(self, own_move, opponent_move):
+        """ Learns from the opponent's move in the last round """
+        self.update_model(opponent_move)
+
+    def observe_batch(self, own_moves, opponent_moves):
+        """ Learns from the opponent's moves in a batch of rounds """
+        for opponent_move in opponent_moves.tolist():
+            self.update_model(opponent_move)
+
+    def best_response(self, move):
+        """ Returns a random PlayerObject from those that beat the given move index """
+        winning_moves = self.ruleset.beaten_by[move]
+        if not winning_moves:
+            return PlayerObject.random_object(self.ruleset, self.rng)
+        return self.ruleset.objects[self.rng.choice(winning_moves)]
+
+    def choose_object(self, ruleset=None):
+        """ Plays the best response to the predicted move, or a random object if there is no prediction """
+        if ruleset is not None and ruleset != self.ruleset:
+            self.set_ruleset(ruleset)
+        predicted = self.predict()
+        if predicted is None:
+            self.current_object = PlayerObject.random_object(self.ruleset, self.rng)
+        else:
+            self.current_object = self.best_response(predicted)
+
+
+class FrequencyPlayer(LearningPlayer):
+    """
+    Strategy that expects the opponent to play the move they have played most often
+    ...
+    Attributes
+    ----------
+    counts: list
+        counts[i] is the number of times the opponent has played move index i
+    """
+
+    def reset_model(self):
+        self.counts = [0] * len(self.ruleset)
+        self._most_common = None
+
+    def update_model(self, opponent_move):
+        self.counts[opponent_move] += 1
+        # Counts only go up, so the most common move can be kept up to date in O(1)
+        if self._most_common is None or self.counts[opponent_move] > self.counts[self._most_common]:
+            self._most_common = opponent_move
+
+    def predict(self):
+        return self._most_common
+
+
+class MarkovPlayer(LearningPlayer):
+    """
+    Strategy that predicts the opponent's next move from the order moves they played before it
+    ...
+    The last order moves are packed into a single integer context, which is rolled forward with each move.
+    For each context seen, the model keeps counts of the move that followed and which of those is most common.
+
+    Attributes
+    ----------
+    order: int (class attribute)
+        the number of previous moves used to predict the next one
+    transitions: dict
+        keys are contexts, values are lists of counts of the move played next
+    """
+    order = 1
+
+    def reset_model(self):
+        self.transitions = {}
+        self._most_common = {}
+        self._context = 0
+        self._context_size = len(self.ruleset) ** self.order
+        self._moves_seen = 0
+
+    def update_model(self, opponent_move):
+        if self._moves_seen >= self.order:
+            counts = self.transitions.get(self._context)
+            if counts is None:
+                counts = self.transitions[self._context] = [0] * len(self.ruleset)
+            counts[opponent_move] += 1
+            most_common = self._most_common.get(self._context)
+            if most_common is None or counts[opponent_move] > counts[most_common]:
+                self._most_common[self._context] = opponent_move
+        self._context = (self._context * len(self.ruleset) + opponent_move) % self._context_size
+        self._moves_seen += 1
+
+    def predict(self):
+        if self._moves_seen < self.order:
+            return None
+        return self._most_common.get(self._context)
+
+
+class LookupTablePlayer(ComputerPlayer):
+    """
+    Strategy that plays a fixed response to the opponent's last order moves, looked up in a table
+    ...
+    The last order moves are packed into a context as in MarkovPlayer, and the table holds the move index to play in
+    each context. Until order moves have been seen the player chooses at random. The tables are what the evolution
+    module evolves - use functools.partial(LookupTablePlayer, table, order, ruleset) as a strategy in a Tournament.
+
+    Attributes
+    ----------
+    table: tuple
+        table[context] is the move index played in that context - it has len(ruleset) ** order entries
+    order: int
+        the number of the opponent's previous moves the response depends on
+    """
+
+    def __init__(self, table, order=1, ruleset=RPSLS_RULES, rng=None):
+        self.table = tuple(int(move) for move in table)
+        self.order = order
+        super().__init__(ruleset, rng)
+
+    def set_ruleset(self, ruleset):
+        """ Sets the rules the player plays under - the table must have an entry for every context """
+        if len(self.table) != len(ruleset) ** self.order:
+            raise ValueError(f"The table must have {len(ruleset) ** self.order} entries for order {self.order} "
+                             f"under these rules")
+        if min(self.table) < 0 or max(self.table) >= len(ruleset):
+            raise ValueError(f"Table entries must be move indices between 0 and {len(ruleset) - 1}")
+        super().set_ruleset(ruleset)
+        self._context = 0
+        self._context_size = len(ruleset) ** self.order
+        self._moves_seen = 0
+
+    def observe(self, own_move, opponent_move):
+        self._context = (self._context * len(self.ruleset) + opponent_move) % self._context_size
+        self._moves_seen += 1
+
+    def observe_batch(self, own_moves, opponent_moves):
+        for opponent_move in opponent_moves.tolist():
+            self.observe(None, opponent_move)
+
+    def choose_object(self, ruleset=None):
+        """ Plays the table's move for the opponent's last order moves, or a random object before then """
+        if ruleset is not None and ruleset != self.ruleset:
+            self.set_ruleset(ruleset)
+        if self._moves_seen < self.order:
+            self.current_object = PlayerObject.random_object(self.ruleset, self.rng)
+        else:
+            self.current_object = self.ruleset.objects[self.table[self._context]]
@@ -0,0 +1,52 @@
+from game_objects import Game, Ruleset, RPS_WIN_DICT, RPSLS_RULES, RPS_OBJECTS, WIN, LOSE
+from cyclic_rulesets import cyclic_win_bits, cyclic_ruleset, win_counts, loss_counts, is_balanced
+import numpy as np
+import pytest
+
+
+class TestCyclicRulesets:
+    def test_rock_paper_scissors(self):
+        assert cyclic_ruleset(3, ['rock', 'scissors', 'paper']) == Ruleset(['rock', 'scissors', 'paper'],
+                                                                           RPS_WIN_DICT)
+
+    @pytest.mark.parametrize("num_objects", [5, 7, 15, 101])
+    def test_matches_win_dict(self, num_objects):
+        ruleset = cyclic_ruleset(num_objects)
+        names = ruleset.allowable_objects
+        win_dict = {name: [names[(i + j) % num_objects] for j in range(1, (num_objects + 1) // 2)]
+                    for i, name in enumerate(names)}
+        assert ruleset == Ruleset(names, win_dict)
+        assert ruleset.win_matrix.sum(axis=1).tolist() == [(num_objects - 1) // 2] * num_objects
+
+    @pytest.mark.parametrize("num_objects", [1, 2, 4, 100])
+    def test_odd_only(self, num_objects):
+        with pytest.raises(ValueError):
+            cyclic_win_bits(num_objects)
+
+    def test_counts(self):
+        ruleset = Ruleset(RPS_OBJECTS + ('well',), {'rock': ['scissors'], 'paper': ['rock', 'well'],
+                                                    'scissors': ['paper'], 'well': ['rock', 'scissors']})
+        assert win_counts(ruleset).tolist() == [1, 2, 1, 2]
+        assert loss_counts(ruleset).tolist() == [2, 1, 2, 1]
+        assert not is_balanced(ruleset)
+        assert is_balanced(RPSLS_RULES)
+
+    def test_large(self):
+        ruleset = cyclic_ruleset(10001)
+        assert ruleset.win_bits.nbytes == 10001 * 1251
+        assert is_balanced(ruleset)
+        game = Game(ruleset=ruleset)
+        game.add_human_player()
+        game.add_computer_player()
+        assert game.play_round(0, 5000) == WIN
+        assert game.play_round(5001, 0) == WIN
+        assert game.play_round(0, 5001) == LOSE
+        moves_a = np.arange(100000) % 10001
+        moves_b = (moves_a * 7 + 3) % 10001
+        outcomes = game.play_rounds(moves_a, moves_b)
+        ahead = (moves_b - moves_a) % 10001
+        assert (outcomes == np.where(ahead == 0, 0, np.where(ahead <= 5000, WIN, LOSE))).all()
+        # Batches of rounds are looked up in the bits, so the 100 MB matrices are never compiled
+        for name in ('payoff_matrix', 'win_matrix'):
+            with pytest.raises(AttributeError):
+                getattr(Ruleset, name).__get__(ruleset)
@@ -0,0 +1,111 @@
+from game_objects import Ruleset, RPS_RULES, RPSLS_RULES, RPS_OBJECTS
+from equilibrium import (equilibrium, exploitability, best_responses, solve_zero_sum, dominated_moves, payoff_key,
+                         clear_cache)
+import equilibrium as equilibrium_module
+from cyclic_rulesets import cyclic_ruleset
+import numpy as np
+import pytest
+
+
+def tournament_ruleset(n, seed):
+    """ Returns a ruleset where each pair of objects is won by either, or drawn, at random """
+    upper = np.triu(np.random.default_rng(seed).choice([-1, 0, 1], (n, n)), 1)
+    payoff = upper - upper.T
+    names = [f'object {i}' for i in range(n)]
+    return Ruleset(names, {names[i]: [names[j] for j in np.flatnonzero(payoff[i] == 1)] for i in range(n)})
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+class TestSolver:
+    def test_matching_pennies(self):
+        row, column, value = solve_zero_sum([[1, -1], [-1, 1]])
+        assert row == pytest.approx([0.5, 0.5])
+        assert column == pytest.approx([0.5, 0.5])
+        assert value == pytest.approx(0)
+
+    def test_saddle_point(self):
+        row, column, value = solve_zero_sum([[3, 1], [4, 2]])
+        assert row == pytest.approx([0, 1])
+        assert column == pytest.approx([0, 1])
+        assert value == pytest.approx(2)
+
+    def test_unequal_value(self):
+        row, column, value = solve_zero_sum([[2, -1], [-1, 1]])
+        assert row == pytest.approx([0.4, 0.6])
+        assert value == pytest.approx(0.2)
+
+    @pytest.mark.parametrize("n, seed", [(10, 1), (60, 2), (150, 3)])
+    def test_random_rulesets(self, n, seed):
+        ruleset = tournament_ruleset(n, seed)
+        payoff = ruleset.payoff_matrix
+        row, column, value = solve_zero_sum(payoff)
+        assert value == pytest.approx(0, abs=1e-9)
+        # Neither player can do better than the value against the other's strategy
+        assert (row @ payoff).min() >= -1e-9
+        assert (payoff @ column).max() <= 1e-9
+        assert row.sum() == pytest.approx(1) and (row >= 0).all()
+
+
+class TestDominated:
+    def test_none_in_balanced_rulesets(self):
+        assert dominated_moves(RPSLS_RULES.payoff_matrix) == ()
+
+    def test_dominated(self):
+        # 'well' beats rock and scissors and loses to paper, so it dominates rock
+        ruleset = Ruleset(RPS_OBJECTS + ('well',), {'rock': ['scissors'], 'paper': ['rock', 'well'],
+                                                    'scissors': ['paper'], 'well': ['rock', 'scissors']})
+        solution = equilibrium(ruleset)
+        assert solution.dominated_objects == ('rock',)
+        assert solution.support == ('paper', 'scissors', 'well')
+        assert solution.strategy == pytest.approx([0, 1 / 3, 1 / 3, 1 / 3])
+        assert not solution.is_balanced
+
+
+class TestEquilibrium:
+    def test_balanced(self):
+        for ruleset in (RPS_RULES, RPSLS_RULES):
+            solution = equilibrium(ruleset)
+            assert solution.is_balanced
+            assert solution.value == 0
+            assert solution.strategy == pytest.approx(np.full(len(ruleset), 1 / len(ruleset)))
+            assert solution.support == ruleset.allowable_objects
+
+    def test_exploitability(self):
+        assert exploitability(RPS_RULES, [1 / 3, 1 / 3, 1 / 3]) == pytest.approx(0)
+        assert exploitability(RPS_RULES, [1, 0, 0]) == pytest.approx(1)
+        assert exploitability(RPS_RULES, [0.5, 0.5, 0]) == pytest.approx(0.5)
+        with pytest.raises(ValueError):
+            exploitability(RPS_RULES, [1, 0])
+
+    def test_best_responses(self):
+        assert best_responses(RPS_RULES, [1, 0, 0]) == ('paper',)
+        assert best_responses(RPSLS_RULES, [0.5, 0, 0.5, 0, 0]) == ('spock',)
+        assert best_responses(RPS_RULES, [1 / 3, 1 / 3, 1 / 3]) == RPS_OBJECTS
+
+    def test_cache(self, monkeypatch):
+        renamed = Ruleset(('stone', 'sheet', 'shears'), {'stone': ['shears'], 'sheet': ['stone'],
+                                                         'shears': ['sheet']})
+        ruleset = tournament_ruleset(20, 4)
+        first = equilibrium(ruleset)
+
+        def fail(payoff_matrix):
+            raise AssertionError("Solved again")
+
+        monkeypatch.setattr(equilibrium_module, 'solve_zero_sum', fail)
+        assert equilibrium(ruleset).strategy is first.strategy
+        assert not first.strategy.flags.writeable
+        # The cache is keyed by the payoff matrix, so renaming the objects doesn't change the key
+        assert payoff_key(renamed.payoff_matrix) == payoff_key(RPS_RULES.payoff_matrix)
+        assert payoff_key(ruleset.payoff_matrix) != payoff_key(RPS_RULES.payoff_matrix)
+        assert equilibrium(renamed).strategy is equilibrium(RPS_RULES).strategy
+
+    def test_large_balanced(self):
+        solution = equilibrium(cyclic_ruleset(2001))
+        assert solution.is_balanced
+        assert len(solution.support) == 2001
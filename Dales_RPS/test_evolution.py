@@ -0,0 +1,99 @@
+from game_objects import Game, RPS_RULES
+from evolution import EvolutionarySearch, EVALUATE
+from strategies import FrequencyPlayer, MarkovPlayer, LookupTablePlayer
+from tournament import play_match
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+import pytest
+
+
+def small_search(seed=1, **kwargs):
+    settings = dict(opponents=(FrequencyPlayer, MarkovPlayer), population_size=8, matches_per_opponent=2,
+                    rounds_per_match=20, ruleset=RPS_RULES, seed=seed)
+    settings.update(kwargs)
+    return EvolutionarySearch(**settings)
+
+
+class TestEvaluate:
+    def test_shared_results(self):
+        search = small_search()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            scores = search.evaluate(executor, chunk_size=3)
+        assert scores.shape == (8, 2)
+        # Play one table's matches against MarkovPlayer again in this process, with the same match seeds
+        seeds = search.seed_sequence(0, EVALUATE).spawn(2)[1].spawn(2)
+        strategy = partial(LookupTablePlayer, search.population[5].tolist(), 1, RPS_RULES)
+        difference = 0
+        for seed in seeds:
+            score, opponent_score = play_match(strategy, MarkovPlayer, 20, RPS_RULES, seed)
+            difference += score - opponent_score
+        assert scores[5, 1] == pytest.approx(difference / 40)
+
+    def test_chunk_size_doesnt_matter(self):
+        search = small_search()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            assert np.array_equal(search.evaluate(executor, chunk_size=1), search.evaluate(executor, chunk_size=8))
+
+
+class TestSearch:
+    def test_breed(self):
+        search = small_search(elite=3, mutation_rate=0)
+        fitness = np.arange(8.0)
+        population = search.breed(fitness)
+        assert population.shape == (8, 3)
+        assert np.array_equal(population[:3], search.population[[7, 6, 5]])
+        # Without mutation every entry of a child comes from a table in the population
+        assert all(np.isin(child, search.population[:, column]).all()
+                   for column, child in enumerate(population[3:].T))
+
+    def test_run(self):
+        search = small_search()
+        best_table = search.run(3, max_workers=2)
+        assert search.generation == 3
+        assert search.history.shape == (3, 2)
+        assert search.best_fitness == search.history[:, 0].max()
+        assert (search.history[:, 0] >= search.history[:, 1]).all()
+        game = Game(ruleset=RPS_RULES)
+        player = game.add_player(search.best_strategy()())
+        assert list(player.table) == best_table.tolist()
+
+    def test_learns_to_beat_frequency_player(self):
+        # FrequencyPlayer is beaten by playing what beats what beats its opponent's most common move
+        search = small_search(opponents=(FrequencyPlayer,), population_size=16, seed=2)
+        search.run(6, max_workers=2)
+        assert search.history[-1, 0] > 0.5
+        assert search.history[-1, 1] > search.history[0, 1]
+
+    def test_resume(self, tmp_path):
+        checkpoint = tmp_path / "search.npz"
+        unbroken = small_search(seed=3)
+        unbroken.run(4, max_workers=2)
+
+        small_search(seed=3).run(2, max_workers=2, checkpoint=checkpoint)
+        resumed = small_search(seed=3)
+        resumed.run(4, max_workers=2, checkpoint=checkpoint)
+        assert resumed.generation == 4
+        assert np.array_equal(resumed.population, unbroken.population)
+        assert np.array_equal(resumed.history, unbroken.history)
+        assert np.array_equal(resumed.best_table, unbroken.best_table)
+
+    def test_resume_different_settings(self, tmp_path):
+        checkpoint = tmp_path / "search.npz"
+        small_search().run(1, max_workers=1, checkpoint=checkpoint)
+        with pytest.raises(ValueError):
+            small_search(population_size=10).run(2, max_workers=1, checkpoint=checkpoint)
+
+    def test_seed_recorded(self):
+        assert small_search(seed=None).seed != small_search(seed=None).seed
+        search = small_search(seed=None)
+        assert np.array_equal(small_search(seed=search.seed).population, search.population)
+
+    @pytest.mark.parametrize("kwargs", [dict(elite=8), dict(elite=-1), dict(order=0)])
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            small_search(**kwargs)
+
+    def test_no_best_strategy(self):
+        with pytest.raises(ValueError):
+            small_search().best_strategy()
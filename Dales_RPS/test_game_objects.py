@@ -1,5 +1,12 @@
-from game_objects import PlayerObject, HumanPlayer, ComputerPlayer, Game, RPSLS_OBJECTS
-import random
+from game_objects import (PlayerObject, HumanPlayer, ComputerPlayer, Game, Ruleset, MoveHistory, MoveStream,
+                          RPSLS_OBJECTS, RPS_OBJECTS, RPS_WIN_DICT, RPSLS_RULES, RPS_RULES, WIN, DRAW, LOSE, PAIRWISE,
+                          BATTLE_ROYALE, HISTORY_LENGTH, compile_outcome_table, score_moves)
+import game_objects
+from cyclic_rulesets import cyclic_ruleset
+import pickle
+from threading import Thread
+
+import numpy as np
 import pytest
 
 
@@ -17,6 +24,69 @@ class TestParametrized:
         assert PlayerObject(obj) > PlayerObject(obj_beats[1])
 
 
+class TestRuleset:
+    def test_default_rules(self):
+        assert Ruleset() == RPSLS_RULES
+        assert Ruleset(win_dict=RPS_WIN_DICT) == RPS_RULES
+
+    def test_hashable(self):
+        assert hash(Ruleset(RPS_OBJECTS, RPS_WIN_DICT)) == hash(RPS_RULES)
+        assert len({RPS_RULES, RPSLS_RULES, Ruleset(RPS_OBJECTS, RPS_WIN_DICT)}) == 2
+
+    def test_immutable(self):
+        with pytest.raises(AttributeError):
+            RPS_RULES.allowable_objects = RPSLS_OBJECTS
+        with pytest.raises(TypeError):
+            RPS_RULES.win_dict['rock'] = ('paper',)
+
+    def test_invalid_keys(self):
+        with pytest.raises(ValueError):
+            Ruleset(RPSLS_OBJECTS, RPS_WIN_DICT)
+
+    @pytest.mark.parametrize("win_dict", [{'rock': ['rock', 'scissors'], 'paper': ['rock'], 'scissors': ['paper']},
+                                          {'rock': ['scissors', 'paper'], 'paper': ['rock'], 'scissors': ['paper']},
+                                          ])
+    def test_invalid_win_dict(self, win_dict):
+        with pytest.raises(ValueError):
+            Ruleset(RPS_OBJECTS, win_dict)
+
+    def test_pickle(self):
+        assert pickle.loads(pickle.dumps(RPS_RULES)) == RPS_RULES
+
+    def test_win_bits(self):
+        win_bits = np.packbits(RPS_RULES.payoff_matrix == WIN, axis=1)
+        assert RPS_RULES.win_bits.tolist() == win_bits.tolist()
+        ruleset = Ruleset(RPS_OBJECTS, win_bits=win_bits)
+        assert ruleset == RPS_RULES
+        assert hash(ruleset) == hash(RPS_RULES)
+        assert ruleset.win_dict == RPS_RULES.win_dict
+        assert ruleset.beaten_by == RPS_RULES.beaten_by
+        assert ruleset.payoff_matrix.tolist() == RPS_RULES.payoff_matrix.tolist()
+        assert list(ruleset.outcome_table) == list(RPS_RULES.outcome_table)
+        assert ruleset.outcome_table[-1] == RPS_RULES.outcome_table[-1]
+        assert pickle.loads(pickle.dumps(ruleset)) == ruleset
+
+    @pytest.mark.parametrize("rows", [[[0b01000000], [0b00100000]],
+                                      [[0b10000000], [0b00000000], [0b00000000]],
+                                      [[0b01000000], [0b10000000], [0b00000000]],
+                                      [[0b00000001], [0b00000000], [0b00000000]],
+                                      ])
+    def test_invalid_win_bits(self, rows):
+        with pytest.raises(ValueError):
+            Ruleset(RPS_OBJECTS, win_bits=np.array(rows, dtype=np.uint8))
+
+    def test_outcomes(self):
+        moves_a, moves_b = np.array([[0, 1, 2], [2, 2, 1]])
+        assert RPS_RULES.outcomes(moves_a, moves_b).tolist() == [WIN, LOSE, WIN]
+        assert RPS_RULES.beats(moves_a, moves_b).tolist() == [True, False, True]
+
+    def test_objects_use_own_rules(self):
+        # lizard beats paper in RPSLS, but under RPS rules paper cannot be compared with a lizard
+        assert PlayerObject("paper", RPS_RULES) > PlayerObject("rock", RPS_RULES)
+        with pytest.raises(ValueError):
+            PlayerObject("lizard", RPS_RULES)
+
+
 class TestObjects:
     @pytest.fixture
     def my_objects(self):
@@ -24,7 +94,51 @@ class TestObjects:
 
     def test_random_object(self):
         rand_obj = PlayerObject.random_object()
-        assert rand_obj.name in PlayerObject.allowable_objects
+        assert rand_obj.name in RPSLS_RULES.allowable_objects
+
+    def test_index(self, my_objects):
+        for i, obj in enumerate(RPSLS_OBJECTS):
+            assert my_objects[obj].index == i
+            assert PlayerObject.from_index(i) == my_objects[obj]
+
+    def test_outcome_table(self):
+        table = compile_outcome_table(RPS_OBJECTS, RPS_WIN_DICT)
+        assert table == ((DRAW, LOSE, WIN),
+                         (WIN, DRAW, LOSE),
+                         (LOSE, WIN, DRAW))
+
+    def test_outcome_table_invalid(self):
+        with pytest.raises(ValueError):
+            compile_outcome_table(RPS_OBJECTS, {'rock': ['lizard'], 'paper': ['rock'], 'scissors': ['paper']})
+
+    def test_flyweight(self, my_objects):
+        assert PlayerObject("rock") is my_objects["rock"]
+        assert PlayerObject("ROCK") is PlayerObject("Rock") is PlayerObject("rOcK") is my_objects["rock"]
+        assert PlayerObject.random_object() in RPSLS_RULES.objects
+        assert PlayerObject("rock", RPS_RULES) is not my_objects["rock"]
+
+    def test_immutable(self, my_objects):
+        with pytest.raises(AttributeError):
+            my_objects["rock"].name = "paper"
+        assert not hasattr(my_objects["rock"], "__dict__")
+
+    def test_pickle(self, my_objects):
+        spock = pickle.loads(pickle.dumps(my_objects["spock"]))
+        assert spock == my_objects["spock"]
+        assert spock is spock.ruleset.objects[spock.index]
+
+    def test_invalid_name(self):
+        with pytest.raises(ValueError):
+            PlayerObject("well")
+
+    def test_equality_across_rulesets(self, my_objects):
+        rock = PlayerObject("rock", RPS_RULES)
+        assert rock != my_objects["rock"]
+        assert len({rock, my_objects["rock"]}) == 2
+        assert my_objects["lizard"] != cyclic_ruleset(5).objects[3]
+        assert my_objects["rock"] not in [None, "rock"]
+        with pytest.raises(ValueError):
+            PlayerObject("paper", RPS_RULES) > my_objects["rock"]
 
     def test_rankings(self, my_objects):
         assert my_objects["spock"] > my_objects["rock"] and my_objects["spock"] > my_objects["scissors"]
@@ -34,6 +148,137 @@ class TestObjects:
         assert my_objects["lizard"] > my_objects["paper"] and my_objects["lizard"] > my_objects["spock"]
 
 
+class TestMoveHistory:
+    moves = [0, 1, 1, 2, 0, 1, 4]
+
+    @pytest.fixture
+    def history(self):
+        history = MoveHistory(5)
+        for move in self.moves:
+            history.record(move)
+        return history
+
+    def test_record(self, history):
+        assert len(history) == 7
+        assert list(history) == self.moves
+        assert history.last_move() == 4
+        assert history.last(3) == [0, 1, 4]
+        assert history.counts == [2, 3, 1, 0, 1]
+        assert history.frequency(1) == 3 / 7
+        assert history.transition_count(0, 1) == 2
+        assert history.transition_count(1, 1) == 1
+        assert history.transition_count(4, 0) == 0
+
+    def test_extend_matches_record(self, history):
+        extended = MoveHistory(5)
+        extended.extend(self.moves[:3])
+        extended.extend(np.array(self.moves[3:]))
+        assert list(extended) == list(history)
+        assert extended.counts == history.counts
+        assert all(extended.transition_count(i, j) == history.transition_count(i, j)
+                   for i in range(5) for j in range(5))
+
+    @pytest.mark.parametrize("use_extend", [False, True])
+    def test_ring_buffer(self, use_extend):
+        history = MoveHistory(5, maxlen=4)
+        if use_extend:
+            history.extend(self.moves)
+        else:
+            for move in self.moves:
+                history.record(move)
+        expected = MoveHistory(5)
+        expected.extend(self.moves[-4:])
+        assert len(history) == 4
+        assert list(history) == self.moves[-4:]
+        assert history.counts == expected.counts
+        assert all(history.transition_count(i, j) == expected.transition_count(i, j)
+                   for i in range(5) for j in range(5))
+
+    @pytest.mark.parametrize("maxlen", [None, 4])
+    def test_extend_in_chunks(self, monkeypatch, maxlen):
+        expected = MoveHistory(5, maxlen)
+        expected.extend(self.moves)
+        monkeypatch.setattr(game_objects, 'HISTORY_CHUNK', 2)
+        history = MoveHistory(5, maxlen)
+        history.record(3)
+        history.extend(self.moves)
+        if maxlen is None:
+            expected = MoveHistory(5)
+            expected.extend([3] + self.moves)
+        assert list(history) == list(expected)
+        assert history.counts == expected.counts
+        assert all(history.transition_count(i, j) == expected.transition_count(i, j)
+                   for i in range(5) for j in range(5))
+
+    def test_players_keep_recent_moves(self):
+        game = Game()
+        game.add_human_player("Bob")
+        game.add_computer_player()
+        game.play_rounds(np.zeros(HISTORY_LENGTH + 10, dtype=int), np.ones(HISTORY_LENGTH + 10, dtype=int))
+        assert len(game.players[0].history) == HISTORY_LENGTH
+        assert game.players[0].history.counts[0] == HISTORY_LENGTH
+
+    def test_clear(self, history):
+        history.clear()
+        assert len(history) == 0
+        assert history.last_move() is None
+        assert history.frequencies() == [0.0] * 5
+
+    def test_large_ruleset(self):
+        history = MoveHistory(1000)
+        history.extend([999, 0, 999])
+        history.record(500)
+        assert list(history) == [999, 0, 999, 500]
+        assert history.transition_count(999, 0) == 1
+
+
+class TestMoveStream:
+    def test_reproducible(self):
+        first, second = MoveStream(3, block_size=7), MoveStream(3, block_size=16)
+        moves = [first.next_move(5) for _ in range(40)]
+        assert moves == [second.next_move(5) for _ in range(40)]
+        assert all(0 <= move < 5 for move in moves)
+        assert set(moves) == set(range(5))
+
+    def test_spawn(self):
+        stream = MoveStream(3)
+        children = [stream.spawn() for _ in range(2)]
+        moves = [[child.next_move(1000) for _ in range(10)] for child in children]
+        assert moves[0] != moves[1]
+        # Spawning follows from the root seed
+        assert MoveStream(3).spawn().next_move(1000) == moves[0][0]
+
+    def test_seed_sequence_copied(self):
+        seed = np.random.SeedSequence(5)
+        first, second = MoveStream(seed), MoveStream(seed)
+        first.spawn()
+        assert seed.n_children_spawned == 0
+        assert first.spawn().next_move(1000) != second.spawn().next_move(1000)
+        assert MoveStream(seed).spawn().next_move(1000) == MoveStream(5).spawn().next_move(1000)
+
+    def test_moves(self):
+        moves = MoveStream(1).moves(3, 1000)
+        assert moves.shape == (1000,)
+        assert set(moves.tolist()) == {0, 1, 2}
+
+    def test_choice(self):
+        assert MoveStream(1).choice([7]) == 7
+
+    def test_seeded_game(self):
+        def computer_moves(seed):
+            game = Game(seed=seed)
+            computers = [game.add_computer_player() for _ in range(2)]
+            moves = []
+            for _ in range(20):
+                for computer in computers:
+                    computer.choose_object()
+                    moves.append(computer.current_object.index)
+            return moves + computers[0].choose_moves(5).tolist()
+
+        assert computer_moves(11) == computer_moves(11)
+        assert computer_moves(11) != computer_moves(12)
+
+
 class TestPlayers:
     @pytest.fixture
     def human_player(self):
@@ -41,7 +286,7 @@ class TestPlayers:
 
     @pytest.fixture
     def computer_player(self):
-        return ComputerPlayer()
+        return ComputerPlayer(rng=MoveStream(4))
 
     def test_set_name(self, human_player):
         assert human_player.name == "Andrew"
@@ -63,7 +308,6 @@ class TestPlayers:
         assert human_player.score == 2
 
     def test_choose_computer_object(self, computer_player):
-        random.seed(5)
         assert computer_player.current_object is None
         computer_player.choose_object()
         assert computer_player.current_object == PlayerObject('spock')
@@ -74,8 +318,7 @@ class TestPlayers:
 class TestGame:
     @pytest.fixture
     def my_game(self):
-        random.seed(8)
-        game = Game()
+        game = Game(seed=9)
         game.add_human_player("Bob")
         game.add_computer_player()
         game.set_max_rounds(2)
@@ -129,3 +372,184 @@ class TestGame:
 
     def test_report_winner(self, finished_game):
         assert (finished_game.report_winner() == "Computer is the winner")
+
+    def test_play_round(self, my_game):
+        assert my_game.play_round("spock", "paper") == LOSE
+        assert my_game.round_result == "win"
+        assert my_game.round_winner is my_game.players[1]
+        assert my_game.current_round == 1
+        assert (my_game.report_round() ==
+                "Bob choose 'spock'.\nComputer choose 'paper'.\nComputer won this round"
+                )
+        assert my_game.play_round(PlayerObject("lizard"), 3) == DRAW
+        assert my_game.round_result == "draw"
+        assert my_game.round_winner is None
+        my_game.set_max_rounds(2)
+        assert my_game.is_finished()
+        assert my_game.report_score() == "After 2 rounds:\nBob has scored 0\nComputer has scored 1"
+
+    def test_play_round_matches_find_winner(self, my_game):
+        other_game = Game()
+        other_game.add_human_player("Bob")
+        other_game.add_human_player("Alice")
+        for a in RPSLS_OBJECTS:
+            for b in RPSLS_OBJECTS:
+                my_game.play_round(a, b)
+                other_game.next_round()
+                other_game.players[0].choose_object(a)
+                other_game.players[1].choose_object(b)
+                other_game.find_winner()
+                assert my_game.round_result == other_game.round_result
+                assert [p.score for p in my_game.players] == [p.score for p in other_game.players]
+
+    def test_history(self, finished_game):
+        assert list(finished_game.players[0].history) == [4, 3]
+        assert list(finished_game.players[1].history) == [1, 2]
+        finished_game.play_round("rock", "paper")
+        finished_game.play_rounds([0, 1], [2, 2])
+        assert list(finished_game.players[0].history) == [4, 3, 0, 0, 1]
+        finished_game.reset()
+        assert len(finished_game.players[0].history) == 0
+
+    @pytest.mark.parametrize("move", ["well", -1, 5, PlayerObject("rock", RPS_RULES)])
+    def test_play_round_invalid(self, my_game, move):
+        with pytest.raises(ValueError):
+            my_game.play_round(move, "rock")
+        assert my_game.current_round == 0
+
+    @pytest.mark.parametrize("move", [True, 1.0, None])
+    def test_play_round_not_a_move(self, my_game, move):
+        with pytest.raises(TypeError):
+            my_game.play_round(move, "rock")
+
+    def test_play_round_numpy_index(self, my_game):
+        assert my_game.play_round(np.int64(1), np.uint8(0)) == WIN
+        assert my_game.players[0].current_object is PlayerObject("paper")
+
+    def test_play_rounds(self, my_game):
+        outcomes = my_game.play_rounds([4, 4, 0, 1], [1, 4, 2, 0])
+        assert outcomes.tolist() == [LOSE, DRAW, WIN, WIN]
+        assert my_game.current_round == 4
+        assert my_game.players[0].score == 2
+        assert my_game.players[1].score == 1
+
+    def test_play_rounds_matches_find_winner(self, my_game):
+        rng = np.random.default_rng(1)
+        moves_a, moves_b = rng.integers(0, len(RPSLS_OBJECTS), size=(2, 200))
+        outcomes = my_game.play_rounds(moves_a, moves_b)
+        for a, b, outcome in zip(moves_a, moves_b, outcomes):
+            if PlayerObject.from_index(a) > PlayerObject.from_index(b):
+                assert outcome == WIN
+            elif PlayerObject.from_index(a) == PlayerObject.from_index(b):
+                assert outcome == DRAW
+            else:
+                assert outcome == LOSE
+
+    def test_concurrent_rulesets(self):
+        rps_game = Game(ruleset=RPS_RULES)
+        rpsls_game = Game()
+        assert rps_game.ruleset is RPS_RULES
+        assert rpsls_game.ruleset is RPSLS_RULES
+
+        def play(game, choice):
+            player = game.add_human_player("Bob")
+            computer = game.add_computer_player()
+            for _ in range(1000):
+                game.next_round()
+                player.choose_object(choice)
+                computer.choose_object()
+                assert computer.current_object.name in game.ruleset.allowable_objects
+                game.find_winner()
+
+        threads = [Thread(target=play, args=(rps_game, "rock")), Thread(target=play, args=(rpsls_game, "spock"))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert rps_game.current_round == rpsls_game.current_round == 1000
+
+    def test_set_ruleset(self, finished_game):
+        finished_game.set_ruleset(RPS_RULES)
+        assert finished_game.current_round == 0
+        assert all(player.ruleset is RPS_RULES for player in finished_game.players)
+
+    def test_play_rounds_invalid(self, my_game):
+        with pytest.raises(ValueError):
+            my_game.play_rounds([0, 5], [0, 1])
+        with pytest.raises(ValueError):
+            my_game.play_rounds([0, 1], [0])
+
+
+class TestMultiplayer:
+    @pytest.fixture
+    def three_player_game(self):
+        game = Game()
+        for name in ("Ann", "Bob", "Cat"):
+            game.add_human_player(name)
+        game.set_max_rounds(3)
+        return game
+
+    def play(self, game, *choices):
+        game.next_round()
+        for player, choice in zip(game.players, choices):
+            player.choose_object(choice)
+        game.find_winner()
+
+    @pytest.mark.parametrize("ruleset", [RPS_RULES, RPSLS_RULES])
+    def test_pairwise_matches_pairwise_comparison(self, ruleset):
+        moves = np.random.default_rng(2).integers(0, len(ruleset), 300)
+        expected = [sum(ruleset.objects[a] > ruleset.objects[b] for b in moves) for a in moves]
+        assert score_moves(ruleset, moves, PAIRWISE).tolist() == expected
+
+    @pytest.mark.parametrize("moves, points", [([0, 2, 2], [1, 0, 0]),
+                                               ([0, 1, 2], [0, 0, 0]),
+                                               ([1, 1, 1], [0, 0, 0]),
+                                               ([1, 0, 1, 0], [1, 0, 1, 0]),
+                                               ])
+    def test_battle_royale(self, moves, points):
+        assert score_moves(RPS_RULES, moves, BATTLE_ROYALE).tolist() == points
+
+    def test_battle_royale_rpsls(self):
+        # rock beats scissors and lizard, and isn't beaten by either
+        assert score_moves(RPSLS_RULES, [0, 2, 3, 0], BATTLE_ROYALE).tolist() == [1, 0, 0, 1]
+        # spock beats rock, but lizard beats spock
+        assert score_moves(RPSLS_RULES, [0, 2, 3, 4], BATTLE_ROYALE).tolist() == [0, 0, 0, 0]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            score_moves(RPS_RULES, [0, 3])
+        with pytest.raises(ValueError):
+            score_moves(RPS_RULES, [0, 1], "knockout")
+
+    def test_large_round(self):
+        moves = np.random.default_rng(3).integers(0, 5, 10 ** 6)
+        points = score_moves(RPSLS_RULES, moves)
+        assert points.shape == (10 ** 6,)
+        assert points.max() <= 10 ** 6
+
+    def test_find_winner(self, three_player_game):
+        self.play(three_player_game, "rock", "scissors", "lizard")
+        assert [player.score for player in three_player_game.players] == [2, 1, 0]
+        assert three_player_game.round_winners == three_player_game.players[:2]
+        assert three_player_game.round_winner is None
+        assert (three_player_game.report_round() ==
+                "Ann choose 'rock'.\nBob choose 'scissors'.\nCat choose 'lizard'.\nAnn and Bob won this round")
+
+    def test_find_winner_battle_royale(self, three_player_game):
+        three_player_game.set_scoring(BATTLE_ROYALE)
+        self.play(three_player_game, "rock", "scissors", "lizard")
+        assert three_player_game.round_winner is three_player_game.players[0]
+        assert three_player_game.report_round().endswith("Ann won this round")
+        self.play(three_player_game, "rock", "paper", "scissors")
+        assert three_player_game.round_result == "draw"
+        assert three_player_game.round_winners == []
+
+    def test_report_winner(self, three_player_game):
+        self.play(three_player_game, "rock", "rock", "scissors")
+        assert three_player_game.report_winner() == "Ann and Bob are joint winners"
+        self.play(three_player_game, "paper", "rock", "rock")
+        assert three_player_game.report_winner() == "Ann is the winner"
+
+    def test_set_scoring(self, three_player_game):
+        with pytest.raises(ValueError):
+            three_player_game.set_scoring("knockout")
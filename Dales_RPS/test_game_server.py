@@ -0,0 +1,191 @@
+from game_server import GameServer, encode_report
+from game_objects import RULESETS
+from cyclic_rulesets import cyclic_ruleset
+from game_client import GameClient
+import asyncio
+import pytest
+
+
+class ScriptedClient(GameClient):
+    """ Plays a fixed list of moves """
+    def __init__(self, name, moves, **kwargs):
+        super().__init__(name, rounds=len(moves), **kwargs)
+        self.moves = moves
+
+    def choose_move(self, round_number):
+        return self.moves[round_number - 1]
+
+
+def run_server_test(test, move_timeout=5.0, rulesets=None):
+    """ Runs test(server) against a server listening on a free port """
+    async def run():
+        server = GameServer(port=0, move_timeout=move_timeout, rulesets=rulesets)
+        await server.start()
+        try:
+            return await asyncio.wait_for(test(server), 10)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+async def play_clients(server, *clients):
+    for client in clients:
+        await client.connect(server.host, server.port)
+    results = await asyncio.gather(*(client.play() for client in clients))
+    for client in clients:
+        await client.close()
+    return results
+
+
+class TestServer:
+    def test_encode_report(self):
+        assert encode_report("After 1 rounds:\nBob has scored 1") == "After 1 rounds: | Bob has scored 1"
+
+    def test_paired_game(self):
+        bob = ScriptedClient("Bob", ["rock", "spock", "paper"])
+        alice = ScriptedClient("Alice", ["paper", "spock", "rock"])
+        results = run_server_test(lambda server: play_clients(server, bob, alice))
+        assert results == ["Game is drawn", "Game is drawn"]
+        assert bob.opponent == "Alice"
+        assert bob.objects == ['rock', 'paper', 'scissors', 'lizard', 'spock']
+        reports = [argument for command, argument in bob.messages if command == 'REPORT']
+        assert reports[0] == "Bob choose 'rock'. | Alice choose 'paper'. | Alice won this round"
+        assert reports[1].endswith("Round was a draw")
+        assert ('SCORE', "After 3 rounds: | Bob has scored 1 | Alice has scored 1") in alice.messages
+
+    def test_many_sessions(self):
+        clients = [ScriptedClient(f"P{i}", ["rock", "scissors"], rules='RPS') for i in range(200)]
+        results = run_server_test(lambda server: play_clients(server, *clients))
+        assert results.count("Game is drawn") == 200
+
+    def test_computer_game(self):
+        client = GameClient("Bob", rules='RPS', rounds=4, against_computer=True)
+        run_server_test(lambda server: play_clients(server, client))
+        assert client.opponent == "Computer"
+        assert client.objects == ['rock', 'paper', 'scissors']
+        assert sum(command == 'REPORT' for command, _ in client.messages) == 4
+
+    def test_custom_rulesets(self):
+        rulesets = dict(RULESETS, **{'RPS-7': cyclic_ruleset(7)})
+        client = GameClient("Bob", rules='RPS-7', rounds=3, against_computer=True)
+        run_server_test(lambda server: play_clients(server, client), rulesets=rulesets)
+        assert client.objects == [f"object{i}" for i in range(7)]
+        assert client.result is not None
+
+    def test_invalid_move(self):
+        class RetryClient(ScriptedClient):
+            def choose_move(self, round_number):
+                self.send('MOVE', 'well')
+                return super().choose_move(round_number)
+
+        client = RetryClient("Bob", ["rock"], against_computer=True)
+        run_server_test(lambda server: play_clients(server, client))
+        assert client.messages[2][0] == 'ERROR'
+        assert client.messages[3][0] == 'REPORT'
+
+    def test_move_timeout(self):
+        async def test(server):
+            client = GameClient("Bob", rounds=1, against_computer=True)
+            await client.connect(server.host, server.port)
+            client.send('JOIN', "Bob RPSLS 1 computer")
+            while (await client.read_message())[0] != 'END':
+                pass
+            await client.close()
+            return client.messages
+
+        messages = run_server_test(test, move_timeout=0.1)
+        assert [command for command, _ in messages] == ['START', 'ROUND', 'ERROR', 'REPORT', 'SCORE', 'END']
+        assert "timed out" in messages[2][1]
+
+    def test_opponent_disconnects(self):
+        async def test(server):
+            bob = GameClient("Bob", rounds=3)
+            await bob.connect(server.host, server.port)
+            play = asyncio.ensure_future(bob.play())
+            quitter = GameClient("Alice", rounds=3)
+            await quitter.connect(server.host, server.port)
+            quitter.send('JOIN', "Alice RPSLS 3")
+            await quitter.read_message()
+            await quitter.close()
+            result = await play
+            await bob.close()
+            return result
+
+        assert run_server_test(test).startswith("Game abandoned")
+
+    @pytest.mark.parametrize("leave", ['QUIT', 'close'])
+    def test_waiting_client_leaves(self, leave):
+        async def test(server):
+            waiter = GameClient("Alice", rounds=3)
+            await waiter.connect(server.host, server.port)
+            waiter.send('JOIN', "Alice RPSLS 3")
+            waiter.send('MOVE', "rock")
+            assert (await waiter.read_message())[0] == 'ERROR'
+            assert server._waiting
+            if leave == 'QUIT':
+                waiter.send('QUIT')
+            await waiter.close()
+            while server._waiting:
+                await asyncio.sleep(0.01)
+            # The next client waits for a new opponent, rather than being paired with the one that left
+            return await play_clients(server, ScriptedClient("Bob", ["rock"] * 3),
+                                      ScriptedClient("Carol", ["paper"] * 3))
+
+        results = run_server_test(test)
+        assert results[1] == "Carol is the winner"
+
+    @pytest.mark.parametrize("join", ["Bob", "Bob XYZ 3", "Bob RPS none", "Bob RPS 3 human", "Bob RPS \u00b2",
+                                      "Bob RPS 0"])
+    def test_invalid_join(self, join):
+        async def test(server):
+            client = GameClient("Bob")
+            await client.connect(server.host, server.port)
+            client.send('JOIN', join)
+            message = await client.read_message()
+            await client.close()
+            return message
+
+        assert run_server_test(test)[0] == 'ERROR'
+
+    def test_undecodable_message(self):
+        async def test(server):
+            client = GameClient("Bob", rounds=1, against_computer=True)
+            await client.connect(server.host, server.port)
+            client._writer.write(b"JOIN \xff\xfe\n")
+            message = await client.read_message()
+            await client.play()
+            await client.close()
+            return message
+
+        command, argument = run_server_test(test)
+        assert command == 'ERROR' and "UTF-8" in argument
+
+    @pytest.mark.parametrize("message", [b"MOVE \xff\n", b"MOVE " + b"x" * 100000 + b"\n"],
+                             ids=["undecodable", "too long"])
+    def test_bad_move_ends_game(self, message):
+        async def test(server):
+            bob = GameClient("Bob", rounds=3)
+            await bob.connect(server.host, server.port)
+            play = asyncio.ensure_future(bob.play())
+            sender = GameClient("Alice", rounds=3)
+            await sender.connect(server.host, server.port)
+            sender.send('JOIN', "Alice RPSLS 3")
+            while (await sender.read_message())[0] != 'ROUND':
+                pass
+            sender._writer.write(message)
+            try:
+                while True:
+                    await sender.read_message()
+            except ConnectionError:
+                pass
+            result = await play
+            await bob.close()
+            await sender.close()
+            return result, sender.messages
+
+        result, messages = run_server_test(test, move_timeout=0.2)
+        assert result
+        if b"\xff" in message:
+            assert ('ERROR', "Messages must be UTF-8 text") in messages
+        else:
+            assert result.startswith("Game abandoned")
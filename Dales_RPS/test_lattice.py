@@ -0,0 +1,101 @@
+from game_objects import RPS_RULES, RPSLS_RULES
+from lattice import Lattice, MOORE, load_snapshots
+from cyclic_rulesets import cyclic_ruleset
+import numpy as np
+import pytest
+
+
+def reference_sweep(lattice):
+    """ One sweep written cell by cell, drawing the same random numbers as Lattice.sweep """
+    grid = lattice.grid.copy()
+    rows, columns = grid.shape
+    directions = lattice.rng.integers(len(lattice.neighbourhood), size=grid.shape, dtype=np.uint8)
+    for i in range(rows):
+        for j in range(columns):
+            d_row, d_column = lattice.neighbourhood[directions[i, j]]
+            neighbour = grid[(i + d_row) % rows, (j + d_column) % columns]
+            if lattice.ruleset.win_matrix[neighbour, grid[i, j]]:
+                lattice.grid[i, j] = neighbour
+    lattice.sweeps += 1
+
+
+class TestLattice:
+    @pytest.mark.parametrize("ruleset, neighbourhood", [(RPS_RULES, MOORE), (RPSLS_RULES, MOORE),
+                                                        (cyclic_ruleset(301), MOORE[:4])])
+    def test_matches_reference(self, ruleset, neighbourhood):
+        lattice = Lattice(ruleset, (13, 17), neighbourhood=neighbourhood, seed=1)
+        reference = Lattice(ruleset, (13, 17), neighbourhood=neighbourhood, seed=1)
+        for _ in range(4):
+            lattice.sweep()
+            reference_sweep(reference)
+            assert np.array_equal(lattice.grid, reference.grid)
+        assert lattice.grid.dtype == (np.uint8 if len(ruleset) <= 256 else np.uint16)
+
+    def test_large_ruleset(self):
+        lattice = Lattice(cyclic_ruleset(2049), (8, 8), seed=2)
+        reference = Lattice(cyclic_ruleset(2049), (8, 8), seed=2)
+        lattice.sweep()
+        reference_sweep(reference)
+        assert np.array_equal(lattice.grid, reference.grid)
+
+    def test_invasion(self):
+        # A paper cell surrounded by rock spreads, as rock cells looking at paper are invaded
+        grid = np.zeros((5, 5), dtype=np.uint8)
+        grid[2, 2] = 1
+        lattice = Lattice(RPS_RULES, grid=grid, seed=3)
+        for _ in range(20):
+            lattice.sweep()
+        assert lattice.densities()[1] > 0.5
+        assert lattice.densities()[2] == 0
+        assert lattice.sweeps == 20
+
+    def test_rate(self):
+        grid = np.tile([0, 1], (64, 32)).astype(np.uint8)
+        lattice = Lattice(RPS_RULES, grid=grid, rate=0.25, seed=4)
+        lattice.sweep()
+        # Half the rock cells look at a paper neighbour, and a quarter of those are invaded
+        assert lattice.densities()[1] == pytest.approx(0.5 + 0.5 * 0.5 * 0.25, abs=0.02)
+
+    @pytest.mark.parametrize("kwargs", [dict(grid=[[0, 3]]), dict(grid=[0, 1]), dict(grid=[[0.5, 1]]),
+                                        dict(rate=0)])
+    def test_invalid(self, kwargs):
+        with pytest.raises(ValueError):
+            Lattice(RPS_RULES, **kwargs)
+
+    def test_seed(self):
+        first = Lattice(shape=(32, 32), seed=5)
+        second = Lattice(shape=(32, 32), seed=first.seed)
+        first.run(10)
+        second.run(10)
+        assert np.array_equal(first.grid, second.grid)
+        assert Lattice(shape=(32, 32)).seed != Lattice(shape=(32, 32)).seed
+
+
+class TestRun:
+    def test_snapshots(self, tmp_path):
+        path = tmp_path / "lattice.npy"
+        lattice = Lattice(RPSLS_RULES, (40, 30), seed=6)
+        start = lattice.grid.copy()
+        densities = lattice.run(10, snapshot_every=4, path=path)
+        snapshots = load_snapshots(path)
+        assert snapshots.shape == (4, 40, 30)
+        assert densities.shape == (4, 5)
+        assert np.array_equal(snapshots[0], start)
+        assert lattice.sweeps == 10
+        assert lattice.snapshot_sweeps.tolist() == [0, 4, 8, 10]
+        assert np.array_equal(snapshots[-1], lattice.grid)
+        assert densities == pytest.approx(np.array([np.bincount(s.ravel(), minlength=5) / 1200 for s in snapshots]))
+
+    def test_default_snapshots(self):
+        lattice = Lattice(RPS_RULES, (16, 16), seed=7)
+        densities = lattice.run(5)
+        assert densities.shape == (2, 3)
+        assert lattice.sweeps == 5
+        assert densities.sum(axis=1) == pytest.approx([1, 1])
+
+    def test_snapshots_continue(self):
+        lattice = Lattice(RPS_RULES, (16, 16), seed=7)
+        lattice.run(3)
+        lattice.run(5, snapshot_every=2)
+        assert lattice.sweeps == 8
+        assert lattice.snapshot_sweeps.tolist() == [3, 5, 7, 8]
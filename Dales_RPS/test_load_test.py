@@ -0,0 +1,62 @@
+from load_test import LatencyHistogram, LoadGenerator
+import asyncio
+import random
+import pytest
+
+
+class TestLatencyHistogram:
+    @pytest.fixture
+    def histogram(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 100_001):
+            histogram.record(value)
+        return histogram
+
+    def test_buckets(self):
+        histogram = LatencyHistogram(significant_bits=8)
+        # Small values are exact
+        for value in range(256):
+            assert histogram.bucket_value(histogram.bucket_index(value)) == value
+        # Larger values are within the bucket precision, and buckets don't overlap
+        previous = -1
+        for value in sorted(random.Random(1).sample(range(256, 10 ** 9), 2000)):
+            index = histogram.bucket_index(value)
+            assert value <= histogram.bucket_value(index) <= value * (1 + 1 / 128)
+            assert index >= previous
+            previous = index
+
+    def test_percentiles(self, histogram):
+        assert histogram.total_count == 100_000
+        assert histogram.min == 1
+        assert histogram.max == 100_000
+        assert histogram.mean() == pytest.approx(50_000.5)
+        for percentile in (50, 95, 99, 99.9):
+            assert histogram.value_at_percentile(percentile) == pytest.approx(percentile * 1000, rel=1 / 128)
+        assert histogram.value_at_percentile(100) == 100_000
+
+    def test_merge(self, histogram):
+        other = LatencyHistogram()
+        other.record(10 ** 7)
+        histogram.merge(other)
+        assert histogram.total_count == 100_001
+        assert histogram.max == 10 ** 7
+
+    def test_empty(self):
+        assert LatencyHistogram().summary()['p99'] == 0
+
+
+class TestLoadGenerator:
+    @pytest.mark.parametrize("against_computer", [False, True])
+    def test_run(self, against_computer):
+        generator = LoadGenerator(num_clients=40, rounds=3, against_computer=against_computer)
+        summary = asyncio.run(generator.run())
+        games = 40 if against_computer else 20
+        assert summary['games_completed'] == games
+        assert summary['client_errors'] == 0
+        assert summary['latency_us']['count'] == 40 * 3
+        assert summary['rounds_per_s'] > 0
+        assert set(summary['latency_us']) >= {'p50', 'p95', 'p99', 'p999'}
+
+    def test_odd_clients(self):
+        with pytest.raises(ValueError):
+            LoadGenerator(num_clients=3)
@@ -0,0 +1,124 @@
+from game_objects import Game, RPS_RULES, RPSLS_RULES, WIN, DRAW, LOSE
+from match_log import MatchLogWriter, MatchLog, replay, HEADER
+import match_log
+import random
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def game():
+    random.seed(4)
+    game = Game(seed=4)
+    game.add_human_player("Bob")
+    game.add_computer_player()
+    game.set_max_rounds(50)
+    return game
+
+
+def play(game, rounds):
+    human, computer = game.players
+    for _ in range(rounds):
+        computer.choose_object()
+        game.play_round(random.randrange(len(game.ruleset)), computer.current_object)
+
+
+class TestMatchLog:
+    def test_digest(self):
+        assert RPS_RULES.digest != RPSLS_RULES.digest
+        assert len(bytes.fromhex(RPS_RULES.digest)) == 32
+
+    def test_write_and_read(self, game, tmp_path):
+        path = tmp_path / "match.rpslog"
+        with MatchLogWriter.for_game(path, game, seed=42, buffer_rounds=7):
+            play(game, 50)
+        log = MatchLog(path)
+        assert len(log) == 50
+        assert log.seed == 42
+        assert log.player_names == ["Bob", "Computer"]
+        assert log.digest == RPSLS_RULES.digest
+        assert log.moves_a.tolist() == list(game.players[0].history)
+        assert log.moves_b.tolist() == list(game.players[1].history)
+        assert log.scores() == (game.players[0].score, game.players[1].score)
+        assert isinstance(log.records, np.memmap)
+
+    def test_game_seed(self, game, tmp_path):
+        MatchLogWriter.for_game(tmp_path / "match.rpslog", game).close()
+        assert MatchLog(tmp_path / "match.rpslog").seed == 4
+
+    def test_seed_sequence(self, tmp_path):
+        MatchLogWriter.for_game(tmp_path / "match.rpslog", Game(seed=np.random.SeedSequence(9))).close()
+        assert MatchLog(tmp_path / "match.rpslog").seed == 9
+        with pytest.raises(ValueError):
+            MatchLogWriter.for_game(tmp_path / "other.rpslog", Game(seed=np.random.SeedSequence()))
+
+    def test_find_winner_and_batches(self, game, tmp_path):
+        path = tmp_path / "match.rpslog"
+        with MatchLogWriter.for_game(path, game):
+            game.next_round()
+            game.players[0].choose_object("rock")
+            game.players[1].current_object = RPSLS_RULES.get_object("paper")
+            game.find_winner()
+            game.play_rounds([0, 1, 2], [2, 1, 0])
+        log = MatchLog(path)
+        assert log.outcomes.tolist() == [LOSE, WIN, DRAW, LOSE]
+
+    def test_append(self, game, tmp_path):
+        path = tmp_path / "match.rpslog"
+        with MatchLogWriter.for_game(path, game):
+            play(game, 10)
+        with MatchLogWriter.for_game(path, game):
+            play(game, 5)
+        assert len(MatchLog(path)) == 15
+        with pytest.raises(ValueError):
+            MatchLogWriter(path, RPS_RULES)
+
+    def test_rejected_append_closes_file(self, game, tmp_path, monkeypatch):
+        path = tmp_path / "match.rpslog"
+        MatchLogWriter.for_game(path, game).close()
+        files = []
+
+        def recording_open(*args, **kwargs):
+            files.append(open(*args, **kwargs))
+            return files[-1]
+
+        monkeypatch.setattr(match_log, 'open', recording_open, raising=False)
+        with pytest.raises(ValueError):
+            MatchLogWriter(path, RPS_RULES)
+        assert len(files) == 1 and files[0].closed
+
+    def test_truncated_record(self, game, tmp_path):
+        path = tmp_path / "match.rpslog"
+        with MatchLogWriter.for_game(path, game):
+            play(game, 3)
+        with open(path, "ab") as f:
+            f.write(b"\x01\x00")
+        assert len(MatchLog(path)) == 3
+        with MatchLogWriter.for_game(path, game):
+            play(game, 1)
+        assert len(MatchLog(path)) == 4
+
+    def test_not_a_log(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"x" * HEADER.size)
+        with pytest.raises(ValueError):
+            MatchLog(path)
+
+    @pytest.mark.parametrize("num_rounds", [0, 1, 17, 50])
+    def test_replay(self, game, tmp_path, num_rounds):
+        path = tmp_path / "match.rpslog"
+        expected = {}
+        with MatchLogWriter.for_game(path, game):
+            for round_number in range(1, 51):
+                play(game, 1)
+                expected[round_number] = (game.report_round(), game.report_score())
+        replayed = replay(MatchLog(path), RPSLS_RULES, num_rounds)
+        assert replayed.current_round == num_rounds
+        if num_rounds:
+            assert (replayed.report_round(), replayed.report_score()) == expected[num_rounds]
+
+    def test_replay_wrong_rules(self, game, tmp_path):
+        path = tmp_path / "match.rpslog"
+        MatchLogWriter(path, RPSLS_RULES).close()
+        with pytest.raises(ValueError):
+            replay(MatchLog(path), RPS_RULES)
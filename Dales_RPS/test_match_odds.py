@@ -0,0 +1,143 @@
+from game_objects import Game, RPS_RULES, RPSLS_RULES, WIN, LOSE, WINS, DRAWS, LOSSES
+from match_odds import (round_probabilities, score_difference_distribution, fixed_rounds_probabilities,
+                        first_to_probabilities)
+from math import comb
+import numpy as np
+import pytest
+
+UNIFORM = np.full(5, 1 / 5)
+ROCK = np.array([1, 0, 0, 0, 0])
+
+
+def simulate(ruleset, strategy_a, strategy_b, rounds, num_matches, seed):
+    """ Plays num_matches matches with Game and returns the fraction won, drawn and lost by strategy_a """
+    rng = np.random.default_rng(seed)
+    results = np.zeros(3)
+    for _ in range(num_matches):
+        game = Game(ruleset=ruleset)
+        game.add_human_player("A")
+        game.add_human_player("B")
+        game.play_rounds(rng.choice(len(ruleset), rounds, p=strategy_a),
+                         rng.choice(len(ruleset), rounds, p=strategy_b))
+        score_a, score_b = (player.score for player in game.players)
+        results[WINS if score_a > score_b else LOSSES if score_a < score_b else DRAWS] += 1
+    return results / num_matches
+
+
+class TestRoundProbabilities:
+    def test_uniform(self):
+        assert round_probabilities(RPSLS_RULES, UNIFORM, UNIFORM) == pytest.approx([0.4, 0.2, 0.4])
+
+    def test_pure(self):
+        paper = np.array([0, 1, 0])
+        assert round_probabilities(RPS_RULES, paper, [1, 0, 0]).tolist() == [1, 0, 0]
+        assert round_probabilities(RPS_RULES, paper, paper).tolist() == [0, 1, 0]
+
+    def test_matches_outcome_table(self):
+        eye = np.eye(5)
+        probabilities = round_probabilities(RPSLS_RULES, eye[:, np.newaxis], eye[np.newaxis, :])
+        assert probabilities.shape == (5, 5, 3)
+        for i in range(5):
+            for j in range(5):
+                outcome = RPSLS_RULES.outcome_table[i][j]
+                assert probabilities[i, j, WINS] == (outcome == WIN)
+                assert probabilities[i, j, LOSSES] == (outcome == LOSE)
+
+    def test_batch(self):
+        strategies = np.random.default_rng(1).dirichlet(np.ones(5), size=1000)
+        probabilities = round_probabilities(RPSLS_RULES, strategies, UNIFORM)
+        assert probabilities.shape == (1000, 3)
+        # Every strategy breaks even against the uniform strategy in a balanced ruleset
+        assert probabilities[:, WINS] == pytest.approx(probabilities[:, LOSSES])
+        assert probabilities.sum(axis=-1) == pytest.approx(np.ones(1000))
+
+    @pytest.mark.parametrize("strategy", [[0.5, 0.5, 0, 0], [0.5, 0.6, 0, 0, -0.1], [0.5, 0.4, 0, 0, 0]])
+    def test_invalid(self, strategy):
+        with pytest.raises(ValueError):
+            round_probabilities(RPSLS_RULES, strategy, UNIFORM)
+
+
+class TestFixedRounds:
+    def test_distribution(self):
+        distribution = score_difference_distribution([0.5, 0, 0.5], 4)
+        assert distribution == pytest.approx(np.array([1, 0, 4, 0, 6, 0, 4, 0, 1]) / 16)
+
+    def test_binomial(self):
+        p_win, p_draw = 0.3, 0.2
+        rounds = 7
+        p_lose = 1 - p_win - p_draw
+        expected = [0, 0, 0]
+        for wins in range(rounds + 1):
+            for losses in range(rounds + 1 - wins):
+                draws = rounds - wins - losses
+                p = comb(rounds, wins) * comb(rounds - wins, losses) * p_win ** wins * p_lose ** losses * \
+                    p_draw ** draws
+                expected[WINS if wins > losses else LOSSES if wins < losses else DRAWS] += p
+        assert fixed_rounds_probabilities([p_win, p_draw, p_lose], rounds) == pytest.approx(expected)
+
+    def test_batch(self):
+        round_probs = round_probabilities(RPSLS_RULES, np.random.default_rng(2).dirichlet(np.ones(5), (30, 40)),
+                                          UNIFORM)
+        probabilities = fixed_rounds_probabilities(round_probs, 25)
+        assert probabilities.shape == (30, 40, 3)
+        assert probabilities.sum(axis=-1) == pytest.approx(np.ones((30, 40)))
+        assert probabilities[7, 9] == pytest.approx(fixed_rounds_probabilities(round_probs[7, 9], 25))
+
+    def test_against_simulation(self):
+        strategy_a = np.array([0.5, 0.2, 0.1, 0.1, 0.1])
+        expected = fixed_rounds_probabilities(round_probabilities(RPSLS_RULES, strategy_a, UNIFORM), 9)
+        simulated = simulate(RPSLS_RULES, strategy_a, UNIFORM, 9, 4000, seed=3)
+        assert simulated == pytest.approx(expected, abs=0.03)
+
+    def test_against_computer_player(self):
+        expected = fixed_rounds_probabilities(round_probabilities(RPSLS_RULES, ROCK, UNIFORM), 5)
+        game = Game(seed=4)
+        computer = game.add_computer_player()
+        game.add_human_player()
+        results = np.zeros(3)
+        for _ in range(4000):
+            game.reset()
+            game.play_rounds(computer.choose_moves(5), np.zeros(5, dtype=np.intp))
+            score_computer, score_rock = (player.score for player in game.players)
+            results[WINS if score_rock > score_computer else LOSSES if score_rock < score_computer else DRAWS] += 1
+        assert results / 4000 == pytest.approx(expected, abs=0.03)
+
+
+class TestFirstTo:
+    def test_closed_form(self):
+        p, k = 0.6, 5
+        expected_win = sum(comb(k - 1 + j, j) * p ** k * (1 - p) ** j for j in range(k))
+        assert first_to_probabilities([0.3, 0.5, 0.2], k) == pytest.approx([expected_win, 0, 1 - expected_win])
+
+    def test_first_to_one(self):
+        assert first_to_probabilities([0.2, 0.7, 0.1], 1) == pytest.approx([2 / 3, 0, 1 / 3])
+
+    def test_never_ends(self):
+        assert first_to_probabilities([[0, 1, 0], [0.5, 0, 0.5]], 3).tolist() == [[0, 1, 0], [0.5, 0, 0.5]]
+
+    def test_batch(self):
+        round_probs = np.random.default_rng(5).dirichlet(np.ones(3), 5000)
+        probabilities = first_to_probabilities(round_probs, 11)
+        assert probabilities.shape == (5000, 3)
+        assert probabilities.sum(axis=-1) == pytest.approx(np.ones(5000))
+        assert probabilities[123] == pytest.approx(first_to_probabilities(round_probs[123], 11))
+
+    def test_against_simulation(self):
+        strategy_a, strategy_b = [0.6, 0.3, 0.1], [0.2, 0.3, 0.5]
+        expected = first_to_probabilities(round_probabilities(RPS_RULES, strategy_a, strategy_b), 3)
+        rng = np.random.default_rng(6)
+        moves_a = iter(rng.choice(3, 10 ** 5, p=strategy_a).tolist())
+        moves_b = iter(rng.choice(3, 10 ** 5, p=strategy_b).tolist())
+        wins = 0
+        for _ in range(4000):
+            game = Game(ruleset=RPS_RULES)
+            game.add_human_player()
+            game.add_human_player()
+            while max(player.score for player in game.players) < 3:
+                game.play_round(next(moves_a), next(moves_b))
+            wins += game.players[0].score == 3
+        assert wins / 4000 == pytest.approx(expected[WINS], abs=0.03)
+
+    def test_invalid_k(self):
+        with pytest.raises(ValueError):
+            first_to_probabilities([0.5, 0, 0.5], 0)
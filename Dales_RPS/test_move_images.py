@@ -0,0 +1,55 @@
+from move_images import MoveImages, IMAGE_DIR
+import os
+import shutil
+import pytest
+
+
+class TestMoveImages:
+    @pytest.fixture
+    def images(self, tmp_path):
+        image_dir = tmp_path / "images"
+        image_dir.mkdir()
+        shutil.copy(IMAGE_DIR / "rock.png", image_dir)
+        return MoveImages(size=(32, 32), image_dir=image_dir, cache_dir=tmp_path / "cache")
+
+    def test_image_dir(self):
+        assert (IMAGE_DIR / "spock.png").is_file()
+
+    def test_cached_image(self, images):
+        pytest.importorskip("PIL")
+        from PIL import Image
+
+        path = images.cached_image("rock")
+        assert path.parent == images.cache_dir
+        assert path.name.startswith("rock-32x32-")
+        with Image.open(path) as image:
+            assert image.size == (32, 32)
+
+    def test_cache_hit_skips_resize(self, images, monkeypatch):
+        pytest.importorskip("PIL")
+        path = images.cached_image("rock")
+
+        def resize(name):
+            raise AssertionError("cached image was resized again")
+
+        monkeypatch.setattr(images, "resize", resize)
+        assert images.cached_image("rock") == path
+
+    def test_source_change(self, images):
+        pytest.importorskip("PIL")
+        old_path = images.cached_image("rock")
+        source = images.source_path("rock")
+        os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 10 ** 9))
+        new_path = images.cached_image("rock")
+        assert new_path != old_path
+        assert new_path.is_file()
+        assert not old_path.exists()
+
+    def test_missing_image(self, images):
+        assert images.source_path("lizard") is None
+        assert images.cached_image("lizard") is None
+
+    def test_unwritable_cache(self, images, tmp_path):
+        (tmp_path / "not_a_dir").write_text("")
+        images.cache_dir = tmp_path / "not_a_dir" / "cache"
+        assert images.cached_image("rock") is None
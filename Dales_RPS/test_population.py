@@ -0,0 +1,91 @@
+from game_objects import Ruleset, RPS_RULES, RPSLS_RULES, RPS_OBJECTS
+from population import strategy_payoffs, replicator_derivative, replicator_dynamics, MoranProcess
+import numpy as np
+import pytest
+
+ROCK_PAPER = [[1, 0, 0], [0, 1, 0]]
+
+
+def exact_fixation(process):
+    """ The probability that one type 1 player takes over a population of type 0, for a two type Moran process """
+    total, product = 1, 1
+    for mutants in range(1, process.population_size):
+        fitness = process.fitness(np.array([process.population_size - mutants, mutants]))
+        product *= fitness[0] / fitness[1]
+        total += product
+    return 1 / total
+
+
+class TestReplicator:
+    def test_strategy_payoffs(self):
+        assert np.array_equal(strategy_payoffs(RPS_RULES), RPS_RULES.payoff_matrix)
+        assert strategy_payoffs(RPS_RULES, ROCK_PAPER).tolist() == [[0, -1], [1, 0]]
+        uniform = np.full(5, 1 / 5)
+        assert strategy_payoffs(RPSLS_RULES, [uniform, [1, 0, 0, 0, 0]]) == pytest.approx(np.zeros((2, 2)))
+
+    def test_rest_point(self):
+        assert replicator_derivative(RPS_RULES.payoff_matrix, np.full(3, 1 / 3)) == pytest.approx(np.zeros(3))
+
+    def test_cycles(self):
+        # In rock, paper, scissors the product of the shares is conserved, so populations cycle around 1/3 each
+        initial = np.array([[0.5, 0.3, 0.2], [0.2, 0.2, 0.6], [1 / 3, 1 / 3, 1 / 3]])
+        times, shares = replicator_dynamics(RPS_RULES, initial, t_max=20, dt=0.01, record_every=100)
+        assert times.tolist() == pytest.approx(np.arange(21).tolist())
+        assert shares.shape == (21, 3, 3)
+        assert shares.prod(axis=-1) == pytest.approx(np.broadcast_to(initial.prod(axis=-1), (21, 3)), rel=1e-6)
+        assert shares.sum(axis=-1) == pytest.approx(np.ones((21, 3)))
+        assert not np.allclose(shares[7, 0], initial[0])
+
+    def test_dominated_dies_out(self):
+        # 'well' dominates rock, so rock's share falls to zero
+        ruleset = Ruleset(RPS_OBJECTS + ('well',), {'rock': ['scissors'], 'paper': ['rock', 'well'],
+                                                    'scissors': ['paper'], 'well': ['rock', 'scissors']})
+        _, shares = replicator_dynamics(ruleset, np.full(4, 1 / 4), t_max=200, dt=0.05, record_every=4000)
+        assert shares[-1, 0] < 1e-3
+
+    @pytest.mark.parametrize("shares", [[0.5, 0.5], [0.5, 0.6, -0.1], [0.2, 0.2, 0.2]])
+    def test_invalid(self, shares):
+        with pytest.raises(ValueError):
+            replicator_dynamics(RPS_RULES, shares, t_max=1)
+
+
+class TestMoran:
+    def test_neutral(self):
+        process = MoranProcess(RPS_RULES, ROCK_PAPER, population_size=20, selection=0, seed=1)
+        result = process.run([19, 1], num_populations=10000)
+        assert (result.fixed_type >= 0).all()
+        assert result.fixation_probabilities()[1] == pytest.approx(1 / 20, abs=0.007)
+        # A neutral mutant that takes over does so in N * (N - 1) steps on average
+        assert result.mean_fixation_steps()[1] == pytest.approx(20 * 19, rel=0.1)
+
+    @pytest.mark.parametrize("selection", [0.5, 2])
+    def test_selection(self, selection):
+        process = MoranProcess(RPS_RULES, ROCK_PAPER, population_size=15, selection=selection, seed=2)
+        result = process.run([14, 1], num_populations=10000)
+        assert result.fixation_probabilities()[1] == pytest.approx(exact_fixation(process), abs=0.02)
+
+    def test_three_types(self):
+        process = MoranProcess(RPSLS_RULES, population_size=12, seed=3)
+        result = process.run([[3, 3, 2, 2, 2], [12, 0, 0, 0, 0]], record_every=5)
+        assert (result.counts.sum(axis=1) == 12).all()
+        assert result.fixed_type[1] == 0 and result.fixation_steps[1] == 0
+        assert result.history.shape[1:] == (2, 5)
+        assert (result.history.sum(axis=2) == 12).all()
+        assert (np.diff(result.history_steps, axis=0) >= 0).all()
+        assert np.array_equal(result.history[-1], result.counts)
+
+    def test_max_changes(self):
+        result = MoranProcess(RPS_RULES, population_size=1000, seed=4).run([400, 300, 300], max_changes=10)
+        assert result.fixed_type.tolist() == [-1]
+        assert abs(result.counts[0] - [400, 300, 300]).sum() <= 20
+        assert result.fixation_probabilities().tolist() == [0, 0, 0]
+
+    def test_seed(self):
+        first = MoranProcess(RPS_RULES, population_size=30, seed=5)
+        second = MoranProcess(RPS_RULES, population_size=30, seed=first.seed)
+        assert np.array_equal(first.run([10, 10, 10], 50).fixation_steps, second.run([10, 10, 10], 50).fixation_steps)
+
+    @pytest.mark.parametrize("counts", [[10, 10], [10, 10, 9], [10.0, 10.0, 10.0], [40, -5, -5]])
+    def test_invalid(self, counts):
+        with pytest.raises(ValueError):
+            MoranProcess(RPS_RULES, population_size=30).run(counts)
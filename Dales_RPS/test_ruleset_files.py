@@ -0,0 +1,139 @@
+from game_objects import RPS_RULES, RPSLS_RULES
+from ruleset_files import (read_definition, compile_definition, load_ruleset, load_rulesets, check_rulesets,
+                           cache_key, BalanceReport)
+import ruleset_files
+import json
+import numpy as np
+import pytest
+
+RPS_DEFINITION = {"name": "RPS", "objects": ["rock", "paper", "scissors"],
+                  "wins": {"rock": ["scissors"], "paper": ["rock"], "scissors": ["paper"]}}
+
+
+def write_rules(directory, file_name, definition):
+    path = directory / file_name
+    path.write_text(json.dumps(definition))
+    return path
+
+
+class TestDefinitions:
+    def test_read_toml(self, tmp_path):
+        path = tmp_path / "rps7.toml"
+        path.write_text('objects = ["rock", "fire", "scissors", "sponge", "paper", "air", "water"]\ncyclic = true\n')
+        name, ruleset = compile_definition(read_definition(path), path.stem)
+        assert name == "rps7"
+        assert ruleset.win_dict['rock'] == ('fire', 'scissors', 'sponge')
+
+    def test_compile(self):
+        assert compile_definition(RPS_DEFINITION) == ("RPS", RPS_RULES)
+
+    def test_unknown_suffix(self, tmp_path):
+        with pytest.raises(ValueError):
+            read_definition(tmp_path / "rules.yaml")
+
+    @pytest.mark.parametrize("wins, message", [
+        ({"rock": ["rock"]}, "rock beats itself"),
+        ({"rock": ["scissors"], "scissors": ["rock"]}, "rock and scissors beat each other"),
+        ({"rock": ["well"]}, "rock beats well, which is not one of the objects"),
+        ({"well": ["rock"]}, "well is not one of the objects"),
+        ({"rock": "scissors"}, "what rock beats must be a list"),
+    ])
+    def test_invalid(self, wins, message):
+        with pytest.raises(ValueError, match=message):
+            compile_definition({"name": "bad", "objects": ["rock", "paper", "scissors"], "wins": wins})
+
+    def test_every_error_reported(self):
+        definition = {"name": "bad", "objects": ["rock", "paper", "rock"], "wins": {"rock": ["rock", "well"]}}
+        with pytest.raises(ValueError) as error:
+            compile_definition(definition)
+        assert str(error.value) == ("bad: rock is listed more than once; rock beats well, which is not one of the "
+                                    "objects; rock beats itself")
+
+    @pytest.mark.parametrize("definition", [
+        {"objects": ["rock", "paper", "scissors"], "wins": {}},
+        {"name": "bad", "objects": ["rock"], "wins": {}},
+        {"name": "bad", "objects": ["rock", "paper"]},
+        {"name": "bad", "objects": ["rock", "paper", "scissors", "spock"], "cyclic": True},
+    ])
+    def test_incomplete(self, definition):
+        with pytest.raises(ValueError):
+            compile_definition(definition)
+
+
+class TestCache:
+    def test_cached_load_skips_validation(self, tmp_path, monkeypatch):
+        path = write_rules(tmp_path, "rps.json", RPS_DEFINITION)
+        cache_dir = tmp_path / "cache"
+        assert load_ruleset(path, cache_dir) == ("RPS", RPS_RULES)
+        assert (cache_dir / f"{cache_key(path.read_bytes())}.npz").exists()
+
+        def fail(definition, default_name=None):
+            raise AssertionError("Compiled again")
+
+        monkeypatch.setattr(ruleset_files, 'compile_definition', fail)
+        name, ruleset = load_ruleset(path, cache_dir)
+        assert name == "RPS" and ruleset == RPS_RULES
+        assert ruleset.win_dict == RPS_RULES.win_dict
+
+    def test_edited_file_compiled_again(self, tmp_path):
+        path = write_rules(tmp_path, "rules.json", RPS_DEFINITION)
+        cache_dir = tmp_path / "cache"
+        load_ruleset(path, cache_dir)
+        write_rules(tmp_path, "rules.json", dict(RPS_DEFINITION, wins={"rock": ["paper"]}))
+        assert load_ruleset(path, cache_dir)[1].win_dict['rock'] == ('paper',)
+        assert len(list(cache_dir.iterdir())) == 2
+
+    def test_unnamed_files_named_after_file(self, tmp_path):
+        definition = {key: value for key, value in RPS_DEFINITION.items() if key != 'name'}
+        rules_dir = tmp_path / "rules"
+        rules_dir.mkdir()
+        cache_dir = tmp_path / "cache"
+        path = write_rules(rules_dir, "alpha.json", definition)
+        assert load_ruleset(path, cache_dir)[0] == "alpha"
+        assert load_ruleset(path.rename(rules_dir / "beta.json"), cache_dir) == ("beta", RPS_RULES)
+        write_rules(rules_dir, "gamma.json", definition)
+        assert load_rulesets(rules_dir, cache_dir) == {"beta": RPS_RULES, "gamma": RPS_RULES}
+        assert len(list(cache_dir.iterdir())) == 1
+
+    @pytest.mark.parametrize("damage", ["replace", "truncate", "reshape"])
+    def test_damaged_cache(self, tmp_path, damage):
+        path = write_rules(tmp_path, "rps.json", RPS_DEFINITION)
+        cache_dir = tmp_path / "cache"
+        load_ruleset(path, cache_dir)
+        cache_path = cache_dir / f"{cache_key(path.read_bytes())}.npz"
+        if damage == "replace":
+            cache_path.write_bytes(b"not a cache file")
+        elif damage == "truncate":
+            cache_path.write_bytes(cache_path.read_bytes()[:-40])
+        else:
+            np.savez(cache_path, name=np.array("RPS"), objects=np.array(RPS_RULES.allowable_objects),
+                     win_bits=np.zeros((2, 1), dtype=np.uint8))
+        assert load_ruleset(path, cache_dir) == ("RPS", RPS_RULES)
+        assert load_ruleset(path, cache_dir) == ("RPS", RPS_RULES)
+
+
+class TestRulesDirectory:
+    def test_shipped_rules(self, tmp_path):
+        rulesets = load_rulesets(cache_dir=tmp_path)
+        assert rulesets['RPS'] == RPS_RULES
+        assert rulesets['RPSLS'] == RPSLS_RULES
+        assert len(rulesets['RPS-7']) == 7
+        assert all(report.is_balanced for report in check_rulesets())
+
+    def test_duplicate_names(self, tmp_path):
+        write_rules(tmp_path, "a.json", RPS_DEFINITION)
+        write_rules(tmp_path, "b.json", RPS_DEFINITION)
+        (tmp_path / "notes.txt").write_text("ignored")
+        with pytest.raises(ValueError, match="already a ruleset called RPS"):
+            load_rulesets(tmp_path, cache_dir=None)
+
+    def test_balance_report(self):
+        _, ruleset = compile_definition({"name": "lopsided", "objects": ["rock", "paper", "scissors", "well"],
+                                         "wins": {"rock": ["scissors"], "paper": ["rock", "well"],
+                                                  "scissors": ["paper"], "well": ["rock", "scissors"]}})
+        report = BalanceReport("lopsided", ruleset)
+        assert not report.is_balanced
+        assert report.wins == {'rock': 1, 'paper': 2, 'scissors': 1, 'well': 2}
+        assert report.losses == {'rock': 2, 'paper': 1, 'scissors': 2, 'well': 1}
+        assert report.drawn_pairs == 0
+        assert str(report).startswith("lopsided: 4 objects, not balanced, 0 drawn pairs")
@@ -0,0 +1,117 @@
+from game_objects import Game, ComputerPlayer, PlayerObject, RPS_RULES, RPSLS_RULES
+from strategies import LearningPlayer, FrequencyPlayer, MarkovPlayer, LookupTablePlayer
+import numpy as np
+import pytest
+
+
+class Cycle(ComputerPlayer):
+    """ Plays the allowable objects in order """
+    def choose_object(self, ruleset=None):
+        self.current_object = self.ruleset.objects[len(self.history) % len(self.ruleset)]
+
+
+class AlwaysPaper(ComputerPlayer):
+    def choose_object(self, ruleset=None):
+        self.current_object = PlayerObject("paper", self.ruleset)
+
+
+def play(game, player, opponent, rounds):
+    for _ in range(rounds):
+        player.choose_object()
+        opponent.choose_object()
+        game.play_round(player.current_object, opponent.current_object)
+
+
+class TestRuleset:
+    def test_beaten_by(self):
+        assert RPS_RULES.beaten_by == ((1,), (2,), (0,))
+        assert RPSLS_RULES.beaten_by[RPSLS_RULES.object_index["spock"]] == (1, 3)
+
+
+class TestLearningPlayer:
+    def test_abstract(self):
+        with pytest.raises(TypeError):
+            LearningPlayer()
+
+
+class TestFrequencyPlayer:
+    @pytest.mark.parametrize("ruleset", [RPS_RULES, RPSLS_RULES])
+    def test_beats_constant_move(self, ruleset):
+        game = Game(ruleset=ruleset)
+        player = game.add_player(FrequencyPlayer())
+        opponent = game.add_player(AlwaysPaper())
+        play(game, player, opponent, 100)
+        assert player.counts[ruleset.object_index["paper"]] == 100
+        assert player.predict() == ruleset.object_index["paper"]
+        # After the first round every move beats paper
+        assert player.score >= 99
+
+    def test_observe_batch(self):
+        game = Game(ruleset=RPS_RULES)
+        player = game.add_player(FrequencyPlayer())
+        game.add_player(AlwaysPaper())
+        game.play_rounds(np.zeros(10, dtype=int), np.array([0, 2, 2, 1, 2, 2, 0, 2, 2, 2]))
+        assert player.counts == [2, 1, 7]
+        assert player.predict() == 2
+
+
+class TestMarkovPlayer:
+    @pytest.mark.parametrize("ruleset", [RPS_RULES, RPSLS_RULES])
+    def test_beats_cycle(self, ruleset):
+        game = Game(ruleset=ruleset)
+        player = game.add_player(MarkovPlayer())
+        opponent = game.add_player(Cycle())
+        play(game, player, opponent, 100)
+        # Once each transition has been seen, every prediction is right
+        assert player.score >= 100 - 2 * len(ruleset)
+
+    def test_higher_order(self):
+        class SecondOrderMarkov(MarkovPlayer):
+            order = 2
+
+        game = Game(ruleset=RPS_RULES)
+        player = game.add_player(SecondOrderMarkov())
+        game.add_player(AlwaysPaper())
+        assert player.predict() is None
+        player.observe(0, 1)
+        assert player.predict() is None
+        player.observe(0, 1)
+        player.observe(0, 1)
+        assert player.transitions == {1 * 3 + 1: [0, 1, 0]}
+        assert player.predict() == 1
+
+    def test_plays_random_opponent(self):
+        game = Game()
+        game.add_player(MarkovPlayer())
+        game.add_player(ComputerPlayer())
+        play(game, *game.players, 50)
+        assert game.current_round == 50
+
+
+class TestLookupTablePlayer:
+    def test_beats_constant_move(self):
+        # Plays scissors after paper, and rock otherwise
+        game = Game(ruleset=RPS_RULES)
+        player = game.add_player(LookupTablePlayer([0, 2, 0], ruleset=RPS_RULES))
+        opponent = game.add_player(AlwaysPaper(RPS_RULES))
+        play(game, player, opponent, 50)
+        assert player.score >= 49
+        assert player.current_object.name == "scissors"
+
+    def test_higher_order(self):
+        table = np.arange(9) % 3
+        player = LookupTablePlayer(table, order=2, ruleset=RPS_RULES)
+        player.observe(0, 2)
+        player.choose_object()
+        player.observe(0, 1)
+        player.choose_object()
+        # The context is 2 * 3 + 1
+        assert player.current_object.index == table[7]
+        player.observe_batch(np.zeros(2, dtype=int), np.array([1, 1]))
+        player.choose_object()
+        assert player.current_object.index == table[4]
+
+    @pytest.mark.parametrize("table, order", [([0, 1, 2], 1), ([0, 1, 5, 0, 0], 1), ([0] * 5, 2)])
+    def test_invalid_table(self, table, order):
+        with pytest.raises(ValueError):
+            LookupTablePlayer(table, order)
@@ -0,0 +1,67 @@
+from game_objects import PlayerObject, ComputerPlayer, RPS_RULES
+from tournament import Tournament, play_match, play_matches, WINS, DRAWS, LOSSES
+import numpy as np
+import pytest
+
+
+class AlwaysRock(ComputerPlayer):
+    def choose_object(self):
+        self.current_object = PlayerObject("rock", self.ruleset)
+
+
+class AlwaysPaper(ComputerPlayer):
+    def choose_object(self):
+        self.current_object = PlayerObject("paper", self.ruleset)
+
+
+class TestMatches:
+    def test_play_match(self):
+        assert play_match(AlwaysRock, AlwaysPaper, 5) == (0, 5)
+        assert play_match(AlwaysRock, AlwaysRock, 5) == (0, 0)
+
+    def test_play_matches(self):
+        work_unit = (0, 1, AlwaysPaper, AlwaysRock, 3, 5, RPS_RULES, np.random.SeedSequence(1).spawn(3))
+        assert play_matches(work_unit) == (0, 1, 3, 0, 0)
+
+
+class TestTournament:
+    @pytest.fixture
+    def tournament(self):
+        return Tournament([AlwaysRock, AlwaysPaper, ComputerPlayer],
+                          rounds_per_match=5, matches_per_pairing=7,
+                          ruleset=RPS_RULES)
+
+    def test_schedule(self, tournament):
+        work_units = tournament.schedule(chunk_size=3)
+        # 3 pairings, each split into chunks of 3, 3 and 1 matches
+        assert len(work_units) == 9
+        assert sum(unit[4] for unit in work_units) == 3 * 7
+
+    def test_run(self, tournament):
+        results = tournament.run(max_workers=2, chunk_size=3)
+        assert results[1, 0].tolist() == [7, 0, 0]
+        assert results[0, 1].tolist() == [0, 0, 7]
+        # Every match is counted once from each side
+        assert results[..., WINS].sum() == results[..., LOSSES].sum()
+        assert results.sum() == 2 * 3 * 7
+        assert (results[..., DRAWS] == results[..., DRAWS].T).all()
+
+    def test_seeded_run(self):
+        def run(max_workers, chunk_size, seed=5):
+            tournament = Tournament([ComputerPlayer, ComputerPlayer], rounds_per_match=5, matches_per_pairing=40,
+                                    seed=seed)
+            return tournament.run(max_workers=max_workers, chunk_size=chunk_size).tolist()
+
+        assert run(1, 40) == run(2, 3)
+        assert run(1, 40) != run(1, 40, seed=6)
+
+    def test_seed_recorded(self):
+        tournament = Tournament([AlwaysRock, AlwaysPaper])
+        assert isinstance(tournament.seed, int)
+        repeat = Tournament([AlwaysRock, AlwaysPaper], seed=tournament.seed)
+        match_seed, repeat_seed = tournament.schedule(1)[0][-1][0], repeat.schedule(1)[0][-1][0]
+        assert match_seed.generate_state(4).tolist() == repeat_seed.generate_state(4).tolist()
+
+    def test_too_few_strategies(self):
+        with pytest.raises(ValueError):
+            Tournament([AlwaysRock])
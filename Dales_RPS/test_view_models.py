@@ -0,0 +1,136 @@
+from game_objects import Game, RPS_RULES
+from view_models import GameOptionsViewModel, GameViewModel
+import pytest
+
+
+def record_events(view_model, *events):
+    """ Returns a list that every emitted (event, value) is appended to """
+    emitted = []
+    for event in events:
+        view_model.subscribe(event, lambda value, event=event: emitted.append((event, value)))
+    return emitted
+
+
+@pytest.fixture
+def game():
+    game = Game(seed=9)
+    game.add_human_player()
+    game.add_computer_player()
+    return game
+
+
+class TestGameOptionsViewModel:
+    @pytest.fixture
+    def options(self, game):
+        return GameOptionsViewModel(game)
+
+    def test_set_up(self, options):
+        emitted = record_events(options, 'user_name', 'num_rounds')
+        options.set_up()
+        assert emitted == [('user_name', ''), ('num_rounds', 5)]
+
+    @pytest.mark.parametrize("user_name, valid, start_enabled", [("Bob", True, True),
+                                                                 ("", True, False),
+                                                                 ("Bob1", False, False),
+                                                                 ("Abcdefghijklm", False, False),
+                                                                 ])
+    def test_validate_entry(self, options, user_name, valid, start_enabled):
+        assert options.validate_entry(user_name) == valid
+        assert options.start_enabled == start_enabled
+
+    def test_validate_entry_sets_name(self, options, game):
+        emitted = record_events(options, 'start_enabled')
+        options.validate_entry("Bob")
+        options.validate_entry("Bobby")
+        options.validate_entry("")
+        assert game.players[0].name == "Bobby"
+        assert emitted == [('start_enabled', True), ('start_enabled', False)]
+
+    def test_change_game(self, options, game):
+        emitted = record_events(options, 'title', 'ruleset')
+        options.change_game('RPS')
+        assert game.ruleset is RPS_RULES
+        assert emitted == [('title', "Rock, Paper, Scissors Game"), ('ruleset', RPS_RULES)]
+
+    def test_start_game(self, options, game):
+        options.start_game(3)
+        assert game.max_rounds == 3
+
+
+class TestGameViewModel:
+    @pytest.fixture
+    def view_model(self, game):
+        game.players[0].set_name("Bob")
+        game.set_max_rounds(2)
+        return GameViewModel(game)
+
+    def computer_object(self, view_model):
+        computer = view_model.game.players[1]
+        computer.choose_object()
+        return computer.current_object
+
+    def test_set_up(self, view_model):
+        emitted = record_events(view_model, 'report_message', 'results_message')
+        view_model.set_up()
+        assert emitted == [('report_message', "Choose rock, paper, scissors, lizard\n or spock to start"),
+                           ('results_message', "Welcome Bob. You have 2 rounds to play")]
+
+    @pytest.mark.parametrize("char, keysym, command", [("r", "r", "rock"),
+                                                       ("K", "K", "spock"),
+                                                       ("o", "o", "options"),
+                                                       ("n", "n", "restart"),
+                                                       ("q", "q", "quit"),
+                                                       ("", "Escape", "quit"),
+                                                       ("x", "x", None),
+                                                       ])
+    def test_key_command(self, view_model, char, keysym, command):
+        assert view_model.key_command(char, keysym) == command
+
+    def test_key_command_follows_rules(self, view_model):
+        view_model.game.set_ruleset(RPS_RULES)
+        assert view_model.key_command("l") is None
+        assert view_model.key_command("s") == "scissors"
+
+    def test_play_round(self, view_model):
+        emitted = record_events(view_model, 'report_message', 'results_message', 'actions_enabled')
+        assert view_model.select_object("spock")
+        assert not view_model.complete_round(self.computer_object(view_model))
+        assert emitted == [('report_message', "Bob choose 'spock'.\nComputer choose 'paper'.\nComputer won this round"),
+                           ('results_message', "After 1 rounds: Bob has scored 0 Computer has scored 1\n"
+                                               "You have 1 rounds left to play")]
+
+    def test_finished(self, view_model):
+        emitted = record_events(view_model, 'actions_enabled')
+        for item in ("rock", "rock"):
+            view_model.select_object(item)
+            view_model.complete_round(self.computer_object(view_model))
+        assert emitted == [('actions_enabled', False)]
+        view_model.restart_game()
+        assert emitted[-1] == ('actions_enabled', True)
+        assert view_model.game.current_round == 0
+
+    def test_coalesce_selections(self, view_model):
+        view_model.game.set_max_rounds(10)
+        assert view_model.select_object("rock")
+        # Selections while the computer is choosing are queued, and only the latest is kept
+        assert not view_model.select_object("paper")
+        assert not view_model.select_object("lizard")
+        assert view_model.complete_round(self.computer_object(view_model))
+        assert view_model.chosen_item == "lizard"
+        assert not view_model.complete_round(self.computer_object(view_model))
+        assert list(view_model.game.players[0].history) == [0, 3]
+        assert not view_model.waiting_for_computer
+
+    def test_restart_while_waiting(self, view_model):
+        view_model.select_object("rock")
+        view_model.select_object("paper")
+        view_model.restart_game()
+        assert not view_model.waiting_for_computer
+        assert view_model.queued_item is None
+        assert view_model.select_object("spock")
+
+    def test_rules_changed(self, view_model):
+        emitted = record_events(view_model, 'action_objects')
+        view_model.game.set_ruleset(RPS_RULES)
+        view_model.rules_changed()
+        assert emitted == [('action_objects', ('rock', 'paper', 'scissors'))]
@@ -1,25 +1,23 @@
 """ Module contains the tkinter view for running rock, paper, scissors. The view imports the underlying structure of
-the rock-paper-scissors game by importing the game_objects"""
+the rock-paper-scissors game by importing the game_objects. The display logic is in the view-models, so the frames
+here only bind widgets to them"""
 
 # rock-paper-scissors/tkinter_rps
 
 import tkinter as tk
 from tkinter import ttk
 
-from game_objects import Game, PlayerObject, RPSLS_WIN_DICT, RPS_WIN_DICT
+from game_objects import Game, RPSLS_RULES
+from move_images import MoveImages
+from view_models import GameOptionsViewModel, GameViewModel
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-from PIL import Image, ImageTk
 
-IMAGES = {"scissors": Image.open(r'../images/scissors.png').resize((64, 64), resample=Image.LANCZOS),
-          "rock": Image.open(r'../images/rock.png').resize((64, 64), resample=Image.LANCZOS),
-          "paper": Image.open(r'../images/paper.png').resize((64, 64), resample=Image.LANCZOS),
-          "lizard": Image.open(r'../images/lizard.png').resize((64, 64), resample=Image.LANCZOS),
-          "spock": Image.open(r'../images/spock.png').resize((64, 64), resample=Image.LANCZOS),
-          }
+# Images are loaded (and resized if they aren't cached) when a GameGUI is created, not at import
+IMAGES = MoveImages()
 
-RULES = {'RPS': RPS_WIN_DICT,
-         'RPSLS': RPSLS_WIN_DICT,
-         }
+# How often (ms) the GUI checks whether the computer has chosen its object - well inside a 16 ms frame
+COMPUTER_POLL_MS = 10
 
 
 class GameApp(tk.Tk):
@@ -30,19 +28,26 @@ class GameApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.game = create_game()
-        self.game_titles = {rule_name: ', '.join(obj.title() for obj in rule_dict.keys())
-                            for rule_name, rule_dict in RULES.items()}
-        # Set the window title
-        self.title(self.game_titles['RPSLS'] + ' Game')
+        # The computer chooses its objects in a worker thread, so a slow strategy doesn't freeze the window
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # Create the view-models for the frames - when the options change the rules, the game view updates its buttons
+        self.view_models = {
+            "game_options": GameOptionsViewModel(self.game),
+            "main_game": GameViewModel(self.game),
+        }
+        self.view_models["game_options"].subscribe('ruleset', self.view_models["main_game"].rules_changed)
+        self.view_models["game_options"].subscribe('title', self.set_title)
+
         self.resizable(False, False)
 
         # Create an overall title and pack it into the top of the container
         self.title_label = tk.Label(self,
-                                    text=self.game_titles['RPSLS'] + ' Game',
                                     bg="red", fg="white",
                                     width=40,
                                     font=("Arial", 20))
         self.title_label.pack(side=tk.TOP)
+        self.set_title(self.view_models["game_options"].title)
 
         # Create a dictionary of frames. The key identifies the frame and the value is an instance of the
         # frame object
@@ -54,6 +59,15 @@ class GameApp(tk.Tk):
         # Show the GameOptionsGUI frame
         self.show_frame("game_options")
 
+    def set_title(self, title_string):
+        # Set the window title and the title label
+        self.title(title_string)
+        self.title_label.config(text=title_string)
+
+    def destroy(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
     # Function to show the desired game class, which is a subclass of tk.Frame
     def show_frame(self, current_frame: str):
         widgets = self.winfo_children()
@@ -75,15 +89,14 @@ class GameOptionsGUI(tk.Frame):
         super().__init__()
 
         self.controller = controller
-        self.game = controller.game
-        self.player = self.game.player
+        self.view_model = controller.view_models["game_options"]
 
         # Set up user_name and num_rounds as tkinter variables
         self.user_name = tk.StringVar()
         self.num_rounds = tk.IntVar()
         self.game_type = tk.StringVar()
 
-        self.game_type.set('RPSLS')
+        self.game_type.set(self.view_model.game_type)
 
         game_type_label = tk.Label(self, text="Game Type:")
         name_label = tk.Label(self, text="Player Name:")
@@ -92,14 +105,14 @@ class GameOptionsGUI(tk.Frame):
         # Set up the radio button frame with the different options
         game_type_combo = ttk.Combobox(self,
                                        textvariable=self.game_type,
-                                       values=list(self.controller.game_titles.keys()),
+                                       values=list(self.view_model.game_titles.keys()),
                                        width=15,
                                        )
         game_type_combo.bind('<<ComboboxSelected>>', self.game_type_select_callback)
 
         # the validate command must be registered this allows the value of the edit box after it is typed, but before
         # it is accepted to be passed as '%P'
-        vcmd = (self.register(self.validate_entry), '%P')
+        vcmd = (self.register(self.view_model.validate_entry), '%P')
         self.name_edit = tk.Entry(self, textvariable=self.user_name,
                                   name='editbox',
                                   validate='key',
@@ -129,46 +142,29 @@ class GameOptionsGUI(tk.Frame):
         self.columnconfigure(0, weight=1)
         self.columnconfigure(1, weight=1)
 
+        # Keep the widgets in step with the view-model
+        self.view_model.subscribe('user_name', self.user_name.set)
+        self.view_model.subscribe('num_rounds', self.num_rounds.set)
+        self.view_model.subscribe('start_enabled',
+                                  lambda enabled: self.start_button.config(state=tk.NORMAL if enabled else tk.DISABLED))
+
         # Binds the return key to have the same effect a pressing the start_button
         self.controller.bind('<Return>', lambda event=None: self.start_button.invoke())
 
     # Sets up players and rounds
     def set_up(self):
-        if self.game.players:
-            self.user_name.set(self.player.name)
-        if self.game.max_rounds:
-            self.num_rounds.set(self.game.max_rounds)
-        else:
-            self.num_rounds.set(5)
+        self.view_model.set_up()
         # Put the cursor in the name_edit box and focus on the current frame (so that keystrokes binds work)
         self.name_edit.focus()
         self.focus()
 
     def start_game(self):
-        self.game.set_max_rounds(self.num_rounds.get())
+        self.view_model.start_game(self.num_rounds.get())
         # Switch to the GameGUI frame.
         self.controller.show_frame("main_game")
 
-    def change_game(self, rules):
-        PlayerObject.set_object_rules(list(rules.keys()), rules)
-        self.controller.frames["main_game"] = GameGUI(self.controller)
-        title_string = self.controller.game_titles[self.game_type.get()] + " Game"
-        self.controller.title(title_string)
-        self.controller.title_label.config(text=title_string)
-
-    def validate_entry(self, user_name):
-        if (0 < len(user_name) < 13) and user_name.isalpha():
-            self.start_button.config(state=tk.NORMAL)
-            self.player.set_name(user_name)
-        elif len(user_name) == 0:
-            self.start_button.config(state=tk.DISABLED)
-        else:
-            return False
-        return True
-
     def game_type_select_callback(self, e):
-        rules = RULES[self.game_type.get()]
-        self.change_game(rules)
+        self.view_model.change_game(self.game_type.get())
 
 
 class GameGUI(tk.Frame):
@@ -176,107 +172,125 @@ class GameGUI(tk.Frame):
         # Initialises the GameGUI as an instance of its superclass - a tkinter frame
         super().__init__()
 
-        # Creates quick references to the controller (overall app) and to the game
+        # Creates quick references to the controller (overall app) and to the view-model
         self.controller = controller
-        self.game = controller.game
+        self.view_model = controller.view_models["main_game"]
 
         self.report_message = tk.StringVar()
         self.results_message = tk.StringVar()
 
+        # The future for the computer's object while it is choosing
+        self.pending_move = None
+
         self.outcome = tk.Label(self, textvariable=self.report_message, bg="blue", fg="white", width=35)
 
-        # Creates a dictionary of images for the game buttons
-        self.tk_images = {item: ImageTk.PhotoImage(img) for item, img in IMAGES.items()}
-
-        # Creates a dictionary with the action buttons for each allowable game object
-        # Use the 'partial' function to give a callback command with an argument
-        # The 'compound' option allows both the text and the image
-        self.action_buttons = {player_obj: tk.Button(self, text=player_obj.title(),
-                                                     image=self.tk_images[player_obj],
-                                                     command=partial(self.select_object, player_obj),
-                                                     bg="ivory",
-                                                     compound="right",
-                                                     width=115,
-                                                     )
-                               for player_obj in PlayerObject.allowable_objects}
+        # Dictionaries of images and action buttons for the game objects. They are created the first time an object is
+        # needed and then kept, so changing the rules only changes which buttons are shown
+        self.tk_images = {}
+        self.action_buttons = {}
 
         self.quit_button = tk.Button(self, text="Quit", width=15, command=self.controller.destroy)
         self.restart_button = tk.Button(self, text="New game (N)", width=15, command=self.restart_game)
         self.options_button = tk.Button(self, text="Change Options (O)", width=15, command=self.reset_game)
         self.results = tk.Label(self, textvariable=self.results_message, height=2)
+        self.command_buttons = {"options": self.options_button,
+                                "restart": self.restart_button,
+                                "quit": self.quit_button,
+                                }
 
         # Place objects on the grid
-        for i, btn in enumerate(self.action_buttons.values(), 1):
-            btn.grid(row=i, column=0, pady=5)
-
-        num_buttons = len(self.action_buttons)
         self.outcome.grid(row=1, column=1, rowspan=3)
-        self.results.grid(row=num_buttons + 2, column=0, columnspan=2, pady=5)
-        self.quit_button.grid(row=num_buttons + 3, column=0, pady=(5, 10), rowspan=2)
-        self.restart_button.grid(row=num_buttons + 3, column=1, pady=5)
-        self.options_button.grid(row=num_buttons + 4, column=1, pady=(5, 10))
+        self.show_action_buttons(self.view_model.action_objects)
 
         # Ensure the columns in the grid are equally spaced
         self.columnconfigure(0, weight=1)
         self.columnconfigure(1, weight=1)
 
+        # Keep the widgets in step with the view-model
+        self.view_model.subscribe('report_message', self.report_message.set)
+        self.view_model.subscribe('results_message', self.results_message.set)
+        self.view_model.subscribe('actions_enabled', self.enable_action_buttons)
+        self.view_model.subscribe('action_objects', self.show_action_buttons)
+
         # Binds keys so that the player can choose objects via key presses
         self.bind('<Key>', self.press_key)
 
+    def get_action_button(self, player_obj):
+        """ Returns the action button for a game object, creating it (and its image) the first time """
+        if player_obj not in self.action_buttons:
+            if player_obj not in self.tk_images:
+                self.tk_images[player_obj] = IMAGES.photo_image(player_obj, self)
+            # Use the 'partial' function to give a callback command with an argument
+            # The 'compound' option allows both the text and the image
+            self.action_buttons[player_obj] = tk.Button(self, text=player_obj.title(),
+                                                        image=self.tk_images[player_obj],
+                                                        command=partial(self.select_object, player_obj),
+                                                        bg="ivory",
+                                                        compound="right",
+                                                        width=115,
+                                                        )
+        return self.action_buttons[player_obj]
+
+    def show_action_buttons(self, allowable_objects):
+        """ Grids the action buttons for the allowable objects, hiding the others, and the widgets below them """
+        for btn in self.action_buttons.values():
+            btn.grid_remove()
+        for i, player_obj in enumerate(allowable_objects, 1):
+            self.get_action_button(player_obj).grid(row=i, column=0, pady=5)
+
+        num_buttons = len(allowable_objects)
+        self.results.grid(row=num_buttons + 2, column=0, columnspan=2, pady=5)
+        self.quit_button.grid(row=num_buttons + 3, column=0, pady=(5, 10), rowspan=2)
+        self.restart_button.grid(row=num_buttons + 3, column=1, pady=5)
+        self.options_button.grid(row=num_buttons + 4, column=1, pady=(5, 10))
+
+    def enable_action_buttons(self, enabled):
+        for btn in self.action_buttons.values():
+            btn.config(state=tk.NORMAL if enabled else tk.DISABLED)
+
     def set_up(self):
-        obj_str = ", ".join(PlayerObject.allowable_objects[:-1]) + f"\n or {PlayerObject.allowable_objects[-1]}"
-        self.report_message.set(f"Choose {obj_str} to start")
-        self.results_message.set(
-            f"Welcome {self.game.players[0].name}. You have {self.game.max_rounds} rounds to play")
+        self.view_model.set_up()
         # Focus on the current frame (so that keystrokes binds work)
         self.focus()
 
     def press_key(self, event):
-        key_pressed = event.char.lower()
-        action_key_bindings = {"r": "rock",
-                               "p": "paper",
-                               "s": "scissors",
-                               "l": "lizard",
-                               "k": "spock",
-                               }
-        if key_pressed in action_key_bindings:
-            self.action_buttons[action_key_bindings[key_pressed]].invoke()
-        elif key_pressed == "o":
-            self.options_button.invoke()
-        elif key_pressed == "n":
-            self.restart_button.invoke()
-        elif key_pressed == "q" or event.keysym == "Escape":
-            self.quit_button.invoke()
+        command = self.view_model.key_command(event.char, event.keysym)
+        if command in self.command_buttons:
+            self.command_buttons[command].invoke()
+        elif command is not None:
+            self.action_buttons[command].invoke()
 
     def select_object(self, item):
-        self.game.next_round()
-        self.game.players[0].choose_object(item)
-        self.game.players[1].choose_object()
-        self.game.find_winner()
-        self.show_report()
-
-    def show_report(self):
-        if self.game.current_round == 0:
-            self.set_up()
-        else:
-            self.report_message.set(self.game.report_round())
-            result_msg = self.game.report_score()
-            result_msg = result_msg.replace("\n", " ")
-
-            if self.game.is_finished():
-                result_msg += "\n" + self.game.report_winner()
-                for btn in self.action_buttons.values():
-                    btn.config(state=tk.DISABLED)
-            else:
-                result_msg += f"\nYou have {self.game.max_rounds - self.game.current_round} rounds left to play"
-
-            self.results_message.set(result_msg)
+        if self.view_model.select_object(item):
+            self.start_computer_move()
+
+    def start_computer_move(self):
+        """ Asks the worker thread for the computer's object, and starts polling for it """
+        self.pending_move = self.controller.executor.submit(self.choose_computer_object)
+        self.after(COMPUTER_POLL_MS, self.check_computer_move, self.pending_move)
+
+    def choose_computer_object(self):
+        """ Runs in the worker thread - returns the computer's object for the round """
+        computer = self.view_model.game.players[1]
+        computer.choose_object()
+        return computer.current_object
+
+    def check_computer_move(self, move):
+        """ Plays the round once the computer has chosen, otherwise shows it is thinking and checks again later """
+        if move is not self.pending_move:
+            # The game was restarted while the computer was choosing
+            return
+        if not move.done():
+            self.view_model.computer_thinking()
+            self.after(COMPUTER_POLL_MS, self.check_computer_move, move)
+            return
+        self.pending_move = None
+        if self.view_model.complete_round(move.result()):
+            self.start_computer_move()
 
     def restart_game(self):
-        self.game.reset()
-        self.show_report()
-        for btn in self.action_buttons.values():
-            btn.config(state=tk.NORMAL)
+        self.pending_move = None
+        self.view_model.restart_game()
 
     def reset_game(self):
         self.restart_game()
@@ -284,9 +298,9 @@ class GameGUI(tk.Frame):
         self.controller.show_frame("game_options")
 
 
-def create_game(win_dict=RPSLS_WIN_DICT):
+def create_game(ruleset=RPSLS_RULES):
     """Create a game instance"""
-    game = Game(list(win_dict.keys()), win_dict)
+    game = Game(ruleset=ruleset)
     game.player = game.add_human_player()
     game.add_computer_player()
     return game
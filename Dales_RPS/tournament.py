@@ -0,0 +1,133 @@
+"""
+Module runs round-robin tournaments between computer strategies, spreading the matches across a pool of processes.
+...
+A strategy is any subclass of Player that can be constructed with no arguments and has a choose_object method that
+takes no arguments (e.g. ComputerPlayer).
+
+Every match is played with its own seed, spawned from the tournament's seed, so a tournament with a seed gives the
+same results however the matches are shared between processes.
+
+Classes
+-------
+    Tournament
+
+Functions
+---------
+    play_match
+    play_matches
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from game_objects import Game, RPSLS_RULES, WINS, DRAWS, LOSSES
+
+
+def play_match(strategy_a, strategy_b, rounds, ruleset=RPSLS_RULES, seed=None):
+    """
+    Plays a single match of Game between two strategies, seeding the game with seed (an int or SeedSequence)
+
+    Returns the number of rounds won by strategy_a and by strategy_b
+    """
+    game = Game(ruleset=ruleset, seed=seed)
+    player_a = game.add_player(strategy_a())
+    player_b = game.add_player(strategy_b())
+    game.set_max_rounds(rounds)
+    while not game.is_finished():
+        player_a.choose_object()
+        player_b.choose_object()
+        game.play_round(player_a.current_object, player_b.current_object)
+    return player_a.score, player_b.score
+
+
+def play_matches(work_unit):
+    """
+    Plays a chunk of matches between two strategies - this is the unit of work sent to each process
+
+    Parameters
+    ----------
+        work_unit: tuple
+            (i, j, strategy_a, strategy_b, num_matches, rounds, ruleset, match_seeds) - match_seeds has a seed for
+            each match
+
+    Returns
+    -------
+        tuple
+            (i, j, wins, draws, losses) where the counts are matches won, drawn and lost by strategy_a
+    """
+    i, j, strategy_a, strategy_b, num_matches, rounds, ruleset, match_seeds = work_unit
+    wins = draws = losses = 0
+    for match_seed in match_seeds[:num_matches]:
+        score_a, score_b = play_match(strategy_a, strategy_b, rounds, ruleset, match_seed)
+        if score_a > score_b:
+            wins += 1
+        elif score_a < score_b:
+            losses += 1
+        else:
+            draws += 1
+    return i, j, wins, draws, losses
+
+
+class Tournament:
+    """
+    A class representing a round-robin tournament between strategies
+
+    Attributes
+    ----------
+        strategies: list
+            the strategy classes taking part
+        rounds_per_match: int
+            the number of rounds in each match
+        matches_per_pairing: int
+            the number of matches played between each pair of strategies
+        ruleset: Ruleset
+            the rules every match is played under
+        seed: int
+            the root seed for the matches - drawn from the operating system if not given, so any run can be repeated
+        results: numpy.ndarray
+            cross table with shape (num_strategies, num_strategies, 3) - results[i, j] is the number of matches
+            that strategy i won, drew and lost against strategy j
+    """
+
+    def __init__(self, strategies, rounds_per_match=100, matches_per_pairing=10, ruleset=RPSLS_RULES, seed=None):
+        if len(strategies) < 2:
+            raise ValueError("A tournament needs at least two strategies")
+        self.strategies = list(strategies)
+        self.rounds_per_match = rounds_per_match
+        self.matches_per_pairing = matches_per_pairing
+        self.ruleset = ruleset
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.results = np.zeros((len(self.strategies), len(self.strategies), 3), dtype=np.int64)
+
+    def schedule(self, chunk_size):
+        """ Splits the matches for every pairing of strategies into work units of at most chunk_size matches """
+        work_units = []
+        pairings = list(combinations(range(len(self.strategies)), 2))
+        for (i, j), pairing_seed in zip(pairings, np.random.SeedSequence(self.seed).spawn(len(pairings))):
+            # The matches are seeded before they are chunked, so the results don't depend on chunk_size
+            match_seeds = pairing_seed.spawn(self.matches_per_pairing)
+            for start in range(0, self.matches_per_pairing, chunk_size):
+                num_matches = min(chunk_size, self.matches_per_pairing - start)
+                work_units.append((i, j, self.strategies[i], self.strategies[j], num_matches,
+                                   self.rounds_per_match, self.ruleset, match_seeds[start:start + num_matches]))
+        return work_units
+
+    def run(self, max_workers=None, chunk_size=10):
+        """
+        Plays every match of the tournament across a pool of processes and returns the cross table
+
+        max_workers defaults to the number of CPUs
+        """
+        self.results[:] = 0
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for i, j, wins, draws, losses in executor.map(play_matches, self.schedule(chunk_size)):
+                self.results[i, j] += (wins, draws, losses)
+                self.results[j, i] += (losses, draws, wins)
+        return self.results
+
+    def report(self):
+        """ Returns a string with each strategy's total wins, draws and losses """
+        totals = self.results.sum(axis=1)
+        return "\n".join(f"{strategy.__name__}: won {total[WINS]}, drew {total[DRAWS]}, lost {total[LOSSES]}"
+                         for strategy, total in zip(self.strategies, totals))
@@ -0,0 +1,228 @@
+"""
+Module contains view-models for the tkinter GUI - the state and display logic of each view, without any widgets.
+...
+A view-model changes its state through its methods and announces each change as an event, which the tkinter frames
+in tkinter_rps subscribe to. As nothing here needs a display, the GUI logic can be tested and timed headlessly.
+
+Classes
+-------
+    ViewModel
+    GameOptionsViewModel (subclass of ViewModel)
+    GameViewModel (subclass of ViewModel)
+"""
+from game_objects import RULESETS
+
+ACTION_KEY_BINDINGS = {"r": "rock",
+                       "p": "paper",
+                       "s": "scissors",
+                       "l": "lizard",
+                       "k": "spock",
+                       }
+COMMAND_KEY_BINDINGS = {"o": "options",
+                        "n": "restart",
+                        "q": "quit",
+                        }
+
+
+class ViewModel:
+    """ Base class for view-models - lets views subscribe to named events """
+
+    def __init__(self):
+        self._subscribers = {}
+
+    def subscribe(self, event, callback):
+        """ Calls callback with the new value whenever event is emitted """
+        self._subscribers.setdefault(event, []).append(callback)
+
+    def emit(self, event, value):
+        for callback in self._subscribers.get(event, ()):
+            callback(value)
+
+
+class GameOptionsViewModel(ViewModel):
+    """
+    View-model for choosing the game type, player name and number of rounds
+    ...
+    Events
+    ------
+        user_name: str
+        num_rounds: int
+        start_enabled: bool
+            whether the game can be started
+        title: str
+            the title for the chosen game type
+        ruleset: Ruleset
+            the game's rules have changed
+
+    Attributes
+    ----------
+        game: Game
+        rules: dict
+            keys are game types, values are their Rulesets
+        game_titles: dict
+            keys are game types, values list the objects in the game
+        game_type: str
+            the chosen game type
+        start_enabled: bool
+    """
+    default_rounds = 5
+
+    def __init__(self, game, rules=RULESETS, game_type='RPSLS'):
+        super().__init__()
+        self.game = game
+        self.rules = rules
+        self.game_titles = {rule_name: ', '.join(obj.title() for obj in ruleset.allowable_objects)
+                            for rule_name, ruleset in rules.items()}
+        self.game_type = game_type
+        self.start_enabled = False
+
+    @property
+    def title(self):
+        return self.game_titles[self.game_type] + " Game"
+
+    def set_up(self):
+        """ Fills in the options from the game """
+        if self.game.players:
+            self.emit('user_name', self.game.players[0].name)
+        self.emit('num_rounds', self.game.max_rounds or self.default_rounds)
+
+    def set_start_enabled(self, enabled):
+        if enabled != self.start_enabled:
+            self.start_enabled = enabled
+            self.emit('start_enabled', enabled)
+
+    def validate_entry(self, user_name):
+        """
+        Returns True if user_name can be typed into the name box - names are letters only and up to 12 long
+        A valid name is given to the player, and enables starting the game
+        """
+        if (0 < len(user_name) < 13) and user_name.isalpha():
+            self.set_start_enabled(True)
+            self.game.players[0].set_name(user_name)
+        elif len(user_name) == 0:
+            self.set_start_enabled(False)
+        else:
+            return False
+        return True
+
+    def change_game(self, game_type):
+        """ Changes the rules of the game to those for game_type """
+        self.game_type = game_type
+        self.game.set_ruleset(self.rules[game_type])
+        self.emit('title', self.title)
+        self.emit('ruleset', self.game.ruleset)
+
+    def start_game(self, num_rounds):
+        self.game.set_max_rounds(num_rounds)
+
+
+class GameViewModel(ViewModel):
+    """
+    View-model for playing the game against the computer
+    ...
+    The computer's object is chosen outside the view-model (the GUI uses a worker thread). select_object returns
+    True when the computer should start choosing; complete_round is then called with the computer's object. While
+    the computer is choosing, further selections are coalesced so that only the latest is played next.
+
+    Events
+    ------
+        report_message: str
+        results_message: str
+        actions_enabled: bool
+            whether objects can be selected
+        action_objects: tuple
+            the objects that can be selected, when the rules change
+
+    Attributes
+    ----------
+        game: Game
+        waiting_for_computer: bool
+        chosen_item: str or None
+            the object chosen by the player in the round being played
+        queued_item: str or None
+            the latest object selected while waiting for the computer
+    """
+
+    def __init__(self, game):
+        super().__init__()
+        self.game = game
+        self.waiting_for_computer = False
+        self.chosen_item = None
+        self.queued_item = None
+
+    @property
+    def action_objects(self):
+        return self.game.ruleset.allowable_objects
+
+    def rules_changed(self, ruleset=None):
+        self.emit('action_objects', self.action_objects)
+
+    def set_up(self):
+        allowable_objects = self.action_objects
+        obj_str = ", ".join(allowable_objects[:-1]) + f"\n or {allowable_objects[-1]}"
+        self.emit('report_message', f"Choose {obj_str} to start")
+        self.emit('results_message',
+                  f"Welcome {self.game.players[0].name}. You have {self.game.max_rounds} rounds to play")
+
+    def key_command(self, char, keysym=''):
+        """
+        Returns what a key press should do - an object to select, 'options', 'restart', 'quit' or None
+        """
+        key_pressed = char.lower()
+        if key_pressed in ACTION_KEY_BINDINGS:
+            if ACTION_KEY_BINDINGS[key_pressed] in self.game.ruleset.object_index:
+                return ACTION_KEY_BINDINGS[key_pressed]
+            return None
+        if keysym == "Escape":
+            return "quit"
+        return COMMAND_KEY_BINDINGS.get(key_pressed)
+
+    def select_object(self, item):
+        """ The player has selected item - returns True if the computer should now choose its object """
+        if self.waiting_for_computer:
+            self.queued_item = item
+            return False
+        self.chosen_item = item
+        self.waiting_for_computer = True
+        return True
+
+    def computer_thinking(self):
+        self.emit('report_message', "Computer is thinking...")
+
+    def complete_round(self, computer_object):
+        """
+        Plays the round with the computer's object - returns True if a queued selection means the computer should
+        choose again
+        """
+        self.waiting_for_computer = False
+        self.game.play_round(self.chosen_item, computer_object)
+        self.show_report()
+        queued_item, self.queued_item = self.queued_item, None
+        if queued_item is not None and not self.game.is_finished():
+            return self.select_object(queued_item)
+        return False
+
+    def show_report(self):
+        if self.game.current_round == 0:
+            self.set_up()
+        else:
+            self.emit('report_message', self.game.report_round())
+            result_msg = self.game.report_score()
+            result_msg = result_msg.replace("\n", " ")
+
+            if self.game.is_finished():
+                result_msg += "\n" + self.game.report_winner()
+                self.emit('actions_enabled', False)
+            else:
+                result_msg += f"\nYou have {self.game.max_rounds - self.game.current_round} rounds left to play"
+
+            self.emit('results_message', result_msg)
+
+    def restart_game(self):
+        """ Starts the game again, forgetting any round the computer is choosing for """
+        self.waiting_for_computer = False
+        self.chosen_item = None
+        self.queued_item = None
+        self.game.reset()
+        self.show_report()
+        self.emit('actions_enabled', True)